@@ -0,0 +1 @@
+"""Performance measurements. Not part of the installed package"""
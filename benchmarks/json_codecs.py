@@ -0,0 +1,62 @@
+"""Compare the speed of the available JSON codecs on recorded clockify responses
+
+Usage, from the repository root::
+
+    python -m benchmarks.json_codecs [number of entries per page]
+"""
+
+import json
+import sys
+import timeit
+
+from clockifyclient.jsoncodec import CODECS
+from tests.mock_responses import (
+    GET_PROJECTS,
+    GET_USER,
+    GET_WORKSPACES,
+    POST_TIME_ENTRY,
+    POST_TIME_ENTRY_NO_PROJECT_NO_TASK,
+)
+
+
+def time_entry_page(n):
+    """A page of n time entries, as returned by the time-entries endpoint"""
+    entries = [
+        json.loads(POST_TIME_ENTRY.text),
+        json.loads(POST_TIME_ENTRY_NO_PROJECT_NO_TASK.text),
+    ]
+    page = []
+    for i in range(n):
+        entry = dict(entries[i % 2], id=f"{i:024x}")
+        entry["description"] = f"{entry['description']} {i}"
+        page.append(entry)
+    return json.dumps(page).encode("utf-8")
+
+
+def best_of(function, repeat=5):
+    """Fastest time per call in seconds"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main(n=1000):
+    payloads = {
+        "workspaces": GET_WORKSPACES.text.encode("utf-8"),
+        "user": GET_USER.text.encode("utf-8"),
+        "projects": GET_PROJECTS.text.encode("utf-8"),
+        f"{n} time entries": time_entry_page(n),
+    }
+    codecs = [x() for x in CODECS.values() if x.is_available()]
+    print(f"codecs: {', '.join(x.name for x in codecs)}")
+    for name, payload in payloads.items():
+        print(f"\n{name} ({len(payload)} bytes), microseconds per call")
+        decoded = json.loads(payload)
+        for codec in codecs:
+            decode = best_of(lambda: codec.loads(payload)) * 1e6
+            encode = best_of(lambda: codec.dumps(decoded)) * 1e6
+            print(f"  {codec.name:8} decode {decode:10.1f}   encode {encode:10.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(x) for x in sys.argv[1:]))
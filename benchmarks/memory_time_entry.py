@@ -0,0 +1,75 @@
+"""Measure memory used per TimeEntry, for slotted model classes versus the same
+classes with a per-instance __dict__ (as they were before __slots__ was added)
+
+Usage, from the repository root::
+
+    python -m benchmarks.memory_time_entry [number of entries]
+"""
+import json
+import sys
+import tracemalloc
+
+from clockifyclient.models import ProjectStub, TaskStub, TimeEntry
+
+
+class DictProjectStub(ProjectStub):
+    """Subclasses without __slots__ get a __dict__ again"""
+
+
+class DictTaskStub(TaskStub):
+    pass
+
+
+class DictTimeEntry(TimeEntry):
+    pass
+
+
+EXAMPLE_ENTRY = json.loads(
+    """{"id": "5db08ba8b15b8d3d8e8b5b9e", "description": "testing description",
+    "userId": "123456", "billable": false, "taskId": "5b1e6b160cb8793dd93ec120",
+    "projectId": "5b1667790cb8797321f3d664",
+    "timeInterval": {"start": "2019-10-23T17:18:58Z", "end": "2019-10-23T18:18:58Z",
+    "duration": "PT1H"}, "workspaceId": "123456", "isLocked": false}"""
+)
+
+
+def create_entries(n, time_entry_class, project_class, task_class):
+    entry = TimeEntry.init_from_dict(EXAMPLE_ENTRY)
+    return [
+        time_entry_class(
+            obj_id=f"{i:024x}",
+            start=entry.start,
+            description=entry.description,
+            project=project_class(obj_id=entry.project.obj_id),
+            task=task_class(obj_id=entry.task.obj_id),
+            end=entry.end,
+        )
+        for i in range(n)
+    ]
+
+
+def bytes_per_entry(n, *classes):
+    """Memory allocated per entry. Datetimes and ids of project and task are
+    shared by all entries, as they would largely be in real data
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    entries = create_entries(n, *classes)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(x.size_diff for x in after.compare_to(before, "filename"))
+    del entries
+    return allocated / n
+
+
+def main(n=100_000):
+    with_dict = bytes_per_entry(n, DictTimeEntry, DictProjectStub, DictTaskStub)
+    slotted = bytes_per_entry(n, TimeEntry, ProjectStub, TaskStub)
+    print(f"{n} time entries, each with project and task stub")
+    print(f"with __dict__ : {with_dict:7.0f} bytes per TimeEntry")
+    print(f"with __slots__: {slotted:7.0f} bytes per TimeEntry")
+    print(f"saved         : {1 - slotted / with_dict:7.0%}")
+
+
+if __name__ == "__main__":
+    main(*(int(x) for x in sys.argv[1:]))
@@ -0,0 +1,294 @@
+"""A local http server that behaves like the parts of the clockify API used by
+client.ClockifyAPI, for measuring performance without a network or api key.
+
+Latency, jitter and '429 Too many requests' responses can be injected
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+API_PATH = "/api/v1"
+MAX_PAGE_SIZE = 5000
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class StandInState:
+    def __init__(self):
+        """Workspace, user, projects and time entries served by a StandInServer.
+        Access only while holding lock
+        """
+        self.lock = threading.Lock()
+        self.workspace = {"id": "5e1f00000000000000000001", "name": "Workspace"}
+        self.user = {
+            "id": "5e1f00000000000000000002",
+            "name": "Stand-in user",
+            "email": "user@example.com",
+            "activeWorkspace": self.workspace["id"],
+            "defaultWorkspace": self.workspace["id"],
+        }
+        self.projects = [
+            {"id": f"5e1f0000000000000000010{i}", "name": f"Project {i}"}
+            for i in range(5)
+        ]
+        self.tasks = {
+            x["id"]: [{"id": f"{x['id'][:-3]}2{i:02d}", "name": f"Task {i}"}]
+            for i, x in enumerate(self.projects)
+        }
+        self.entries: List[Dict] = []  # newest first, like clockify returns them
+        self.next_id = 0
+
+    def new_id(self) -> str:
+        self.next_id += 1
+        return f"{self.next_id:024x}"
+
+    def create_entry(self, data: Dict) -> Dict:
+        end = data.get("end")
+        return {
+            "id": data.get("id") or self.new_id(),
+            "description": data.get("description", ""),
+            "tagIds": None,
+            "userId": self.user["id"],
+            "billable": False,
+            "taskId": data.get("taskId"),
+            "projectId": data.get("projectId"),
+            "timeInterval": {"start": data["start"], "end": end, "duration": None},
+            "workspaceId": self.workspace["id"],
+            "isLocked": False,
+        }
+
+    def add_history(self, n: int, start: Optional[datetime] = None):
+        """Add n finished time entries of one hour, one per 2 hours going back in
+        time from start
+        """
+        start = start or datetime(2020, 1, 1, tzinfo=timezone.utc)
+        for i in range(n):
+            begin = start - timedelta(hours=2 * (len(self.entries) + 1))
+            project = self.projects[i % len(self.projects)]
+            self.entries.append(
+                self.create_entry(
+                    {
+                        "description": f"entry {i % 100}",
+                        "projectId": project["id"],
+                        "taskId": self.tasks[project["id"]][0]["id"],
+                        "start": begin.strftime(DATETIME_FORMAT),
+                        "end": (begin + timedelta(hours=1)).strftime(DATETIME_FORMAT),
+                    }
+                )
+            )
+
+    def running_entry(self) -> Optional[Dict]:
+        return next((x for x in self.entries if not x["timeInterval"]["end"]), None)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections alive, like the real API
+    disable_nagle_algorithm = True  # headers and body are written separately
+    server: "StandInServer"
+
+    routes = [
+        ("GET", r"/workspaces", "get_workspaces"),
+        ("GET", r"/user", "get_user"),
+        ("GET", r"/workspaces/(\w+)/projects", "get_projects"),
+        ("GET", r"/workspaces/(\w+)/projects/(\w+)/tasks", "get_tasks"),
+        ("GET", r"/workspaces/(\w+)/user/(\w+)/time-entries", "get_time_entries"),
+        ("POST", r"/workspaces/(\w+)/time-entries", "post_time_entry"),
+        ("PUT", r"/workspaces/(\w+)/time-entries/(\w+)", "put_time_entry"),
+        ("PATCH", r"/workspaces/(\w+)/user/(\w+)/time-entries/?", "stop_timer"),
+    ]
+
+    def log_message(self, format, *args):
+        pass  # do not print each request
+
+    def do_GET(self):
+        self.handle_method("GET")
+
+    def do_POST(self):
+        self.handle_method("POST")
+
+    def do_PUT(self):
+        self.handle_method("PUT")
+
+    def do_PATCH(self):
+        self.handle_method("PATCH")
+
+    def handle_method(self, method: str):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        self.server.delay()
+        if self.server.should_throttle():
+            self.send_json(
+                429,
+                {"message": "Too many requests", "code": 429},
+                headers={"Retry-After": str(self.server.retry_after)},
+            )
+            return
+        if not url.path.startswith(API_PATH):
+            self.send_json(404, {"message": "Not found", "code": 404})
+            return
+        path = url.path[len(API_PATH) :]
+        params = {x: y[-1] for x, y in parse_qs(url.query).items()}
+        for route_method, pattern, name in self.routes:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                with self.server.state.lock:
+                    status, content = getattr(self, name)(
+                        self.server.state, *match.groups(), params=params, body=body
+                    )
+                self.send_json(status, content)
+                return
+        self.send_json(404, {"message": f"No endpoint {method} {path}", "code": 404})
+
+    def send_json(self, status: int, content, headers: Optional[Dict] = None):
+        data = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    @staticmethod
+    def get_workspaces(state: StandInState, params, body):
+        return 200, [state.workspace]
+
+    @staticmethod
+    def get_user(state: StandInState, params, body):
+        return 200, state.user
+
+    @staticmethod
+    def get_projects(state: StandInState, workspace_id, params, body):
+        return 200, state.projects
+
+    @staticmethod
+    def get_tasks(state: StandInState, workspace_id, project_id, params, body):
+        return 200, state.tasks.get(project_id, [])
+
+    @staticmethod
+    def get_time_entries(state: StandInState, workspace_id, user_id, params, body):
+        entries = state.entries
+        description = params.get("description")
+        if description:
+            description = description.lower()
+            entries = [x for x in entries if description in x["description"].lower()]
+        start = params.get("start")
+        if start:
+            entries = [x for x in entries if x["timeInterval"]["start"] >= start]
+        end = params.get("end")
+        if end:
+            entries = [x for x in entries if x["timeInterval"]["start"] <= end]
+        for param, key in (("project", "projectId"), ("task", "taskId")):
+            if params.get(param):
+                entries = [x for x in entries if x[key] == params[param]]
+        if "in-progress" in params:
+            running = params["in-progress"] == "true"
+            entries = [x for x in entries if (not x["timeInterval"]["end"]) == running]
+        page = int(params.get("page", 1))
+        page_size = min(int(params.get("page-size", 50)), MAX_PAGE_SIZE)
+        return 200, entries[(page - 1) * page_size : page * page_size]
+
+    @staticmethod
+    def post_time_entry(state: StandInState, workspace_id, params, body):
+        if not body.get("end") and state.running_entry():
+            return 400, {"message": "Timer is already running", "code": 501}
+        entry = state.create_entry(body)
+        state.entries.insert(0, entry)
+        return 201, entry
+
+    @staticmethod
+    def put_time_entry(state: StandInState, workspace_id, entry_id, params, body):
+        for i, entry in enumerate(state.entries):
+            if entry["id"] == entry_id:
+                state.entries[i] = state.create_entry(dict(body, id=entry_id))
+                return 200, state.entries[i]
+        return 404, {"message": f"Time entry {entry_id} not found", "code": 404}
+
+    @staticmethod
+    def stop_timer(state: StandInState, workspace_id, user_id, params, body):
+        entry = state.running_entry()
+        if not entry:
+            message = (
+                f"Currently running time entry doesn't exist on workspace "
+                f"{workspace_id} for user {user_id}."
+            )
+            return 404, {"message": message, "code": 404}
+        entry["timeInterval"]["end"] = body["end"]
+        return 200, entry
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0,
+        seed: int = 0,
+    ):
+        """Stand-in clockify API on a free local port. Use as context manager to
+        serve in a background thread
+
+        Parameters
+        ----------
+        latency: float, optional
+            Seconds to wait before answering each call. Defaults to 0
+        jitter: float, optional
+            Add a random extra wait of up to this many seconds. Defaults to 0
+        throttle_rate: float, optional
+            Fraction of calls answered with '429 Too many requests'. Defaults to 0
+        retry_after: float, optional
+            Value of the Retry-After header sent with 429 responses. Defaults to 0
+        seed: int, optional
+            Seed for jitter and throttling, for repeatable runs. Defaults to 0
+        """
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.state = StandInState()
+        self.throttled = 0  # number of 429 responses sent
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Url to give to APIServer"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def delay(self):
+        with self._random_lock:
+            wait = self.latency + self._random.uniform(0, self.jitter)
+        if wait > 0:
+            time.sleep(wait)
+
+    def should_throttle(self) -> bool:
+        if not self.throttle_rate:
+            return False
+        with self._random_lock:
+            throttle = self._random.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+        return throttle
@@ -0,0 +1,217 @@
+"""End-to-end benchmarks of the client against a local stand-in server, with stored
+baselines to detect regressions
+
+Usage, from the repository root::
+
+    python -m benchmarks.suite                   # run and compare to baselines
+    python -m benchmarks.suite --save-baseline   # run and store as new baselines
+
+Baselines are stored in benchmarks/baselines.json. They depend on the machine
+they were measured on, so store new baselines before comparing on a different
+machine
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict
+
+from benchmarks.standin import StandInServer, StandInState
+from clockifyclient.api import APIServer, RetryPolicy
+from clockifyclient.client import APISession
+from clockifyclient.metrics import MetricsCollector
+from clockifyclient.models import TimeEntry, TimeEntryQuery
+from clockifyclient.transport import InMemoryTransport
+
+BASELINE_PATH = Path(__file__).parent / "baselines.json"
+
+# server behaviour for all benchmarks: 2-3 ms per call, 2% calls throttled
+SERVER_SETTINGS = dict(latency=0.002, jitter=0.001, throttle_rate=0.02, seed=1)
+
+# for each result, whether higher values are better
+HIGHER_IS_BETTER = {"per_second": True, "seconds": False, "p50_ms": False}
+
+
+def create_session(server: StandInServer) -> APISession:
+    api_server = APIServer(
+        server.url,
+        # 429 responses from the stand-in never have side effects, so posts can
+        # be retried as well
+        retry_policy=RetryPolicy(
+            max_retries=5, backoff_factor=0.001, retry_non_idempotent=True
+        ),
+        pool_maxsize=16,
+    )
+    return APISession(api_server=api_server, api_key="benchmark")
+
+
+def timed(function: Callable) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def bench_get_time_entries(n=20_000, **kwargs) -> Dict[str, float]:
+    """Read a history of n entries"""
+    with StandInServer(**SERVER_SETTINGS) as server:
+        server.state.add_history(n)
+        session = create_session(server)
+        session.get_user()  # do not count workspace and user calls
+        seconds = timed(
+            lambda: session.get_time_entries(
+                TimeEntryQuery(description=None), limit=None, **kwargs
+            )
+        )
+    return {"seconds": seconds, "per_second": n / seconds}
+
+
+def bench_parse_time_entries(n=20_000) -> Dict[str, float]:
+    """Read a history of n entries through an in-memory transport. Measures
+    decoding and model creation only
+    """
+    state = StandInState()
+    state.add_history(n)
+    transport = InMemoryTransport()
+    transport.add("GET", "/user", state.user)
+    transport.add("GET", "/workspaces", [state.workspace])
+    transport.add_paged(r"/workspaces/\w+/user/\w+/time-entries", state.entries)
+    session = APISession(
+        api_server=APIServer("http://in-memory/api/v1", transport=transport),
+        api_key="benchmark",
+    )
+    session.get_user()
+    seconds = timed(
+        lambda: session.get_time_entries(TimeEntryQuery(description=None), limit=None)
+    )
+    return {"seconds": seconds, "per_second": n / seconds}
+
+
+def bench_add_time_entries(n=500, max_workers=8) -> Dict[str, float]:
+    """Add n finished entries concurrently"""
+    start = datetime(2021, 1, 1)
+    entries = [
+        TimeEntry(
+            obj_id=None,
+            start=start + timedelta(hours=i),
+            end=start + timedelta(hours=i, minutes=30),
+            description=f"bulk {i}",
+        )
+        for i in range(n)
+    ]
+    with StandInServer(**SERVER_SETTINGS) as server:
+        session = create_session(server)
+        session.get_user()
+        seconds = timed(lambda: session.add_time_entries(entries, max_workers))
+        if len(server.state.entries) != n:
+            raise RuntimeError(f"Only {len(server.state.entries)} of {n} entries added")
+    return {"seconds": seconds, "per_second": n / seconds}
+
+
+def bench_stop_timer(n=200) -> Dict[str, float]:
+    """Stop timer n times, alternating between a running timer and none (404)"""
+    durations = []
+    with StandInServer(**SERVER_SETTINGS) as server:
+        session = create_session(server)
+        session.get_user()
+        for i in range(n):
+            if i % 2 == 0:
+                session.add_time_entry(start_time=datetime(2021, 1, 1), description="t")
+            durations.append(timed(session.stop_timer))
+    return {"p50_ms": median(durations) * 1000, "per_second": n / sum(durations)}
+
+
+def bench_request_latency(n=200) -> Dict[str, float]:
+    """Client overhead on top of server latency, from the metrics collector"""
+    with StandInServer(latency=0.002, seed=1) as server:
+        session = create_session(server)
+        metrics = MetricsCollector()
+        metrics.watch_session(session)
+        for _ in range(n):
+            session.api.get_user(api_key=session.api_key)
+        latency = metrics.snapshot()["requests"]["GET /user"]["latency"]
+    return {"p50_ms": latency["p50"] * 1000, "per_second": n / latency["sum"]}
+
+
+BENCHMARKS = {
+    "get_time_entries": bench_get_time_entries,
+    "get_time_entries_lazy": lambda: bench_get_time_entries(lazy=True),
+    "get_time_entries_prefetch": lambda: bench_get_time_entries(prefetch=2),
+    "parse_time_entries": bench_parse_time_entries,
+    "add_time_entries": bench_add_time_entries,
+    "stop_timer": bench_stop_timer,
+    "request_latency": bench_request_latency,
+}
+
+
+def run(names, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Best result of repeat runs for each benchmark"""
+    results = {}
+    for name in names:
+        runs = [BENCHMARKS[name]() for _ in range(repeat)]
+        results[name] = {
+            key: (max if HIGHER_IS_BETTER[key] else min)(x[key] for x in runs)
+            for key in runs[0]
+        }
+        print(name, format_result(results[name]), flush=True)
+    return results
+
+
+def format_result(result: Dict[str, float]) -> str:
+    return ", ".join(f"{key}={value:.4g}" for key, value in result.items())
+
+
+def compare(results, baselines, tolerance: float):
+    """Regressions, as messages, of results relative to baselines"""
+    regressions = []
+    for name, result in results.items():
+        for key, value in result.items():
+            baseline = baselines.get(name, {}).get(key)
+            if baseline is None:
+                continue
+            if HIGHER_IS_BETTER[key]:
+                change = (baseline - value) / baseline
+            else:
+                change = (value - baseline) / baseline
+            if change > tolerance:
+                regressions.append(
+                    f"{name} {key}: {value:.4g}, baseline {baseline:.4g} "
+                    f"({change:.0%} worse)"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run. Default: all")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="fraction a result can be worse than baseline. Default: 0.25",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.names or list(BENCHMARKS), repeat=args.repeat)
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if args.save_baseline:
+        baselines.update(results)
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baselines to {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, baselines, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,285 @@
 """Models the clockify API. Tries to stay close to the actual endpoints.
 This layer is the only one that should do actual http queries
 """
-from json.decoder import JSONDecodeError
-from typing import Dict, List
 
-import requests
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from json.decoder import JSONDecodeError
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlparse
+
+from requests.exceptions import (
+    ConnectionError as RequestsConnectionError,
+    RequestException,
+    Timeout,
+)
 
 from clockifyclient.decorators import except_connection_error
 from clockifyclient.exceptions import ClockifyClientException
+from clockifyclient.hooks import RequestEvent, RequestHooks
+from clockifyclient.jsoncodec import JSONCodec, StdlibJSONCodec, get_codec
+from clockifyclient.ratelimit import RateLimiter
+from clockifyclient.streaming import CHUNK_SIZE, iter_json_array
+from clockifyclient.transport import HTTPTransport, Transport
 
 
 class APIServer:
     """Models a clockify API server. Basic HTTP interaction. Returns json and
     raises exceptions
 
+    All calls go through a single transport. By default a pooled http session
+    which keeps connections alive between calls. Call close() or use as context
+    manager to release connections when done.
+
     Notes
     -----
     For higher level interactions, see client.ClockifyAPI
     """
 
-    def __init__(self, url):
+    def __init__(
+        self,
+        url,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        transport: Optional[Transport] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional["RetryPolicy"] = None,
+        validator_cache_size: int = 256,
+        json_codec: Optional[JSONCodec] = None,
+        coalesce_gets: bool = True,
+        hooks: Optional[List[RequestHooks]] = None,
+    ):
         """
 
         Parameters
         ----------
         url: str
             url of the api
+        pool_connections: int, optional
+            Number of hosts to keep a connection pool for. Defaults to 10
+        pool_maxsize: int, optional
+            Maximum number of connections to keep open per host. Defaults to 10
+        pool_block: bool, optional
+            If True, wait for a free connection when pool_maxsize connections to
+            a host are in use. If False, open an extra connection that is discarded
+            after use. Defaults to False
+        keep_alive: bool, optional
+            Re-use connections between calls. Defaults to True
+        transport: Transport, optional
+            Performs the http calls. Defaults to a HTTPTransport with the pool
+            settings above, which are ignored if transport is given
+        rate_limiter: RateLimiter, optional
+            Wait for this limiter before each call. Can be shared between servers.
+            Defaults to None, meaning calls are not limited
+        retry_policy: RetryPolicy, optional
+            Decides whether and when to retry calls that failed with a transient
+            error. Defaults to None, meaning calls are never retried
+        validator_cache_size: int, optional
+            Remember ETag and Last-Modified validators, with the parsed response,
+            for this many get() calls to make repeated calls conditional. 0 turns
+            conditional calls off. Defaults to 256
+        json_codec: JSONCodec, optional
+            Encodes request data and decodes responses. Defaults to the fastest
+            installed codec, see jsoncodec.get_codec()
+        coalesce_gets: bool, optional
+            When several threads make the same get() call at the same time, make
+            only one http call and give all of them its result. Defaults to True
+        hooks: List[RequestHooks], optional
+            Call these around each http call, for telemetry. Defaults to None
         """
         self.url = url
+        self.host = urlparse(url).netloc
+        self.transport = transport or HTTPTransport(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+        )
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.retry_count = 0  # total number of retries done by this server
+        self.json_codec = json_codec or get_codec()
+        if validator_cache_size:
+            self.validator_cache = ValidatorCache(max_size=validator_cache_size)
+        else:
+            self.validator_cache = None
+        self._headers = {}
+        self.single_flight = SingleFlight() if coalesce_gets else None
+        self.hooks = list(hooks or [])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release all connections of the transport. The server can still be used
+        after this
+        """
+        self.transport.close()
+
+    def get_headers(self, api_key: str) -> Dict[str, str]:
+        """Default headers for calls with the given api key. Built once per key
+
+        Parameters
+        ----------
+        api_key: str
+            api key to send with request
+
+        Returns
+        -------
+        Dict[str, str]
+            Headers. Do not modify, this dict is shared between calls
+        """
+        try:
+            return self._headers[api_key]
+        except KeyError:
+            headers = {"X-Api-key": api_key, "content-type": "application/json"}
+            self._headers[api_key] = headers
+            return headers
+
+    def request(
+        self, method, path, api_key, params=None, data=None, headers=None, stream=False
+    ):
+        """Perform a http call to this server
+
+        Parameters
+        ----------
+        method: str
+            http method like 'GET' or 'POST'
+        path: str
+            relative path to endpoint. Like '/user' or '/workspaces'
+        api_key: str
+            api key to send with request
+        params: Dict, optional
+            Request parameters to send. Defaults to None
+        data: Dict, optional
+            data to send as json. Defaults to None
+        headers: Dict, optional
+            Headers to send in addition to the default headers. Defaults to None
+        stream: bool, optional
+            Return as soon as the response headers have been received. The body is
+            read when accessed. Defaults to False
+
+        Returns
+        -------
+        requests.Response
+            The raw response, as returned by the transport
+        """
+        attempt = 0
+        while True:
+            event = RequestEvent(method, path, attempt) if self.hooks else None
+            try:
+                response = self.send(
+                    method, path, api_key, params, data, headers, stream, event
+                )
+            except (RequestsConnectionError, Timeout):
+                if not self.should_retry(method, attempt):
+                    raise
+                wait = self.retry_policy.get_wait(attempt)
+            else:
+                if not self.should_retry(method, attempt, response.status_code):
+                    return response
+                wait = self.retry_policy.get_wait(
+                    attempt, retry_after=response.headers.get("Retry-After")
+                )
+                response.close()  # give a streamed response's connection back
+            if event:
+                event.wait = wait
+                self.emit("on_retry", event)
+            attempt += 1
+            self.retry_count += 1
+            time.sleep(wait)
+
+    def should_retry(self, method, attempt, status_code=None) -> bool:
+        """Whether a failed call should be tried again according to retry_policy"""
+        return bool(self.retry_policy) and self.retry_policy.should_retry(
+            method, attempt, status_code
+        )
+
+    def send(
+        self,
+        method,
+        path,
+        api_key,
+        params=None,
+        data=None,
+        headers=None,
+        stream=False,
+        event: Optional[RequestEvent] = None,
+    ):
+        """Perform a single http call to this server, without retries. If event
+        is given, hooks are called for it
+        """
+        if self.rate_limiter:
+            self.rate_limiter.acquire(api_key=api_key, host=self.host)
+        if headers:
+            headers = {**self.get_headers(api_key), **headers}
+        else:
+            headers = self.get_headers(api_key)
+        if data is not None:
+            data = self.json_codec.dumps(data)
+        if event is None:
+            return self.transport.request(
+                method,
+                self.url + path,
+                headers=headers,
+                params=params,
+                data=data,
+                stream=stream,
+            )
+
+        self.emit("before_request", event)
+        start = time.perf_counter()
+        try:
+            response = self.transport.request(
+                method,
+                self.url + path,
+                headers=headers,
+                params=params,
+                data=data,
+                stream=stream,
+            )
+        except Exception as e:
+            event.latency = time.perf_counter() - start
+            event.exception = e
+            self.emit("on_error", event)
+            raise
+        event.latency = time.perf_counter() - start
+        event.status_code = response.status_code
+        if stream:
+            content_length = response.headers.get("Content-Length")
+            event.bytes_received = int(content_length) if content_length else None
+        else:
+            event.bytes_received = len(response.content)
+        self.emit("after_response", event)
+        return response
+
+    def add_hooks(self, hooks: RequestHooks):
+        """Call hooks for each http call made by this server"""
+        self.hooks = self.hooks + [hooks]
+
+    def emit(self, name: str, event: RequestEvent):
+        """Call method name of all hooks with event"""
+        for hooks in self.hooks:
+            getattr(hooks, name)(event)
 
     @except_connection_error
     def get(self, path, api_key, params=None):
@@ -42,6 +294,14 @@ class APIServer:
         params: Dict, optional
             Request parameters to send. Defaults to empty list
 
+        Notes
+        -----
+        If an earlier response for the same call carried an ETag or Last-Modified
+        header, the call is made conditional. If the server answers 304 Not
+        Modified, the earlier parsed response is returned. Identical calls made
+        at the same time from different threads share one http call and its
+        result. Treat returned objects as read-only, as they might be returned
+        to other callers as well
 
         Returns
         -------
@@ -51,14 +311,43 @@ class APIServer:
         """
         if not params:
             params = {}
-        response_raw = requests.get(
-            self.url + path,
-            headers={"X-Api-key": api_key, "content-type": "application/json"},
-            params=params,
+        if self.single_flight is None:
+            return self.get_uncoalesced(path, api_key, params)
+        return self.single_flight.do(
+            (api_key, path, tuple(sorted(params.items()))),
+            lambda: self.get_uncoalesced(path, api_key, params),
         )
-        return APIRawResponse(response_raw).parse()
 
-    def get_iterator(self, path, api_key, params=None) -> "PagedGetIterator":
+    def get_uncoalesced(self, path, api_key, params):
+        """Like get(), but always makes its own http call"""
+        if self.validator_cache is None:
+            response_raw = self.request("GET", path, api_key, params=params)
+            return APIRawResponse(response_raw, self.json_codec).parse()
+
+        key = self.validator_cache.get_key(path, api_key, params)
+        cached = self.validator_cache.get(key)
+        response_raw = self.request(
+            "GET",
+            path,
+            api_key,
+            params=params,
+            headers=cached.get_conditional_headers() if cached else None,
+        )
+        if cached and response_raw.status_code == 304:
+            return cached.content
+        content = APIRawResponse(response_raw, self.json_codec).parse()
+        self.validator_cache.store(key, response_raw, content)
+        return content
+
+    def get_iterator(
+        self,
+        path,
+        api_key,
+        params=None,
+        prefetch: int = 0,
+        page_size_policy: "PageSizePolicy" = None,
+        stream: bool = False,
+    ) -> "PagedGetIterator":
         """A get request that iterates over items and calls API again for more
         items if needed
 
@@ -70,7 +359,17 @@ class APIServer:
             api key to send with request
         params: Dict, optional
             Request parameters to send. Defaults to empty list
-
+        prefetch: int, optional
+            Request this many pages ahead in the background. Defaults to 0,
+            meaning a page is only requested when the previous one has been
+            consumed
+        page_size_policy: PageSizePolicy, optional
+            Decides the number of items to request for each page. Defaults to
+            AdaptivePageSize()
+        stream: bool, optional
+            Decode each page while it is being received, instead of receiving
+            the whole page first. Keeps memory use flat for large pages.
+            Defaults to False
 
         Returns
         -------
@@ -80,7 +379,15 @@ class APIServer:
 
         """
 
-        return PagedGetIterator(url=self.url + path, api_key=api_key, params=params)
+        return PagedGetIterator(
+            api_server=self,
+            path=path,
+            api_key=api_key,
+            params=params,
+            prefetch=prefetch,
+            page_size_policy=page_size_policy,
+            stream=stream,
+        )
 
     @except_connection_error
     def post(self, path, api_key, data):
@@ -101,12 +408,8 @@ class APIServer:
             Json-interpreted response from server
 
         """
-        response_raw = requests.post(
-            self.url + path,
-            headers={"X-Api-key": api_key, "content-type": "application/json"},
-            json=data,
-        )
-        return APIRawResponse(response_raw).parse()
+        response_raw = self.request("POST", path, api_key, data=data)
+        return APIRawResponse(response_raw, self.json_codec).parse()
 
     @except_connection_error
     def put(self, path, api_key, data):
@@ -127,12 +430,8 @@ class APIServer:
             Json-interpreted response from server
 
         """
-        response_raw = requests.put(
-            self.url + path,
-            headers={"X-Api-key": api_key, "content-type": "application/json"},
-            json=data,
-        )
-        return APIRawResponse(response_raw).parse()
+        response_raw = self.request("PUT", path, api_key, data=data)
+        return APIRawResponse(response_raw, self.json_codec).parse()
 
     @except_connection_error
     def patch(self, path, api_key, data):
@@ -153,16 +452,131 @@ class APIServer:
             Json-interpreted response from server
 
         """
-        response_raw = requests.patch(
-            self.url + path,
-            headers={"X-Api-key": api_key, "content-type": "application/json"},
-            json=data,
-        )
-        return APIRawResponse(response_raw).parse()
+        response_raw = self.request("PATCH", path, api_key, data=data)
+        return APIRawResponse(response_raw, self.json_codec).parse()
+
+
+class SingleFlight:
+    def __init__(self):
+        """Lets concurrent calls with the same key share a single execution.
+        Thread-safe
+        """
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """Call function and return its result. If another thread is already
+        calling for the same key, wait for that call and return its result or
+        raise its exception instead
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = Future()
+        if not is_leader:
+            return call.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class ValidatedResponse:
+    def __init__(self, content: Any, etag: Optional[str], last_modified: Optional[str]):
+        """A parsed response with the validators the server sent with it
+
+        Parameters
+        ----------
+        content: Any
+            The parsed response
+        etag: str, optional
+            Value of the ETag response header
+        last_modified: str, optional
+            Value of the Last-Modified response header
+        """
+        self.content = content
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def get_conditional_headers(self) -> Dict[str, str]:
+        """Request headers that ask the server to only send changed content"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorCache:
+    def __init__(self, max_size: int = 256):
+        """Remembers validated responses for get calls. Least recently used
+        responses are dropped when max_size is reached. Thread-safe
+
+        Parameters
+        ----------
+        max_size: int, optional
+            Maximum number of responses to keep. Defaults to 256
+        """
+        self.max_size = max_size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._responses)
+
+    @staticmethod
+    def get_key(path: str, api_key: str, params: Dict) -> Tuple:
+        return api_key, path, tuple(sorted(params.items()))
+
+    def get(self, key: Tuple) -> Optional[ValidatedResponse]:
+        with self._lock:
+            try:
+                self._responses.move_to_end(key)
+                return self._responses[key]
+            except KeyError:
+                return None
+
+    def store(self, key: Tuple, response_raw, content: Any):
+        """Remember content if response_raw carries validators. Otherwise forget
+        any earlier response for key
+        """
+        etag = response_raw.headers.get("ETag")
+        last_modified = response_raw.headers.get("Last-Modified")
+        with self._lock:
+            if not (etag or last_modified):
+                self._responses.pop(key, None)
+                return
+            self._responses[key] = ValidatedResponse(content, etag, last_modified)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
 
 
 class PagedGetIterator:
-    def __init__(self, url: str, api_key: str, params: Dict[str, str] = None):
+    def __init__(
+        self,
+        api_server: APIServer,
+        path: str,
+        api_key: str,
+        params: Dict[str, str] = None,
+        prefetch: int = 0,
+        page_size_policy: "PageSizePolicy" = None,
+        stream: bool = False,
+    ):
         """Large responses are paged by clockify, meaning a single call will only
         return data on the first N items. To get all items, repeated calls are
         needed. This iterator returns items and repeats calls when needed until
@@ -171,12 +585,24 @@ class PagedGetIterator:
 
         Parameters
         ----------
-        url: str
+        api_server: APIServer
+            Server to call. Calls share the connection pool of this server
+        path: str
             relative path to endpoint. Like '/user' or '/workspaces'
         api_key: str
             api key to send with request
         params: Dict, optional
             Request parameters to send. Defaults to empty dict
+        prefetch: int, optional
+            Request this many pages ahead in background threads while the current
+            page is being consumed. At most this many pages are buffered. Defaults
+            to 0, meaning no prefetching
+        page_size_policy: PageSizePolicy, optional
+            Decides the number of items to request for each page. Defaults to
+            AdaptivePageSize()
+        stream: bool, optional
+            Return items of a page while the page is being received, instead of
+            receiving and decoding the whole page first. Defaults to False
 
         Notes
         -----
@@ -191,62 +617,379 @@ class PagedGetIterator:
         Dict or List:
             Json-interpreted response from server
         """
-        self.url = url
+        self.api_server = api_server
+        self.path = path
         self.api_key = api_key
         if not params:
             params = {}
         self.params = params
         self.current_page_iterator = iter([])
         self.current_page_number = 0
-        self.page_size = 50
+        if not page_size_policy:
+            page_size_policy = AdaptivePageSize()
+        self.page_size_policy = page_size_policy
+        self.page_size = None  # size of the last page that was requested
+        self.offset = 0  # number of items in all pages received so far
+        self.planned_offset = 0  # same, but including prefetched pages
         self.might_have_more = True
+        self.prefetch = prefetch
+        self.stream = stream
+        self.received = 0  # number of items received from the current page
+        self.resume_at = 0  # items of the current page returned before it broke off
+        self._executor = None
+        self._prefetched = deque()  # (page size, future) for upcoming pages
+
+    def __enter__(self):
+        return self
 
-    def get_response(self, page: int) -> List[Dict]:
-        """Get responses for given page"""
-        self.params["page"] = str(page)
-        self.params["page-size"] = str(self.page_size)
-        response_raw = requests.get(
-            self.url,
-            headers={"X-Api-key": self.api_key, "content-type": "application/json"},
-            params=self.params,
-        )
-        return APIRawResponse(response_raw).parse()
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        if self.stream and hasattr(self.current_page_iterator, "close"):
+            self.current_page_iterator.close()  # release connection of current page
+
+    def __del__(self):
+        self.close()
+
+    def get_response(self, page: int, page_size: int) -> Iterable[Dict]:
+        """Get responses for given page. When streaming, items are decoded while
+        they are being iterated over
+
+        Raises
+        ------
+        ClockifyClientException
+            When the call fails, also if the response breaks off while it is
+            being received
+        """
+        params = dict(self.params)
+        params["page"] = str(page)
+        params["page-size"] = str(page_size)
+        try:
+            response_raw = self.api_server.request(
+                "GET", self.path, self.api_key, params=params, stream=self.stream
+            )
+            response = APIRawResponse(response_raw, self.api_server.json_codec)
+            if self.stream:
+                return response.parse_stream()
+            return response.parse()
+        except RequestException as e:
+            raise ClockifyClientException(f"Requests error: {e}") from e
+
+    def plan_next_page(self) -> Tuple[int, int]:
+        """Page number and page size of the page after the last planned one,
+        assuming all pages before it are full
+        """
+        page, page_size = self.page_size_policy.get_page(self.planned_offset)
+        self.planned_offset += page_size
+        return page, page_size
+
+    def get_prefetched_response(self) -> Tuple[int, List[Dict]]:
+        """Get page size and responses for the next page, making sure the pages
+        after it are being requested in the background
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.prefetch, thread_name_prefix="clockify-prefetch"
+            )
+        # keep the next page plus 'prefetch' pages after it in flight
+        while len(self._prefetched) <= self.prefetch:
+            page, page_size = self.plan_next_page()
+            self._prefetched.append(
+                (page_size, self._executor.submit(self.get_response, page, page_size))
+            )
+        page_size, future = self._prefetched.popleft()
+        return page_size, future.result()
 
     def get_next_page(self):
-        """Try to call API for the next batch of results"""
+        """Try to call API for the next batch of results. If this fails, the next
+        call will try the same page again
+        """
         self.current_page_number += 1
-        items = self.get_response(page=self.current_page_number)
-        if len(items) < self.page_size:
-            # less items than requested were returned. This is the last page
-            self.might_have_more = False
+        try:
+            if self.prefetch:
+                self.page_size, items = self.get_prefetched_response()
+            else:
+                page, self.page_size = self.plan_next_page()
+                items = self.get_response(page=page, page_size=self.page_size)
+        except Exception:
+            # forget this page and any pages planned after it
+            self.current_page_number -= 1
+            self.close()
+            raise
+        self.offset += self.page_size
+        self.received = 0
+        if not self.stream:
+            self.emit_page_fetched(len(items))
+            if len(items) < self.page_size:
+                # less items than requested were returned. This is the last page
+                self.might_have_more = False
+                self.close()
         self.current_page_iterator = iter(items)
 
-    def __next__(self) -> Dict:
+    def emit_page_fetched(self, items: int):
+        """Call page_fetched hooks for the page that was requested last"""
+        if not self.api_server.hooks:
+            return
+        event = RequestEvent("GET", self.path)
+        event.page_size = self.page_size
+        event.page = (self.offset - self.page_size) // self.page_size + 1
+        event.items = items
+        self.api_server.emit("page_fetched", event)
+
+    def close(self):
+        """Stop any background requests for upcoming pages. Items that have already
+        been received can still be iterated over
+        """
+        while self._prefetched:
+            _, future = self._prefetched.pop()
+            future.cancel()
+        self.planned_offset = self.offset  # cancelled pages will be planned again
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
-        try:  # Return an item from the last response
-            return self.current_page_iterator.__next__()
-        except StopIteration:
-            if self.might_have_more:
+    def __next__(self) -> Dict:
+        while True:
+            try:  # Return an item from the last response
+                item = self.current_page_iterator.__next__()
+            except StopIteration:
+                if self.stream and self.page_size and self.received is not None:
+                    self.emit_page_fetched(self.received)
+                    if self.received < self.page_size:
+                        # streamed page had less items than requested. It was the last
+                        self.might_have_more = False
+                        self.close()
+                    self.received = None  # this page has been handled
+                    self.resume_at = 0
+                if not self.might_have_more:
+                    # we were already at the last page. End of iteration
+                    raise
                 # the last response items ran out, but there could be more. get.
                 self.get_next_page()
-                return self.current_page_iterator.__next__()
-            else:
-                # we were already at the last page. End of iteration
+                continue
+            except ClockifyClientException:
+                # a streamed page broke off. The next call will request it again
+                self.retry_current_page()
                 raise
+            self.received += 1
+            if self.received > self.resume_at:
+                return item
+
+    def retry_current_page(self):
+        """Forget the page that is being received, so that it is requested again.
+        Items of it that were returned already are skipped when it is
+        """
+        self.resume_at = max(self.resume_at, self.received)
+        self.offset -= self.page_size
+        self.current_page_number -= 1
+        self.received = None
+        self.current_page_iterator = iter([])
+        self.close()  # pages planned after this one will be planned again
 
     def __iter__(self):
         return self
 
 
+class RetryPolicy:
+    # http methods that can be sent more than once without changing the outcome
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30,
+        retry_statuses: Tuple[int, ...] = (429, 502, 503, 504),
+        retry_non_idempotent: bool = False,
+    ):
+        """Decides which failed calls to retry and how long to wait before that.
+        Waits grow exponentially with full jitter, or follow the Retry-After
+        header if the server sends one
+
+        Parameters
+        ----------
+        max_retries: int, optional
+            Give up after this many retries. Defaults to 3
+        backoff_factor: float, optional
+            Wait at most backoff_factor * 2 ** attempt seconds before retrying.
+            Defaults to 0.5
+        max_backoff: float, optional
+            Never wait longer than this many seconds, unless the server asks for it
+            with Retry-After. Defaults to 30
+        retry_statuses: Tuple[int], optional
+            Retry calls that return these http status codes. Defaults to
+            429, 502, 503 and 504
+        retry_non_idempotent: bool, optional
+            Also retry POST and PATCH calls. This might create duplicate items
+            if the first call did reach the server. Defaults to False
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def should_retry(
+        self, method: str, attempt: int, status_code: Optional[int] = None
+    ) -> bool:
+        """Whether to retry a failed call
+
+        Parameters
+        ----------
+        method: str
+            http method of the call, like 'GET'
+        attempt: int
+            Number of retries done for this call so far
+        status_code: int, optional
+            http status code of the response. Defaults to None, meaning the call
+            failed without a response, for example because of a connection error
+        """
+        if attempt >= self.max_retries:
+            return False
+        if not (self.retry_non_idempotent or method in self.IDEMPOTENT_METHODS):
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def get_wait(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before the next retry
+
+        Parameters
+        ----------
+        attempt: int
+            Number of retries done for this call so far
+        retry_after: str, optional
+            Value of the Retry-After header sent by the server, either seconds or
+            a http date. Defaults to None
+        """
+        if retry_after:
+            wait = self.parse_retry_after(retry_after)
+            if wait is not None:
+                return wait
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        return random.uniform(0, backoff)
+
+    @staticmethod
+    def parse_retry_after(retry_after: str) -> Optional[float]:
+        """Seconds to wait according to a Retry-After header. None if the header
+        cannot be parsed
+        """
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
+
+
+class PageSizePolicy:
+    """Decides how many items to request for each page of a paged endpoint"""
+
+    def get_page_size(self, offset: int) -> int:
+        """Number of items to request for the page starting at offset
+
+        Parameters
+        ----------
+        offset: int
+            Number of items in all pages before this one
+
+        Returns
+        -------
+        int
+            Page size. offset must be a multiple of this, as clockify pages are
+            numbered, not offset
+        """
+        raise NotImplementedError()
+
+    def get_page(self, offset: int) -> Tuple[int, int]:
+        """Page number and page size to request the page starting at offset
+
+        Raises
+        ------
+        ValueError
+            If the page size does not line up with offset
+        """
+        page_size = self.get_page_size(offset)
+        if offset % page_size:
+            raise ValueError(
+                f"Page size {page_size} cannot be used to get items starting at "
+                f"{offset}. Offset must be a multiple of page size"
+            )
+        return offset // page_size + 1, page_size
+
+
+class FixedPageSize(PageSizePolicy):
+    def __init__(self, page_size: int = 50):
+        """Request the same number of items for each page
+
+        Parameters
+        ----------
+        page_size: int, optional
+            Number of items per page. Defaults to 50
+        """
+        self.page_size = page_size
+
+    def get_page_size(self, offset: int) -> int:
+        return self.page_size
+
+
+class AdaptivePageSize(PageSizePolicy):
+    MAX_PAGE_SIZE = 5000  # largest page size accepted by the clockify API
+
+    def __init__(
+        self,
+        initial: int = 50,
+        maximum: int = MAX_PAGE_SIZE,
+        limit: Optional[int] = None,
+    ):
+        """Size the first page to the number of items needed, then double the page
+        size with each page, up to maximum. Keeps round-trips low for large scans
+        without downloading too much for small ones
+
+        Parameters
+        ----------
+        initial: int, optional
+            Size of the first page if limit is not given. Defaults to 50
+        maximum: int, optional
+            Never request more than this number of items per page. Defaults to
+            MAX_PAGE_SIZE
+        limit: int, optional
+            The number of items that will be consumed, if known. Size of the
+            first page. Defaults to None
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.limit = limit
+
+    @property
+    def first_page_size(self) -> int:
+        if self.limit:
+            return min(self.limit, self.maximum)
+        return min(self.initial, self.maximum)
+
+    def get_page_size(self, offset: int) -> int:
+        page_size = self.first_page_size
+        # sizes double from one page to the next, so each page size divides offset
+        while (
+            offset and page_size * 2 <= self.maximum and offset % (page_size * 2) == 0
+        ):
+            page_size *= 2
+        return page_size
+
+
 class APIRawResponse:
-    def __init__(self, raw_response):
+    def __init__(self, raw_response, json_codec: Optional[JSONCodec] = None):
         """A response as received from an API server
 
         Parameters
         ----------
         raw_response: requests response
+        json_codec: JSONCodec, optional
+            Decodes the response body. Defaults to the standard library json
         """
         self.raw_response = raw_response
+        self.json_codec = json_codec or StdlibJSONCodec()
 
     def parse(self):
         """Return API response as dict. If the response encodes an API error, raise Exception
@@ -267,7 +1010,7 @@ class APIRawResponse:
 
         """
         if self.raw_response.status_code in [200, 201]:
-            return self.parse_json(self.raw_response)
+            return self.parse_json(self.raw_response, self.json_codec)
         else:
             error_response = self.parse_json_clockify_error(self.raw_response)
             msg = f"HTTP {self.raw_response.status_code} containing API error '{self.raw_response.text}'"
@@ -276,14 +1019,64 @@ class APIRawResponse:
             else:
                 raise APIServerException(msg, error_response=error_response)
 
+    def parse_stream(self) -> Iterator:
+        """Like parse(), but for a response that is a JSON array. Items are decoded
+        while the response body is being received
+
+        Raises
+        ------
+        APIServer404:
+            When the raw response describes an API code 404 exception
+        APIServerException
+            When the raw response describes any other API exception
+        APIResponseParseException
+            When iterating, if the response cannot be parsed as a JSON array
+
+        Returns
+        -------
+        Iterator
+            The items in the array
+        """
+        if self.raw_response.status_code not in [200, 201]:
+            return self.parse()  # raises the error in the response
+        return self.iter_stream_items(self.raw_response)
+
+    @staticmethod
+    def iter_stream_items(response) -> Iterator:
+        """Items of the JSON array in response, decoded while it is received
+
+        Raises
+        ------
+        APIResponseParseException
+            If the response cannot be parsed as a JSON array
+        ClockifyClientException
+            If receiving the response failed halfway
+        """
+        try:
+            yield from iter_json_array(
+                response.iter_content(chunk_size=CHUNK_SIZE),
+                encoding=response.encoding or "utf-8",
+            )
+        except JSONDecodeError as e:
+            msg = f"Could not parse streamed response as JSON array: {e}"
+            raise APIResponseParseException(msg) from e
+        except RequestException as e:
+            msg = f"Requests error while receiving streamed response: {e}"
+            raise ClockifyClientException(msg) from e
+        finally:
+            response.close()
+
     @staticmethod
-    def parse_json(response):
-        """Parse response json string from server into object
+    def parse_json(response, json_codec: Optional[JSONCodec] = None):
+        """Parse response json from server into object. Decodes the response
+        bytes directly, without decoding them to text first
 
         Parameters
         ----------
         response: requests.response
             containing json encoded string received from API
+        json_codec: JSONCodec, optional
+            Codec to decode with. Defaults to the standard library json
 
         Raises
         ------
@@ -296,9 +1089,10 @@ class APIRawResponse:
             Parsed json
 
         """
+        json_codec = json_codec or StdlibJSONCodec()
         try:
-            return response.json()
-        except JSONDecodeError:
+            return json_codec.loads(response.content)
+        except ValueError:
             msg = f"Could not parse response as JSON: '{response.text}'"
             raise APIResponseParseException(msg)
 
@@ -319,7 +1113,7 @@ class APIRawResponse:
         -------
         APIErrorResponse
         """
-        parsed = self.parse_json(error_text)
+        parsed = self.parse_json(error_text, self.json_codec)
         # clockify api errors use either 'description' or 'message' for human readable component.
         if "message" in parsed.keys():
             message = parsed["message"]
@@ -0,0 +1,367 @@
+"""Asyncio version of api.APIServer. Non-blocking http interaction with a clockify
+API server, returning the same json as the blocking version.
+
+Requires aiohttp. Install with 'pip install clockifyclient[async]'
+"""
+import asyncio
+import json
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from clockifyclient.api import (
+    AdaptivePageSize,
+    APIRawResponse,
+    PageSizePolicy,
+    RetryPolicy,
+)
+from clockifyclient.exceptions import ClockifyClientException
+from clockifyclient.jsoncodec import JSONCodec, get_codec
+from clockifyclient.ratelimit import RateLimiter
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is an optional dependency
+    aiohttp = None
+
+
+class AsyncAPIServer:
+    """Models a clockify API server. Async counterpart of api.APIServer
+
+    All calls share one aiohttp connection pool, which can handle a large number
+    of concurrent calls. Call close() or use as async context manager to release
+    connections when done.
+
+    Notes
+    -----
+    For higher level interactions, see async_client.AsyncClockifyAPI
+    """
+
+    def __init__(
+        self,
+        url,
+        max_connections: int = 100,
+        max_connections_per_host: int = 0,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        json_codec: Optional[JSONCodec] = None,
+    ):
+        """
+
+        Parameters
+        ----------
+        url: str
+            url of the api
+        max_connections: int, optional
+            Maximum number of simultaneously open connections. 0 means no limit.
+            Defaults to 100
+        max_connections_per_host: int, optional
+            Maximum number of simultaneously open connections to a single host.
+            0 means no limit. Defaults to 0
+        rate_limiter: RateLimiter, optional
+            Wait for this limiter before each call. Defaults to None, meaning calls
+            are not limited
+        retry_policy: RetryPolicy, optional
+            Decides whether and when to retry calls that failed with a transient
+            error. Defaults to None, meaning calls are never retried
+        json_codec: JSONCodec, optional
+            Encodes request data and decodes responses. Defaults to the fastest
+            installed codec, see jsoncodec.get_codec()
+        """
+        if aiohttp is None:
+            raise ClockifyClientException(
+                "AsyncAPIServer requires aiohttp. Install with "
+                "'pip install clockifyclient[async]'"
+            )
+        self.url = url
+        self.host = urlparse(url).netloc
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.retry_count = 0  # total number of retries done by this server
+        self.json_codec = json_codec or get_codec()
+        self._session = None
+        self._headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """The pooled http session used for all calls. Created on first use. Must
+        be accessed from within a running event loop
+        """
+        if self._session is None or self._session.closed:
+            self._session = self.create_session()
+        return self._session
+
+    def create_session(self) -> "aiohttp.ClientSession":
+        """A new http session with a connection pool configured for this server"""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections, limit_per_host=self.max_connections_per_host
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    async def close(self):
+        """Close all pooled connections. The server can still be used after this,
+        a new session will be created on the next call
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_headers(self, api_key: str) -> Dict[str, str]:
+        """Default headers for calls with the given api key. Built once per key"""
+        try:
+            return self._headers[api_key]
+        except KeyError:
+            headers = {"X-Api-key": api_key, "content-type": "application/json"}
+            self._headers[api_key] = headers
+            return headers
+
+    async def request(self, method, path, api_key, params=None, data=None):
+        """Perform a http call to this server and read the full response
+
+        Parameters
+        ----------
+        method: str
+            http method like 'GET' or 'POST'
+        path: str
+            relative path to endpoint. Like '/user' or '/workspaces'
+        api_key: str
+            api key to send with request
+        params: Dict, optional
+            Request parameters to send. Defaults to None
+        data: Dict, optional
+            data to send as json. Defaults to None
+
+        Raises
+        ------
+        ClockifyClientException
+            When the server cannot be reached or the call fails or times out,
+            also after retrying
+
+        Returns
+        -------
+        BufferedResponse
+            The raw response
+        """
+        attempt = 0
+        while True:
+            try:
+                response = await self.send(method, path, api_key, params, data)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not self.should_retry(method, attempt):
+                    msg = f"aiohttp error: {type(e).__name__} {e}"
+                    raise ClockifyClientException(msg) from e
+                wait = self.retry_policy.get_wait(attempt)
+            else:
+                if not self.should_retry(method, attempt, response.status_code):
+                    return response
+                wait = self.retry_policy.get_wait(
+                    attempt, retry_after=response.headers.get("Retry-After")
+                )
+            attempt += 1
+            self.retry_count += 1
+            await asyncio.sleep(wait)
+
+    def should_retry(self, method, attempt, status_code=None) -> bool:
+        """Whether a failed call should be tried again according to retry_policy"""
+        return bool(self.retry_policy) and self.retry_policy.should_retry(
+            method, attempt, status_code
+        )
+
+    async def send(self, method, path, api_key, params=None, data=None):
+        """Perform a single http call to this server, without retries"""
+        if self.rate_limiter:
+            wait = self.rate_limiter.reserve(api_key=api_key, host=self.host)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        async with self.session.request(
+            method,
+            self.url + path,
+            headers=self.get_headers(api_key),
+            params=params,
+            data=None if data is None else self.json_codec.dumps(data),
+        ) as response:
+            content = await response.read()
+            return BufferedResponse(
+                status_code=response.status, content=content, headers=response.headers
+            )
+
+    async def get(self, path, api_key, params=None):
+        """
+
+        Parameters
+        ----------
+        path: str
+            relative path to endpoint. Like '/user' or '/workspaces'
+        api_key: str
+            api key to send with request
+        params: Dict, optional
+            Request parameters to send. Defaults to empty dict
+
+        Returns
+        -------
+        Dict or List:
+            Json-interpreted response from server
+
+        """
+        if not params:
+            params = {}
+        response_raw = await self.request("GET", path, api_key, params=params)
+        return APIRawResponse(response_raw, self.json_codec).parse()
+
+    def get_iterator(
+        self, path, api_key, params=None, page_size_policy: PageSizePolicy = None
+    ) -> "AsyncPagedGetIterator":
+        """A get request that iterates over items with 'async for' and calls API
+        again for more items if needed
+
+        Parameters
+        ----------
+        path: str
+            relative path to endpoint. Like '/user' or '/workspaces'
+        api_key: str
+            api key to send with request
+        params: Dict, optional
+            Request parameters to send. Defaults to empty dict
+        page_size_policy: PageSizePolicy, optional
+            Decides the number of items to request for each page. Defaults to
+            AdaptivePageSize()
+
+        Returns
+        -------
+        AsyncPagedGetIterator
+
+        """
+        return AsyncPagedGetIterator(
+            api_server=self,
+            path=path,
+            api_key=api_key,
+            params=params,
+            page_size_policy=page_size_policy,
+        )
+
+    async def post(self, path, api_key, data):
+        """Post data as json. Returns json-interpreted response from server"""
+        response_raw = await self.request("POST", path, api_key, data=data)
+        return APIRawResponse(response_raw, self.json_codec).parse()
+
+    async def put(self, path, api_key, data):
+        """Put data as json. Returns json-interpreted response from server"""
+        response_raw = await self.request("PUT", path, api_key, data=data)
+        return APIRawResponse(response_raw, self.json_codec).parse()
+
+    async def patch(self, path, api_key, data):
+        """Patch data as json. Returns json-interpreted response from server"""
+        response_raw = await self.request("PATCH", path, api_key, data=data)
+        return APIRawResponse(response_raw, self.json_codec).parse()
+
+
+class AsyncPagedGetIterator:
+    def __init__(
+        self,
+        api_server: AsyncAPIServer,
+        path: str,
+        api_key: str,
+        params: Dict[str, str] = None,
+        page_size_policy: PageSizePolicy = None,
+    ):
+        """Async counterpart of api.PagedGetIterator. Use with 'async for'
+
+        Parameters
+        ----------
+        api_server: AsyncAPIServer
+            Server to call
+        path: str
+            relative path to endpoint. Like '/user' or '/workspaces'
+        api_key: str
+            api key to send with request
+        params: Dict, optional
+            Request parameters to send. Defaults to empty dict
+        page_size_policy: PageSizePolicy, optional
+            Decides the number of items to request for each page. Defaults to
+            AdaptivePageSize()
+        """
+        self.api_server = api_server
+        self.path = path
+        self.api_key = api_key
+        if not params:
+            params = {}
+        self.params = params
+        self.current_page_iterator = iter([])
+        self.current_page_number = 0
+        if not page_size_policy:
+            page_size_policy = AdaptivePageSize()
+        self.page_size_policy = page_size_policy
+        self.page_size = None  # size of the last page that was requested
+        self.offset = 0  # number of items in all pages received so far
+        self.might_have_more = True
+
+    async def get_response(self, page: int, page_size: int) -> List[Dict]:
+        """Get responses for given page"""
+        params = dict(self.params)
+        params["page"] = str(page)
+        params["page-size"] = str(page_size)
+        response_raw = await self.api_server.request(
+            "GET", self.path, self.api_key, params=params
+        )
+        return APIRawResponse(response_raw, self.api_server.json_codec).parse()
+
+    async def get_next_page(self):
+        """Try to call API for the next batch of results"""
+        self.current_page_number += 1
+        page, self.page_size = self.page_size_policy.get_page(self.offset)
+        items = await self.get_response(page=page, page_size=self.page_size)
+        self.offset += self.page_size
+        if len(items) < self.page_size:
+            # less items than requested were returned. This is the last page
+            self.might_have_more = False
+        self.current_page_iterator = iter(items)
+
+    async def __anext__(self) -> Dict:
+        try:  # Return an item from the last response
+            return next(self.current_page_iterator)
+        except StopIteration:
+            pass
+        if self.might_have_more:
+            # the last response items ran out, but there could be more. get.
+            await self.get_next_page()
+            try:
+                return next(self.current_page_iterator)
+            except StopIteration:
+                pass
+        raise StopAsyncIteration
+
+    def __aiter__(self):
+        return self
+
+
+class BufferedResponse:
+    def __init__(self, status_code: int, content: bytes, headers=None):
+        """A fully read http response. Offers the parts of the requests.Response
+        interface that APIRawResponse uses
+
+        Parameters
+        ----------
+        status_code: int
+            http status code, like 200 or 404
+        content: bytes
+            response body
+        headers: Mapping, optional
+            response headers. Defaults to empty dict
+        """
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
@@ -0,0 +1,287 @@
+"""Asyncio versions of client.ClockifyAPI and client.APISession. Return the same
+model objects as their blocking counterparts
+
+Requires aiohttp. Install with 'pip install clockifyclient[async]'
+"""
+import asyncio
+import datetime
+from typing import AsyncIterator, List, Optional
+
+from clockifyclient.api import AdaptivePageSize, APIServer404, PageSizePolicy
+from clockifyclient.async_api import AsyncAPIServer
+from clockifyclient.cache import TTLCache
+from clockifyclient.models import (
+    ClockifyDatetime,
+    Project,
+    Task,
+    TimeEntry,
+    TimeEntryQuery,
+    User,
+    Workspace,
+)
+
+
+class AsyncAPISession:
+    """Async counterpart of client.APISession. Models the interaction of one user
+    with one workspace. Caches current user, workspace and projects.
+    """
+
+    def __init__(
+        self,
+        api_server: AsyncAPIServer,
+        api_key: str,
+        cache_ttl: Optional[float] = 300,
+        cache_size: int = 128,
+    ):
+        """
+        Parameters
+        ----------
+        api_server: AsyncAPIServer
+            Server to use for communication
+        api_key: str
+            Clockify Api key
+        cache_ttl: float, optional
+            Seconds to keep workspace, user, projects and tasks before asking the
+            server again. None means keep forever. Defaults to 300
+        cache_size: int, optional
+            Maximum number of results to cache. Defaults to 128
+        """
+        self.api_key = api_key
+        self.api = AsyncClockifyAPI(api_server=api_server)
+        self.cache = TTLCache(ttl=cache_ttl, max_size=cache_size)
+
+    async def _cached(self, key, coroutine_function, *args):
+        """Await coroutine_function(*args) once and cache the result. Concurrent
+        callers for the same key share a single call. Failures are not cached
+        """
+        task = self.cache.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coroutine_function(*args))
+            self.cache.set(key, task)
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            if self.cache.get(key) is task:
+                self.cache.invalidate(key)
+            raise
+
+    def invalidate_cache(self, project: Optional[Project] = None):
+        """Forget cached results. See client.APISession.invalidate_cache"""
+        if project:
+            self.cache.invalidate("projects")
+            self.cache.invalidate(("tasks", project.obj_id))
+        else:
+            self.cache.clear()
+
+    async def get_default_workspace(self) -> Workspace:
+        return await self._cached("workspace", self._get_default_workspace)
+
+    async def _get_default_workspace(self):
+        return (await self.api.get_workspaces(api_key=self.api_key))[0]
+
+    async def get_user(self) -> User:
+        return await self._cached("user", self.api.get_user, self.api_key)
+
+    async def get_projects(self) -> List[Project]:
+        return await self._cached("projects", self._get_projects)
+
+    async def _get_projects(self):
+        return await self.api.get_projects(
+            api_key=self.api_key, workspace=await self.get_default_workspace()
+        )
+
+    async def get_tasks(self, project: Project) -> List[Task]:
+        return await self._cached(("tasks", project.obj_id), self._get_tasks, project)
+
+    async def _get_tasks(self, project: Project):
+        return await self.api.get_tasks(
+            api_key=self.api_key,
+            workspace=await self.get_default_workspace(),
+            project=project,
+        )
+
+    async def add_time_entries(self, entries: List[TimeEntry]) -> List[TimeEntry]:
+        """Add all entries concurrently. Returns saved entries in input order"""
+        return list(
+            await asyncio.gather(*(self.add_time_entry_object(x) for x in entries))
+        )
+
+    async def add_time_entry_object(self, time_entry: TimeEntry) -> TimeEntry:
+        """Add the given time entry to the default workspace"""
+        return await self.api.add_time_entry_object(
+            api_key=self.api_key,
+            workspace=await self.get_default_workspace(),
+            time_entry=time_entry,
+        )
+
+    async def add_time_entry(
+        self, start_time, end_time=None, description=None, project=None
+    ) -> TimeEntry:
+        """Add a time entry to default workspace. If no end time is given stopwatch
+        mode is activated. See client.APISession.add_time_entry
+        """
+        time_entry = TimeEntry(
+            obj_id=None,
+            start=start_time,
+            description=description,
+            project=project,
+            end=end_time,
+        )
+        return await self.add_time_entry_object(time_entry=time_entry)
+
+    async def stop_timer(self, stop_time=None) -> Optional[TimeEntry]:
+        """Halt the current timer. Returns the stopped entry, or None if no timer
+        was running
+        """
+        if not stop_time:
+            stop_time = self.now()
+
+        return await self.api.set_active_time_entry_end(
+            api_key=self.api_key,
+            workspace=await self.get_default_workspace(),
+            user=await self.get_user(),
+            end_time=stop_time,
+        )
+
+    async def get_time_entries(
+        self, query: TimeEntryQuery, limit: Optional[int]
+    ) -> List[TimeEntry]:
+        """All time entries obtained from server, up to limit"""
+        return await self.api.get_time_entries(
+            api_key=self.api_key,
+            workspace=await self.get_default_workspace(),
+            user=await self.get_user(),
+            query=query,
+            limit=limit,
+        )
+
+    @staticmethod
+    def now():
+        return datetime.datetime.utcnow()
+
+
+class AsyncClockifyAPI:
+    """Async counterpart of client.ClockifyAPI. Returns python objects. Does not
+    know about http requests
+    """
+
+    def __init__(self, api_server: AsyncAPIServer):
+        """
+
+        Parameters
+        ----------
+        api_server: AsyncAPIServer
+            Server to use for communication
+        """
+        self.api_server = api_server
+
+    async def get_workspaces(self, api_key) -> List[Workspace]:
+        response = await self.api_server.get(path="/workspaces", api_key=api_key)
+        return [Workspace.init_from_dict(x) for x in response]
+
+    async def get_user(self, api_key) -> User:
+        response = await self.api_server.get(path="/user", api_key=api_key)
+        return User.init_from_dict(response)
+
+    async def get_projects(self, api_key, workspace) -> List[Project]:
+        response = await self.api_server.get(
+            path=f"/workspaces/{workspace.obj_id}/projects", api_key=api_key
+        )
+        return [Project.init_from_dict(x) for x in response]
+
+    async def get_tasks(
+        self, api_key: str, workspace: Workspace, project: Project
+    ) -> List[Task]:
+        response = await self.api_server.get(
+            path=f"/workspaces/{workspace.obj_id}/projects/{project.obj_id}/tasks",
+            api_key=api_key,
+        )
+        return [Task.init_from_dict(x) for x in response]
+
+    async def add_time_entry_object(
+        self, api_key: str, workspace: Workspace, time_entry: TimeEntry
+    ) -> TimeEntry:
+        """Save the given TimeEntry instance to server. If TimeEntry.obj_id is set
+        will update existing. If TimeEntry.obj_id is None will add instance as new
+        """
+        if time_entry.obj_id:
+            await self.api_server.put(
+                path=f"/workspaces/{workspace.obj_id}/time-entries/"
+                f"{time_entry.obj_id}",
+                api_key=api_key,
+                data=time_entry.to_dict(),
+            )
+            return time_entry
+        else:
+            result = await self.api_server.post(
+                path=f"/workspaces/{workspace.obj_id}/time-entries",
+                api_key=api_key,
+                data=time_entry.to_dict(),
+            )
+            return TimeEntry.init_from_dict(result)
+
+    async def get_time_entries(
+        self,
+        api_key: str,
+        workspace: Workspace,
+        user: User,
+        query: TimeEntryQuery,
+        limit: Optional[int] = None,
+    ) -> List[TimeEntry]:
+        """Get all time entries corresponding to search criteria, up to limit"""
+        entries = []
+        if limit is not None and limit <= 0:
+            return entries
+        async for entry in self.get_time_entries_iterator(
+            api_key,
+            workspace,
+            user,
+            query,
+            page_size_policy=AdaptivePageSize(limit=limit),
+        ):
+            entries.append(entry)
+            if limit is not None and len(entries) >= limit:
+                break
+        return entries
+
+    async def get_time_entries_iterator(
+        self,
+        api_key: str,
+        workspace: Workspace,
+        user: User,
+        query: TimeEntryQuery,
+        page_size_policy: Optional[PageSizePolicy] = None,
+    ) -> AsyncIterator[TimeEntry]:
+        """Get all time entries corresponding to search criteria. Use with
+        'async for'
+
+        Notes
+        -----
+        This method might make multiple calls to the API if the number of results
+        does not fit in one page
+        """
+        iterator = self.api_server.get_iterator(
+            path=f"/workspaces/{workspace.obj_id}/user/{user.obj_id}/time-entries",
+            api_key=api_key,
+            params=query.to_dict(),
+            page_size_policy=page_size_policy,
+        )
+        async for item in iterator:
+            yield TimeEntry.init_from_dict(item)
+
+    async def set_active_time_entry_end(
+        self, api_key: str, workspace: Workspace, user: User, end_time: datetime
+    ) -> Optional[TimeEntry]:
+        """Set the end time for the currently active entry. Returns None if there
+        was no active time entry
+        """
+        try:
+            result = await self.api_server.patch(
+                path=f"/workspaces/{workspace.obj_id}/user/{user.obj_id}/time-entries/",
+                api_key=api_key,
+                data={"end": str(ClockifyDatetime(end_time))},
+            )
+        except APIServer404:
+            return None
+
+        return TimeEntry.init_from_dict(result)
@@ -0,0 +1,369 @@
+"""Column-wise storage of many time entries, for analysis of large histories
+without creating a TimeEntry object per entry.
+
+Uses NumPy arrays if requested and installed, python arrays otherwise
+"""
+import datetime
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import dateutil.tz
+
+from clockifyclient.models import (
+    APIObject,
+    ClockifyDatetime,
+    ObjectParseException,
+    ProjectStub,
+    TaskStub,
+    TimeEntry,
+)
+
+try:
+    import numpy
+except ImportError:  # numpy is an optional dependency
+    numpy = None
+
+# epoch value for a missing end time, for entries that are still running
+NO_END = -(2 ** 63)
+
+
+class TimeEntryBatch:
+    def __init__(
+        self,
+        ids: List[str],
+        starts: Sequence[int],
+        ends: Sequence[int],
+        descriptions: List[str],
+        project_ids: List[str],
+        project_index: Sequence[int],
+        task_ids: List[str],
+        task_index: Sequence[int],
+    ):
+        """Time entries stored as columns. Build with TimeEntryBatch.from_dicts()
+        or TimeEntryBatchBuilder instead of calling this directly
+
+        Parameters
+        ----------
+        ids: List[str]
+            Id of each entry
+        starts: Sequence[int]
+            Start of each entry, in seconds since epoch
+        ends: Sequence[int]
+            End of each entry, in seconds since epoch. NO_END for running entries
+        descriptions: List[str]
+            Description of each entry
+        project_ids: List[str]
+            All distinct project ids in this batch
+        project_index: Sequence[int]
+            For each entry the index of its project in project_ids. -1 for entries
+            without project
+        task_ids: List[str]
+            All distinct task ids in this batch
+        task_index: Sequence[int]
+            For each entry the index of its task in task_ids. -1 for entries
+            without task
+        """
+        self.ids = ids
+        self.starts = starts
+        self.ends = ends
+        self.descriptions = descriptions
+        self.project_ids = project_ids
+        self.project_index = project_index
+        self.task_ids = task_ids
+        self.task_index = task_index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __str__(self):
+        return f"TimeEntryBatch ({len(self)} entries)"
+
+    def __getitem__(self, row: int) -> TimeEntry:
+        """The time entry at row, as a TimeEntry object"""
+        if row < 0:
+            row += len(self)
+        end = int(self.ends[row])
+        project_index = int(self.project_index[row])
+        task_index = int(self.task_index[row])
+        return TimeEntry(
+            obj_id=self.ids[row],
+            start=self.to_datetime(int(self.starts[row])),
+            description=self.descriptions[row],
+            project=(
+                ProjectStub(self.project_ids[project_index])
+                if project_index >= 0
+                else None
+            ),
+            task=TaskStub(self.task_ids[task_index]) if task_index >= 0 else None,
+            end=None if end == NO_END else self.to_datetime(end),
+        )
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+    @property
+    def uses_numpy(self) -> bool:
+        return numpy is not None and isinstance(self.starts, numpy.ndarray)
+
+    @staticmethod
+    def to_datetime(epoch: int) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(epoch, tz=dateutil.tz.UTC)
+
+    @classmethod
+    def from_dicts(
+        cls, dicts: Iterable[Dict], use_numpy: bool = False
+    ) -> "TimeEntryBatch":
+        """Build a batch from time entry dicts as returned by the clockify API
+
+        Parameters
+        ----------
+        dicts: Iterable[Dict]
+            Time entries as returned by the API
+        use_numpy: bool, optional
+            Store numeric columns as NumPy arrays. Defaults to False
+
+        Raises
+        ------
+        ObjectParseException
+            If any dict is not a valid time entry
+        """
+        builder = TimeEntryBatchBuilder()
+        for dict_in in dicts:
+            builder.add_dict(dict_in)
+        return builder.build(use_numpy=use_numpy)
+
+    def durations(self, until: Optional[int] = None):
+        """Duration of each entry in seconds
+
+        Parameters
+        ----------
+        until: int, optional
+            For entries that are still running, count duration until this epoch
+            time. Defaults to None, meaning running entries have duration 0
+        """
+        if self.uses_numpy:
+            running = self.ends == NO_END
+            ends = numpy.where(
+                running, self.starts if until is None else until, self.ends
+            )
+            return ends - self.starts
+        durations = array("q")
+        for start, end in zip(self.starts, self.ends):
+            if end == NO_END:
+                end = start if until is None else until
+            durations.append(end - start)
+        return durations
+
+    def total_duration(self, until: Optional[int] = None) -> int:
+        """Summed duration of all entries in seconds. See durations()"""
+        return int(sum(self.durations(until=until)))
+
+    def filter(
+        self,
+        project_id: Optional[str] = None,
+        task_id: Optional[str] = None,
+        start_from: Optional[datetime.datetime] = None,
+        start_before: Optional[datetime.datetime] = None,
+        description_contains: Optional[str] = None,
+    ) -> "TimeEntryBatch":
+        """Entries that match all given criteria, as a new batch
+
+        Parameters
+        ----------
+        project_id: str, optional
+            Only entries for this project
+        task_id: str, optional
+            Only entries for this task
+        start_from: datetime, optional
+            Only entries starting at or after this time
+        start_before: datetime, optional
+            Only entries starting before this time
+        description_contains: str, optional
+            Only entries with this text in their description
+        """
+        masks = []
+        if project_id is not None:
+            masks.append(self._equals(self.project_index, self.project_ids, project_id))
+        if task_id is not None:
+            masks.append(self._equals(self.task_index, self.task_ids, task_id))
+        if start_from is not None:
+            from_epoch = int(ClockifyDatetime(start_from).datetime.timestamp())
+            masks.append(self._compare(self.starts, lambda x: x >= from_epoch))
+        if start_before is not None:
+            before_epoch = int(ClockifyDatetime(start_before).datetime.timestamp())
+            masks.append(self._compare(self.starts, lambda x: x < before_epoch))
+        if description_contains is not None:
+            masks.append([description_contains in x for x in self.descriptions])
+
+        if self.uses_numpy:
+            selected = numpy.ones(len(self), dtype=bool)
+            for mask in masks:
+                selected &= numpy.asarray(mask, dtype=bool)
+            return self.take(numpy.flatnonzero(selected))
+        if not masks:
+            return self.take(range(len(self)))
+        return self.take([i for i, row in enumerate(zip(*masks)) if all(row)])
+
+    def _equals(self, index_column, ids: List[str], obj_id: str):
+        """Mask for rows where the interned id in index_column equals obj_id"""
+        try:
+            wanted = ids.index(obj_id)
+        except ValueError:
+            wanted = -2  # not in this batch. Never matches, also not 'no id' (-1)
+        return self._compare(index_column, lambda x: x == wanted)
+
+    def _compare(self, column, condition):
+        if self.uses_numpy:
+            return condition(column)
+        return [condition(x) for x in column]
+
+    def take(self, rows: Sequence[int]) -> "TimeEntryBatch":
+        """A new batch with only the given rows, in the given order"""
+        if self.uses_numpy:
+            rows = numpy.asarray(rows, dtype=numpy.int64)
+            starts = self.starts[rows]
+            ends = self.ends[rows]
+            project_index = self.project_index[rows]
+            task_index = self.task_index[rows]
+        else:
+            starts = array("q", (self.starts[i] for i in rows))
+            ends = array("q", (self.ends[i] for i in rows))
+            project_index = array("i", (self.project_index[i] for i in rows))
+            task_index = array("i", (self.task_index[i] for i in rows))
+        return TimeEntryBatch(
+            ids=[self.ids[i] for i in rows],
+            starts=starts,
+            ends=ends,
+            descriptions=[self.descriptions[i] for i in rows],
+            project_ids=self.project_ids,
+            project_index=project_index,
+            task_ids=self.task_ids,
+            task_index=task_index,
+        )
+
+    def group_by_project(self, until: Optional[int] = None) -> Dict[str, int]:
+        """Total duration in seconds per project id. Entries without project are
+        under None. See durations()
+        """
+        return self._group_durations(self.project_index, self.project_ids, until)
+
+    def group_by_task(self, until: Optional[int] = None) -> Dict[str, int]:
+        """Total duration in seconds per task id. Entries without task are under
+        None. See durations()
+        """
+        return self._group_durations(self.task_index, self.task_ids, until)
+
+    def _group_durations(self, index_column, ids: List[str], until):
+        durations = self.durations(until=until)
+        if self.uses_numpy:
+            # shift by one so that 'no id' (-1) gets bin 0
+            totals = numpy.bincount(
+                index_column + 1, weights=durations, minlength=len(ids) + 1
+            )
+        else:
+            totals = [0] * (len(ids) + 1)
+            for index, duration in zip(index_column, durations):
+                totals[index + 1] += duration
+        return {
+            (ids[i - 1] if i else None): int(total)
+            for i, total in enumerate(totals)
+            if total
+        }
+
+
+class TimeEntryBatchBuilder:
+    def __init__(self):
+        """Collects time entries one by one into compact columns"""
+        self.ids = []
+        self.starts = array("q")
+        self.ends = array("q")
+        self.descriptions = []
+        self.project_ids = []
+        self.project_index = array("i")
+        self.task_ids = []
+        self.task_index = array("i")
+        self._project_lookup = {}
+        self._task_lookup = {}
+        self._interned = {}  # descriptions are often repeated
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _intern(lookup: Dict[str, int], ids: List[str], obj_id: Optional[str]):
+        if not obj_id:
+            return -1
+        try:
+            return lookup[obj_id]
+        except KeyError:
+            lookup[obj_id] = len(ids)
+            ids.append(obj_id)
+            return lookup[obj_id]
+
+    def add_dict(self, dict_in: Dict):
+        """Add a time entry dict as returned by the clockify API
+
+        Raises
+        ------
+        ObjectParseException
+            If dict_in is not a valid time entry
+        """
+        interval = APIObject.get_item(dict_in, "timeInterval")
+        start = interval.get("start")
+        if not start:
+            raise ObjectParseException(f"No start time in {dict_in}")
+        end = interval.get("end")
+        try:
+            start_epoch = int(ClockifyDatetime.parse(start).timestamp())
+            end_epoch = int(ClockifyDatetime.parse(end).timestamp()) if end else NO_END
+        except ValueError as e:
+            raise ObjectParseException(f"Error parsing time in {dict_in}: {e}") from e
+        description = APIObject.get_item(dict_in, "description") or ""
+
+        self.ids.append(APIObject.get_item(dict_in, "id"))
+        self.starts.append(start_epoch)
+        self.ends.append(end_epoch)
+        self.descriptions.append(self._interned.setdefault(description, description))
+        self.project_index.append(
+            self._intern(
+                self._project_lookup, self.project_ids, dict_in.get("projectId")
+            )
+        )
+        self.task_index.append(
+            self._intern(self._task_lookup, self.task_ids, dict_in.get("taskId"))
+        )
+
+    def build(self, use_numpy: bool = False) -> TimeEntryBatch:
+        """The collected entries as a batch
+
+        Parameters
+        ----------
+        use_numpy: bool, optional
+            Store numeric columns as NumPy arrays. Start and end columns share
+            memory with this builder, so no entries can be added after building.
+            Defaults to False
+
+        Raises
+        ------
+        ImportError
+            If use_numpy is True but numpy is not installed
+        """
+        starts, ends = self.starts, self.ends
+        project_index, task_index = self.project_index, self.task_index
+        if use_numpy:
+            if numpy is None:
+                raise ImportError("use_numpy=True requires numpy to be installed")
+            starts = numpy.frombuffer(starts, dtype=numpy.int64)
+            ends = numpy.frombuffer(ends, dtype=numpy.int64)
+            project_index = numpy.array(project_index, dtype=numpy.int64)
+            task_index = numpy.array(task_index, dtype=numpy.int64)
+        return TimeEntryBatch(
+            ids=self.ids,
+            starts=starts,
+            ends=ends,
+            descriptions=self.descriptions,
+            project_ids=self.project_ids,
+            project_index=project_index,
+            task_ids=self.task_ids,
+            task_index=task_index,
+        )
@@ -0,0 +1,86 @@
+"""Perform many independent API calls concurrently, collecting the outcome of each
+call instead of stopping at the first failure
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List
+
+from clockifyclient.exceptions import ClockifyClientException
+
+
+class BulkWriteResult:
+    def __init__(self, item, result=None, exception=None):
+        """Outcome of writing a single item in a bulk write
+
+        Parameters
+        ----------
+        item: Any
+            The item that was written
+        result: Any, optional
+            Value returned by the write. Defaults to None
+        exception: ClockifyClientException, optional
+            Exception raised by the write if it failed. Defaults to None
+        """
+        self.item = item
+        self.result = result
+        self.exception = exception
+
+    @property
+    def success(self) -> bool:
+        return self.exception is None
+
+    def __str__(self):
+        if self.success:
+            return f"Written {self.item}"
+        else:
+            return f"Failed {self.item}: {self.exception}"
+
+
+class BulkWriter:
+    def __init__(self, max_workers: int = 4):
+        """Calls a write function for many items using a pool of threads
+
+        Parameters
+        ----------
+        max_workers: int, optional
+            Maximum number of simultaneous calls. Defaults to 4. Use 1 to write
+            items one by one
+        """
+        self.max_workers = max_workers
+
+    @staticmethod
+    def write_item(function: Callable[[Any], Any], item) -> BulkWriteResult:
+        """Call function(item) and capture the result or the exception raised"""
+        try:
+            return BulkWriteResult(item=item, result=function(item))
+        except ClockifyClientException as e:
+            return BulkWriteResult(item=item, exception=e)
+
+    def write(
+        self, function: Callable[[Any], Any], items: Iterable
+    ) -> List[BulkWriteResult]:
+        """Call function for each item. Failures for one item do not stop the
+        others
+
+        Parameters
+        ----------
+        function: Callable
+            write function taking a single item
+        items: Iterable
+            items to write
+
+        Returns
+        -------
+        List[BulkWriteResult]
+            Outcome for each item, in the same order as items
+        """
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [self.write_item(function, item) for item in items]
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(items)),
+            thread_name_prefix="clockify-bulk",
+        ) as executor:
+            return list(
+                executor.map(lambda item: self.write_item(function, item), items)
+            )
@@ -0,0 +1,136 @@
+"""Caching of API results that change rarely, like workspaces and projects"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class CacheStatistics:
+    def __init__(self):
+        """Counts of cache lookups"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # removed to stay under max size
+        self.expirations = 0  # removed because ttl had passed
+
+    def __str__(self):
+        return (
+            f"{self.hits} hits, {self.misses} misses ({self.hit_ratio:.0%} hit ratio)"
+        )
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups that were hits. 0 if there were no lookups"""
+        if not self.lookups:
+            return 0.0
+        return self.hits / self.lookups
+
+    def as_dict(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+class TTLCache:
+    def __init__(self, ttl: float = 300, max_size: int = 128, clock=time.monotonic):
+        """Keeps values for at most ttl seconds. When full, the least recently used
+        value is dropped. Thread-safe
+
+        Parameters
+        ----------
+        ttl: float, optional
+            Seconds a value stays valid. None means values never expire.
+            Defaults to 300
+        max_size: int, optional
+            Maximum number of values to keep. Defaults to 128
+        clock: Callable, optional
+            Returns the current time in seconds. Defaults to time.monotonic
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.statistics = CacheStatistics()
+        self._values = OrderedDict()  # key: (expiry time, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key: Hashable):
+        with self._lock:
+            return self._get_valid(key) is not None
+
+    def _get_valid(self, key: Hashable):
+        """(expiry, value) for key, or None if key is not there or expired. Must be
+        called while holding the lock
+        """
+        try:
+            expiry, value = self._values[key]
+        except KeyError:
+            return None
+        if expiry is not None and expiry <= self.clock():
+            del self._values[key]
+            self.statistics.expirations += 1
+            return None
+        return expiry, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value for key, or default if key is not in cache or has expired"""
+        with self._lock:
+            found = self._get_valid(key)
+            if found is None:
+                self.statistics.misses += 1
+                return default
+            self.statistics.hits += 1
+            self._values.move_to_end(key)
+            return found[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Store value for key, replacing any earlier value"""
+        expiry = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._values[key] = (expiry, value)
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+                self.statistics.evictions += 1
+
+    def get_or_set(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """Value for key. If not in cache, call function, store and return result.
+        Exceptions raised by function are not stored
+        """
+        with self._lock:
+            found = self._get_valid(key)
+            if found is not None:
+                self.statistics.hits += 1
+                self._values.move_to_end(key)
+                return found[1]
+            self.statistics.misses += 1
+        value = function()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable):
+        """Remove key from cache, if it is there"""
+        with self._lock:
+            self._values.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]):
+        """Remove all keys for which predicate(key) is True"""
+        with self._lock:
+            for key in [x for x in self._values if predicate(x)]:
+                del self._values[key]
+
+    def clear(self):
+        """Remove all values. Statistics are kept"""
+        with self._lock:
+            self._values.clear()
@@ -1,9 +1,20 @@
 # -*- coding: utf-8 -*-
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from itertools import islice
 from typing import Generator, List, Optional
 
-from clockifyclient.api import APIServer, APIServer404
+from clockifyclient.api import (
+    AdaptivePageSize,
+    APIServer,
+    APIServer404,
+    PageSizePolicy,
+)
+from clockifyclient.batch import TimeEntryBatch
+from clockifyclient.bulk import BulkWriter, BulkWriteResult
+from clockifyclient.cache import TTLCache
+from clockifyclient.identity import IdentityMap
 from clockifyclient.models import (
     Task,
     TimeEntryQuery,
@@ -13,12 +24,11 @@ from clockifyclient.models import (
     TimeEntry,
     ClockifyDatetime,
 )
-from functools import lru_cache
 
 
 class APISession:
     """Models the interaction of one user with one workspace. Caches current user,
-    workspace and projects.
+    workspace, projects and tasks for cache_ttl seconds.
 
     To make basic interactions quicker this class makes two simplifying assumptions:
     * All actions pertain to one user, the owner of the api_key
@@ -26,7 +36,13 @@ class APISession:
 
     """
 
-    def __init__(self, api_server: APIServer, api_key: str):
+    def __init__(
+        self,
+        api_server: APIServer,
+        api_key: str,
+        cache_ttl: Optional[float] = 300,
+        cache_size: int = 1024,
+    ):
         """
         Parameters
         ----------
@@ -34,35 +50,141 @@ class APISession:
             Server to use for communication
         api_key: str
             Clockify Api key
+        cache_ttl: float, optional
+            Seconds to keep workspace, user, projects and tasks before asking the
+            server again. None means keep forever. Defaults to 300
+        cache_size: int, optional
+            Maximum number of results to cache. Each project's tasks count as
+            one result, so bootstrap() needs the number of projects plus 3.
+            Defaults to 1024
         """
         self.api_key = api_key
         self.api = ClockifyAPI(api_server=api_server)
+        self.cache = TTLCache(ttl=cache_ttl, max_size=cache_size)
+        # one object per project and task id for everything this session returns
+        self.identity_map = IdentityMap()
 
-    @lru_cache()
     def get_default_workspace(self):
-        return self.api.get_workspaces(api_key=self.api_key)[0]
+        return self.cache.get_or_set(
+            "workspace", lambda: self.api.get_workspaces(api_key=self.api_key)[0]
+        )
 
-    @lru_cache()
     def get_user(self):
-        return self.api.get_user(api_key=self.api_key)
+        return self.cache.get_or_set(
+            "user", lambda: self.api.get_user(api_key=self.api_key)
+        )
 
-    @lru_cache()
     def get_projects(self):
-        return self.api.get_projects(
-            api_key=self.api_key, workspace=self.get_default_workspace()
+        return self.cache.get_or_set(
+            "projects",
+            lambda: self.identity_map.add_all(
+                self.api.get_projects(
+                    api_key=self.api_key, workspace=self.get_default_workspace()
+                )
+            ),
         )
 
-    @lru_cache()
     def get_tasks(self, project: Project):
-        return self.api.get_tasks(
-            api_key=self.api_key,
-            workspace=self.get_default_workspace(),
-            project=project,
+        return self.cache.get_or_set(
+            ("tasks", project.obj_id),
+            lambda: self.identity_map.add_all(
+                self.api.get_tasks(
+                    api_key=self.api_key,
+                    workspace=self.get_default_workspace(),
+                    project=project,
+                )
+            ),
         )
 
-    def add_time_entries(self, entries: List[TimeEntry]):
-        for entry in entries:
-            self.add_time_entry_object(entry)
+    def bootstrap(self, max_workers: int = 8, tasks: bool = True):
+        """Fill the cache with workspace, user, projects and the tasks of all
+        projects. Calls that do not depend on each other are made concurrently,
+        so the tasks of many projects take about as long as those of a few
+
+        Parameters
+        ----------
+        max_workers: int, optional
+            Make at most this many calls at the same time. Defaults to 8
+        tasks: bool, optional
+            Get the tasks of all projects as well. Defaults to True
+
+        Raises
+        ------
+        ValueError
+            If tasks is True and the cache is too small to hold the tasks of all
+            projects. See check_cache_size(). Raised before any tasks are
+            requested
+        """
+        with ThreadPoolExecutor(
+            max_workers=max(2, max_workers), thread_name_prefix="clockify-bootstrap"
+        ) as executor:
+            user = executor.submit(self.get_user)  # does not need the workspace
+            projects = self.get_projects()
+            if tasks:
+                self.check_cache_size(len(projects))
+                list(executor.map(self.get_tasks, projects))
+            user.result()
+
+    def check_cache_size(self, project_count: int):
+        """Make sure the cache can hold workspace, user, projects and the tasks of
+        project_count projects at the same time
+
+        Raises
+        ------
+        ValueError
+            If cache_size is too small
+        """
+        required = project_count + 3
+        if self.cache.max_size < required:
+            raise ValueError(
+                f"cache_size {self.cache.max_size} cannot hold the tasks of "
+                f"{project_count} projects. Use a cache_size of at least {required}"
+            )
+
+    def invalidate_cache(self, project: Optional[Project] = None):
+        """Forget cached results, so that they are requested from server again
+
+        Parameters
+        ----------
+        project: Project, optional
+            Only forget projects and the tasks for this project. Defaults to None,
+            meaning forget everything
+        """
+        if project:
+            self.cache.invalidate("projects")
+            self.cache.invalidate(("tasks", project.obj_id))
+        else:
+            self.cache.clear()
+
+    def add_time_entries(
+        self, entries: List[TimeEntry], max_workers: int = 4
+    ) -> List[BulkWriteResult]:
+        """Save all given time entries to the default workspace. New entries are
+        added, entries with an obj_id are updated. Entries are saved concurrently
+
+        Parameters
+        ----------
+        entries: List[TimeEntry]
+            The time entries to save
+        max_workers: int, optional
+            Save at most this many entries simultaneously. Defaults to 4
+
+        Returns
+        -------
+        List[BulkWriteResult]
+            Outcome for each entry, in the same order as entries. A failure to save
+            one entry does not stop the others. BulkWriteResult.result holds the
+            saved TimeEntry for successes
+
+        """
+        workspace = self.get_default_workspace()  # get once, not in each thread
+
+        def save(entry):
+            return self.api.add_time_entry_object(
+                api_key=self.api_key, workspace=workspace, time_entry=entry
+            )
+
+        return BulkWriter(max_workers=max_workers).write(save, entries)
 
     def add_time_entry_object(self, time_entry: TimeEntry):
         """Add the given time entry to the default workspace
@@ -146,7 +268,11 @@ class APISession:
         )
 
     def get_time_entries(
-        self, query: TimeEntryQuery, limit: Optional[int]
+        self,
+        query: TimeEntryQuery,
+        limit: Optional[int],
+        prefetch: int = 0,
+        lazy: bool = False,
     ) -> List[TimeEntry]:
         """
 
@@ -157,6 +283,18 @@ class APISession:
         limit: Optional[int]
             retrieve at most this number of items. Limits calls to the server.
             Defaults to retrieving all items
+        prefetch: int, optional
+            Request this many pages ahead in the background. Defaults to 0
+        lazy: bool, optional
+            Return LazyTimeEntry objects, which parse fields on first access.
+            Faster when only a few fields of each entry are read.
+            Defaults to False
+
+        Notes
+        -----
+        Entries share project and task objects with each other and with
+        get_projects() and get_tasks(). Projects and tasks are stubs until those
+        have been called
 
         Returns
         -------
@@ -170,6 +308,44 @@ class APISession:
             user=self.get_user(),
             query=query,
             limit=limit,
+            prefetch=prefetch,
+            lazy=lazy,
+            identity_map=self.identity_map,
+        )
+
+    def get_time_entries_batch(
+        self,
+        query: TimeEntryQuery,
+        limit: Optional[int] = None,
+        use_numpy: bool = False,
+        prefetch: int = 0,
+    ) -> TimeEntryBatch:
+        """Time entries for query as a column-wise batch. Uses much less memory
+        than get_time_entries() for large numbers of entries
+
+        Parameters
+        ----------
+        query: TimeEntryQuery
+            get time entries corresponding to this query
+        limit: Optional[int]
+            retrieve at most this number of items. Defaults to retrieving all items
+        use_numpy: bool, optional
+            Store numeric columns as NumPy arrays. Defaults to False
+        prefetch: int, optional
+            Request this many pages ahead in the background. Defaults to 0
+
+        Returns
+        -------
+        TimeEntryBatch
+        """
+        return self.api.get_time_entries_batch(
+            api_key=self.api_key,
+            workspace=self.get_default_workspace(),
+            user=self.get_user(),
+            query=query,
+            limit=limit,
+            use_numpy=use_numpy,
+            prefetch=prefetch,
         )
 
     @staticmethod
@@ -321,6 +497,9 @@ class ClockifyAPI:
         user: User,
         query: TimeEntryQuery,
         limit: Optional[int] = None,
+        prefetch: int = 0,
+        lazy: bool = False,
+        identity_map: Optional[IdentityMap] = None,
     ) -> List[TimeEntry]:
         """Get all time entries corresponding to search criteria
 
@@ -338,35 +517,147 @@ class ClockifyAPI:
             Retrieve this number of items maximum, potentially calling
             the server less. Defaults to None which means
             all items are retrieved.
+        prefetch: int, optional
+            Request this many pages ahead in the background. Defaults to 0
+        lazy: bool, optional
+            Return LazyTimeEntry objects, which parse fields on first access.
+            Defaults to False
+        identity_map: IdentityMap, optional
+            Take projects and tasks of entries from this map. Defaults to None,
+            meaning each entry gets its own project and task stubs
 
         Notes
         -----
         This method might make multiple calls to the API if the number of results
-        is over 50
+        does not fit in one page. The first call requests limit items if limit is
+        given
         """
-        return list(
-            islice(
-                self.get_time_entries_iterator(api_key, workspace, user, query), limit
+        with closing(
+            self.get_time_entries_iterator(
+                api_key,
+                workspace,
+                user,
+                query,
+                prefetch=prefetch,
+                page_size_policy=AdaptivePageSize(limit=limit),
+                lazy=lazy,
+                identity_map=identity_map,
             )
-        )
+        ) as entries:
+            return list(islice(entries, limit))
 
     def get_time_entries_iterator(
-        self, api_key: str, workspace: Workspace, user: User, query: TimeEntryQuery
+        self,
+        api_key: str,
+        workspace: Workspace,
+        user: User,
+        query: Optional[TimeEntryQuery] = None,
+        prefetch: int = 0,
+        page_size_policy: Optional[PageSizePolicy] = None,
+        stream: bool = False,
+        lazy: bool = False,
+        identity_map: Optional[IdentityMap] = None,
     ) -> Generator[TimeEntry, None, None]:
         """Get all time entries corresponding to search criteria
 
+        Parameters
+        ----------
+        api_key: str
+            Clockify Api key
+        workspace: Workspace
+            Get projects in this workspace
+        user: User
+            User for time entries
+        query: TimeEntryQuery, optional
+            filter time entries with this query, on the server. Defaults to None,
+            meaning all time entries
+        prefetch: int, optional
+            Request this many pages ahead in the background. Defaults to 0
+        page_size_policy: PageSizePolicy, optional
+            Decides the number of entries to request per call. Defaults to
+            AdaptivePageSize()
+        stream: bool, optional
+            Create each entry as soon as it has been received, instead of after
+            receiving the whole page. Keeps memory use flat for large pages.
+            Defaults to False
+        lazy: bool, optional
+            Yield LazyTimeEntry objects, which parse fields on first access.
+            Defaults to False
+        identity_map: IdentityMap, optional
+            Take projects and tasks of entries from this map. Defaults to None
+
         Notes
         -----
         This method might make multiple calls to the API if the number of results
-        is over 50
+        does not fit in one page. Closing the returned generator stops any
+        background requests
         """
         iterator = self.api_server.get_iterator(
             path=f"/workspaces/{workspace.obj_id}/user/{user.obj_id}/time-entries",
             api_key=api_key,
-            params=query.to_dict(),
+            params=query.to_dict() if query else {},
+            prefetch=prefetch,
+            page_size_policy=page_size_policy,
+            stream=stream,
         )
+        with iterator:
+            for item in iterator:
+                yield TimeEntry.init_from_dict(
+                    item, lazy=lazy, identity_map=identity_map
+                )
 
-        return (TimeEntry.init_from_dict(x) for x in iterator)
+    def get_time_entries_batch(
+        self,
+        api_key: str,
+        workspace: Workspace,
+        user: User,
+        query: TimeEntryQuery,
+        limit: Optional[int] = None,
+        use_numpy: bool = False,
+        prefetch: int = 0,
+        stream: bool = True,
+    ) -> TimeEntryBatch:
+        """Get all time entries corresponding to search criteria as a column-wise
+        batch. Entries go straight from the API response into the batch columns,
+        without creating TimeEntry objects
+
+        Parameters
+        ----------
+        api_key: str
+            Clockify Api key
+        workspace: Workspace
+            Get projects in this workspace
+        user: User
+            User for time entries
+        query: TimeEntryQuery:
+            filter time entries with this query
+        limit: Optional[int]
+            Retrieve this number of items maximum. Defaults to None which means
+            all items are retrieved.
+        use_numpy: bool, optional
+            Store numeric columns as NumPy arrays. Defaults to False
+        prefetch: int, optional
+            Request this many pages ahead in the background. Defaults to 0
+        stream: bool, optional
+            Add entries to the batch while each page is being received, so that
+            no page is held in memory as a whole. Defaults to True
+
+        Returns
+        -------
+        TimeEntryBatch
+        """
+        iterator = self.api_server.get_iterator(
+            path=f"/workspaces/{workspace.obj_id}/user/{user.obj_id}/time-entries",
+            api_key=api_key,
+            params=query.to_dict(),
+            prefetch=prefetch,
+            page_size_policy=AdaptivePageSize(limit=limit),
+            stream=stream,
+        )
+        with iterator:
+            return TimeEntryBatch.from_dicts(
+                islice(iterator, limit), use_numpy=use_numpy
+            )
 
     def set_active_time_entry_end(
         self, api_key: str, workspace: Workspace, user: User, end_time: datetime
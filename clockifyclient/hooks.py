@@ -0,0 +1,95 @@
+"""Callbacks around each http call made by APIServer, for feeding timing and
+other telemetry into any monitoring system
+"""
+import re
+from typing import Optional
+
+# path segments that are followed by the id of an object of that kind
+ID_COLLECTIONS = {
+    "workspaces",
+    "user",
+    "projects",
+    "tasks",
+    "time-entries",
+    "clients",
+    "tags",
+}
+
+# clockify object ids are 24 hex characters
+ID_PATTERN = re.compile(r"^[0-9a-f]{24}$")
+
+
+def get_endpoint(path: str) -> str:
+    """path with object ids replaced by '{id}', so that calls to the same
+    endpoint can be grouped. '/workspaces/5e1f.../projects' becomes
+    '/workspaces/{id}/projects'
+    """
+    segments = path.split("/")
+    for i in range(1, len(segments)):
+        if segments[i] and (
+            segments[i - 1] in ID_COLLECTIONS or ID_PATTERN.match(segments[i])
+        ):
+            segments[i] = "{id}"
+    return "/".join(segments)
+
+
+class RequestEvent:
+    def __init__(self, method: str, path: str, attempt: int = 0):
+        """Information about a single http call. Fields are filled in as the call
+        progresses and are None when not known (yet)
+
+        Parameters
+        ----------
+        method: str
+            http method like 'GET' or 'POST'
+        path: str
+            relative path to endpoint. Like '/user' or '/workspaces'
+        attempt: int, optional
+            0 for the first try of a call, 1 for the first retry etc. Defaults to 0
+        """
+        self.method = method
+        self.path = path
+        self.endpoint = get_endpoint(path)
+        self.attempt = attempt
+        self.status_code: Optional[int] = None
+        self.latency: Optional[float] = None  # seconds until response headers
+        self.bytes_received: Optional[int] = None
+        self.exception: Optional[Exception] = None
+        self.wait: Optional[float] = None  # seconds before the retry
+        self.page: Optional[int] = None
+        self.page_size: Optional[int] = None
+        self.items: Optional[int] = None  # number of items in a page
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} ({self.status_code})"
+
+
+class RequestHooks:
+    """Called by APIServer during each call. Override the methods of interest, the
+    default implementations do nothing.
+
+    Hooks are called on the thread making the call, which can be a background
+    thread for prefetched pages. Exceptions raised in a hook are not caught
+    """
+
+    def before_request(self, event: RequestEvent):
+        """Just before a http call is sent. Rate limiting waits are over"""
+
+    def after_response(self, event: RequestEvent):
+        """A response was received. Sets status_code, latency, bytes_received.
+        bytes_received is taken from the Content-Length header for streamed
+        responses and can be None
+        """
+
+    def on_error(self, event: RequestEvent):
+        """A http call failed without response, like a connection error. Sets
+        exception and latency
+        """
+
+    def on_retry(self, event: RequestEvent):
+        """The call described by event will be retried after event.wait seconds"""
+
+    def page_fetched(self, event: RequestEvent):
+        """PagedGetIterator received a page. Sets page, page_size and items. For
+        streamed pages this is called when all items of the page have been read
+        """
@@ -0,0 +1,84 @@
+"""Keep a single object per project and task id, so that many time entries for the
+same project share one Project object instead of each holding its own stub
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from clockifyclient.models import (
+    InternedAPIObject,
+    Project,
+    ProjectStub,
+    Task,
+    TaskStub,
+)
+
+Interned = TypeVar("Interned", bound=InternedAPIObject)
+
+# the class each stub class is upgraded to once its name is known. A stub defines
+# no slots of its own, so its instances can take on the class it derives from
+UPGRADES = {ProjectStub: Project, TaskStub: Task}
+
+
+class IdentityMap:
+    def __init__(self):
+        """One object per (kind, id) for projects and tasks. Thread-safe
+
+        Stubs are returned for ids that have no known name yet. When the full
+        object becomes known through add(), the stub is upgraded in place to a
+        Project or Task with a name. Everything that holds the stub then sees
+        the full object
+        """
+        self._objects: Dict[Tuple[str, str], InternedAPIObject] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def _get_or_stub(self, stub_class, obj_id: Optional[str]):
+        if not obj_id:
+            return None
+        key = (stub_class.kind, obj_id)
+        try:
+            return self._objects[key]
+        except KeyError:
+            with self._lock:
+                return self._objects.setdefault(key, stub_class(obj_id=obj_id))
+
+    def get_project(self, obj_id: Optional[str]) -> Optional[Project]:
+        """The project with this id. A ProjectStub if its name is not known.
+        None if obj_id is empty
+        """
+        return self._get_or_stub(ProjectStub, obj_id)
+
+    def get_task(self, obj_id: Optional[str]) -> Optional[Task]:
+        """The task with this id. A TaskStub if its name is not known. None if
+        obj_id is empty
+        """
+        return self._get_or_stub(TaskStub, obj_id)
+
+    def add(self, obj: Interned) -> Interned:
+        """Register a full object, like a Project returned by the API
+
+        Returns
+        -------
+        InternedAPIObject
+            The object to use for this id. If an object with this id was known
+            already, that object is returned, updated to the name and class of obj
+        """
+        key = (obj.kind, obj.obj_id)
+        with self._lock:
+            known = self._objects.setdefault(key, obj)
+            if known is not obj and obj.name is not None:
+                upgrade = UPGRADES.get(type(known))
+                if upgrade is not None:
+                    known.__class__ = upgrade
+                known.name = obj.name
+            return known
+
+    def add_all(self, objects: Iterable[Interned]) -> List[Interned]:
+        """Register each object, see add(). Returns the objects to use instead"""
+        return [self.add(x) for x in objects]
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
@@ -0,0 +1,114 @@
+"""Encoding and decoding of JSON request and response bodies. Uses orjson or ujson
+when installed, as these are several times faster than the standard library json
+module. Install orjson with 'pip install clockifyclient[fastjson]'
+"""
+import json
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # ujson is an optional dependency
+    ujson = None
+
+
+class JSONCodec:
+    """Converts between python objects and JSON encoded bytes"""
+
+    name = None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """True if the library this codec uses is installed"""
+        return True
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON
+
+        Raises
+        ------
+        ValueError
+            When data is not valid JSON
+        """
+        raise NotImplementedError()
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode obj as UTF-8 JSON"""
+        raise NotImplementedError()
+
+    def __str__(self):
+        return f"{self.name} JSON codec"
+
+
+class StdlibJSONCodec(JSONCodec):
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return orjson is not None
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return ujson is not None
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return ujson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+# All codecs by name, fastest first
+CODECS: Dict[str, type] = {
+    x.name: x for x in (OrjsonCodec, UjsonCodec, StdlibJSONCodec)
+}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """A JSON codec
+
+    Parameters
+    ----------
+    name: str, optional
+        One of the names in CODECS. Defaults to None, meaning the fastest
+        installed codec
+
+    Raises
+    ------
+    ValueError
+        When there is no codec with the given name, or its library is not
+        installed
+    """
+    if name is None:
+        return next(x() for x in CODECS.values() if x.is_available())
+    try:
+        codec_class = CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec '{name}'. Options are {list(CODECS)}")
+    if not codec_class.is_available():
+        raise ValueError(f"JSON codec '{name}' requires {name} to be installed")
+    return codec_class()
@@ -0,0 +1,311 @@
+"""Ready-made collection of client metrics: calls, errors, latency and cache use,
+exportable as a dict or in Prometheus text format.
+
+Register a MetricsCollector with APIServer.add_hooks() or watch_session(). Servers
+without collector do not create any events, so there is no cost when metrics are
+not used
+"""
+import bisect
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Sequence, Tuple
+
+from clockifyclient.cache import CacheStatistics
+from clockifyclient.hooks import RequestEvent, RequestHooks
+
+# upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Counts observed values per bucket, like a Prometheus histogram. Not
+        thread-safe by itself
+
+        Parameters
+        ----------
+        buckets: Sequence[float], optional
+            Upper bounds of the buckets, ascending. A bucket without upper bound
+            is added. Defaults to DEFAULT_BUCKETS
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate of the value below which fraction q of observations fall,
+        interpolated within buckets like Prometheus histogram_quantile(). None if
+        nothing was observed
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if cumulative + count >= rank and count:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # no upper bound to interpolate to
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class EndpointMetrics:
+    def __init__(self, buckets: Sequence[float]):
+        """Counters for calls to a single method and endpoint"""
+        self.requests = 0
+        self.retries = 0
+        self.bytes_received = 0
+        self.errors: Dict[str, int] = defaultdict(int)  # by status or exception
+        self.latency = Histogram(buckets)
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "errors": dict(self.errors),
+            "latency": self.latency.as_dict(),
+        }
+
+
+class MetricsCollector(RequestHooks):
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix="clockify"):
+        """Collects metrics from the hooks of any number of APIServers. Thread-safe
+
+        Parameters
+        ----------
+        buckets: Sequence[float], optional
+            Upper bounds in seconds of the latency histogram buckets. Defaults to
+            DEFAULT_BUCKETS
+        prefix: str, optional
+            Prefix for Prometheus metric names. Defaults to 'clockify'
+        """
+        self.buckets = buckets
+        self.prefix = prefix
+        self.endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self.pages: Dict[str, int] = defaultdict(int)  # by endpoint
+        self.page_items: Dict[str, int] = defaultdict(int)
+        self.caches: Dict[str, CacheStatistics] = {}
+        self._lock = threading.Lock()
+
+    def get_endpoint_metrics(self, event: RequestEvent) -> EndpointMetrics:
+        """Must be called while holding the lock"""
+        key = (event.method, event.endpoint)
+        try:
+            return self.endpoints[key]
+        except KeyError:
+            return self.endpoints.setdefault(key, EndpointMetrics(self.buckets))
+
+    def after_response(self, event: RequestEvent):
+        with self._lock:
+            metrics = self.get_endpoint_metrics(event)
+            metrics.requests += 1
+            metrics.latency.observe(event.latency)
+            metrics.bytes_received += event.bytes_received or 0
+            if event.status_code >= 400:
+                metrics.errors[str(event.status_code)] += 1
+
+    def on_error(self, event: RequestEvent):
+        with self._lock:
+            metrics = self.get_endpoint_metrics(event)
+            metrics.requests += 1
+            metrics.errors[type(event.exception).__name__] += 1
+
+    def on_retry(self, event: RequestEvent):
+        with self._lock:
+            self.get_endpoint_metrics(event).retries += 1
+
+    def page_fetched(self, event: RequestEvent):
+        with self._lock:
+            self.pages[event.endpoint] += 1
+            self.page_items[event.endpoint] += event.items
+
+    def watch_cache(self, name: str, statistics: CacheStatistics):
+        """Include hits, misses and hit ratio of a cache, read when exporting"""
+        self.caches[name] = statistics
+
+    def watch_session(self, session, name: str = "session"):
+        """Collect metrics for all calls made by an APISession, including its
+        cache statistics
+
+        Parameters
+        ----------
+        session: client.APISession
+            Session to watch
+        name: str, optional
+            Name of the session cache in the metrics. Defaults to 'session'
+        """
+        session.api.api_server.add_hooks(self)
+        self.watch_cache(name, session.cache.statistics)
+
+    def reset(self):
+        """Forget all counts. Watched caches keep being watched"""
+        with self._lock:
+            self.endpoints.clear()
+            self.pages.clear()
+            self.page_items.clear()
+
+    def snapshot(self) -> Dict:
+        """All metrics as a dict. Calls are keyed by 'METHOD endpoint'"""
+        with self._lock:
+            return {
+                "requests": {
+                    f"{method} {endpoint}": x.as_dict()
+                    for (method, endpoint), x in self.endpoints.items()
+                },
+                "pages": {
+                    endpoint: {"pages": count, "items": self.page_items[endpoint]}
+                    for endpoint, count in self.pages.items()
+                },
+                "caches": {name: x.as_dict() for name, x in self.caches.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def add(name, metric_type, help_text, samples):
+            name = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{format_labels(labels)} {value}")
+
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            add(
+                "requests_total",
+                "counter",
+                "Number of http calls",
+                [
+                    ("", dict(method=m, endpoint=e), x.requests)
+                    for (m, e), x in endpoints
+                ],
+            )
+            add(
+                "request_errors_total",
+                "counter",
+                "Number of failed http calls by status or exception",
+                [
+                    ("", dict(method=m, endpoint=e, status=status), count)
+                    for (m, e), x in endpoints
+                    for status, count in sorted(x.errors.items())
+                ],
+            )
+            add(
+                "request_retries_total",
+                "counter",
+                "Number of retried http calls",
+                [
+                    ("", dict(method=m, endpoint=e), x.retries)
+                    for (m, e), x in endpoints
+                ],
+            )
+            add(
+                "response_bytes_total",
+                "counter",
+                "Number of response bytes received",
+                [
+                    ("", dict(method=m, endpoint=e), x.bytes_received)
+                    for (m, e), x in endpoints
+                ],
+            )
+            add(
+                "request_duration_seconds",
+                "histogram",
+                "Time until response headers were received",
+                [
+                    sample
+                    for (m, e), x in endpoints
+                    for sample in histogram_samples(
+                        x.latency, dict(method=m, endpoint=e)
+                    )
+                ],
+            )
+            add(
+                "pages_fetched_total",
+                "counter",
+                "Number of pages received by paged iterators",
+                [
+                    ("", dict(endpoint=e), count)
+                    for e, count in sorted(self.pages.items())
+                ],
+            )
+            add(
+                "page_items_total",
+                "counter",
+                "Number of items received by paged iterators",
+                [
+                    ("", dict(endpoint=e), count)
+                    for e, count in sorted(self.page_items.items())
+                ],
+            )
+        caches = sorted(self.caches.items())
+        for field in ("hits", "misses", "evictions", "expirations"):
+            add(
+                f"cache_{field}_total",
+                "counter",
+                f"Number of cache {field}",
+                [("", dict(cache=name), getattr(x, field)) for name, x in caches],
+            )
+        add(
+            "cache_hit_ratio",
+            "gauge",
+            "Fraction of cache lookups that were hits",
+            [("", dict(cache=name), x.hit_ratio) for name, x in caches],
+        )
+        return "\n".join(lines) + "\n"
+
+
+def histogram_samples(histogram: Histogram, labels: Dict[str, str]):
+    """(suffix, labels, value) for each Prometheus sample of histogram"""
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(float(bound))
+        yield "_bucket", dict(labels, le=le), cumulative
+    yield "_sum", labels, histogram.sum
+    yield "_count", labels, histogram.count
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="{escape_label_value(str(value))}"' for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
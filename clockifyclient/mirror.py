@@ -0,0 +1,310 @@
+"""Local SQLite copy of time entries, so that reports do not need to download the
+full history each time. Only entries that are new or recently changed are
+requested from the server on each sync
+"""
+import calendar
+import datetime
+import sqlite3
+from contextlib import closing
+from typing import List, Optional, Set
+
+import dateutil.tz
+
+from clockifyclient.api import AdaptivePageSize
+from clockifyclient.models import (
+    ClockifyDatetime,
+    ProjectStub,
+    TaskStub,
+    TimeEntry,
+    TimeEntryQuery,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS time_entries (
+    workspace_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER,
+    description TEXT NOT NULL,
+    project_id TEXT,
+    task_id TEXT,
+    PRIMARY KEY (workspace_id, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS time_entries_start
+    ON time_entries (workspace_id, user_id, start);
+CREATE INDEX IF NOT EXISTS time_entries_project
+    ON time_entries (workspace_id, user_id, project_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    workspace_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    watermark INTEGER NOT NULL,
+    last_sync INTEGER NOT NULL,
+    PRIMARY KEY (workspace_id, user_id)
+);
+"""
+
+
+def to_timestamp(value: datetime.datetime) -> int:
+    """Epoch time of value. Naive datetimes are taken as UTC, as returned by
+    session.now(). Use query_timestamp() for datetimes given by the user
+    """
+    return calendar.timegm(value.utctimetuple())
+
+
+def query_timestamp(value: datetime.datetime) -> int:
+    """Epoch time of a TimeEntryQuery bound. Naive datetimes are taken as local
+    time, like TimeEntryQuery does when sending them to the server
+    """
+    return to_timestamp(ClockifyDatetime(value).datetime)
+
+
+class SyncResult:
+    def __init__(self, received: int, removed: int, since: Optional[int]):
+        """What happened during a sync
+
+        Parameters
+        ----------
+        received: int
+            Number of entries received from server
+        removed: int
+            Number of local entries in the re-checked period that no longer exist
+            on the server
+        since: int, optional
+            Entries starting at or after this epoch time were requested. None if
+            the full history was requested
+        """
+        self.received = received
+        self.removed = removed
+        self.since = since
+
+    def __str__(self):
+        return f"Sync: {self.received} entries received, {self.removed} removed"
+
+
+class TimeEntryMirror:
+    def __init__(
+        self,
+        path: str,
+        session,
+        recheck_window: datetime.timedelta = datetime.timedelta(days=7),
+    ):
+        """Keeps the time entries of the user and default workspace of session in
+        a local SQLite database. Not thread-safe
+
+        Parameters
+        ----------
+        path: str
+            Path to SQLite database file. Created if it does not exist. One file
+            can hold entries for several workspaces and users
+        session: client.APISession
+            Sync entries for the user and default workspace of this session
+        recheck_window: timedelta, optional
+            On each sync, download again all entries that started this long
+            before the latest entry seen so far, to pick up edits and deletions.
+            Defaults to 7 days
+        """
+        self.path = path
+        self.session = session
+        self.recheck_window = recheck_window
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    @property
+    def scope(self):
+        """workspace id and user id of the entries in this mirror"""
+        workspace = self.session.get_default_workspace()
+        return workspace.obj_id, self.session.get_user().obj_id
+
+    def get_last_sync(self) -> Optional[datetime.datetime]:
+        """Time of the last successful sync, in UTC. None if never synced"""
+        row = self.connection.execute(
+            "SELECT last_sync FROM sync_state WHERE workspace_id=? AND user_id=?",
+            self.scope,
+        ).fetchone()
+        if not row:
+            return None
+        return datetime.datetime.fromtimestamp(row[0], tz=dateutil.tz.UTC)
+
+    def get_watermark(self) -> Optional[int]:
+        """Start of the latest entry received so far, as epoch time. None if
+        never synced
+        """
+        row = self.connection.execute(
+            "SELECT watermark FROM sync_state WHERE workspace_id=? AND user_id=?",
+            self.scope,
+        ).fetchone()
+        return row[0] if row else None
+
+    def sync(self) -> SyncResult:
+        """Get new and recently changed entries from server
+
+        Returns
+        -------
+        SyncResult
+        """
+        workspace = self.session.get_default_workspace()
+        user = self.session.get_user()
+        workspace_id, user_id = workspace.obj_id, user.obj_id
+        watermark = self.get_watermark()
+        if watermark is None:
+            since = None
+            query = None
+        else:
+            since = watermark - int(self.recheck_window.total_seconds())
+            since_datetime = datetime.datetime.fromtimestamp(since, tz=dateutil.tz.UTC)
+            query = TimeEntryQuery(start=since_datetime)
+
+        iterator = self.session.api.get_time_entries_iterator(
+            api_key=self.session.api_key,
+            workspace=workspace,
+            user=user,
+            query=query,
+            page_size_policy=AdaptivePageSize(initial=AdaptivePageSize.MAX_PAGE_SIZE),
+            stream=True,
+        )
+        with closing(iterator):
+            rows = [self.to_row(workspace_id, user_id, x) for x in iterator]
+
+        with self.connection:  # single transaction
+            removed = self.remove_since(workspace_id, user_id, since)
+            removed.difference_update(x[2] for x in rows)
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO time_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            new_watermark = max([x[3] for x in rows], default=watermark or 0)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (
+                    workspace_id,
+                    user_id,
+                    max(new_watermark, watermark or 0),
+                    to_timestamp(self.session.now()),
+                ),
+            )
+        return SyncResult(received=len(rows), removed=len(removed), since=since)
+
+    def remove_since(self, workspace_id, user_id, since: Optional[int]) -> Set[str]:
+        """Remove local entries starting at or after since. None means remove all
+
+        Returns
+        -------
+        Set[str]
+            ids of the removed entries
+        """
+        condition = "workspace_id=? AND user_id=?"
+        parameters = [workspace_id, user_id]
+        if since is not None:
+            condition += " AND start>=?"
+            parameters.append(since)
+        removed = {
+            x[0]
+            for x in self.connection.execute(
+                f"SELECT id FROM time_entries WHERE {condition}", parameters
+            )
+        }
+        self.connection.execute(
+            f"DELETE FROM time_entries WHERE {condition}", parameters
+        )
+        return removed
+
+    @staticmethod
+    def to_row(workspace_id, user_id, entry: TimeEntry):
+        return (
+            workspace_id,
+            user_id,
+            entry.obj_id,
+            to_timestamp(entry.start),
+            to_timestamp(entry.end) if entry.end else None,
+            entry.description or "",
+            entry.project.obj_id if entry.project else None,
+            entry.task.obj_id if entry.task else None,
+        )
+
+    @staticmethod
+    def from_row(row) -> TimeEntry:
+        obj_id, start, end, description, project_id, task_id = row
+        return TimeEntry(
+            obj_id=obj_id,
+            start=datetime.datetime.fromtimestamp(start, tz=dateutil.tz.UTC),
+            description=description,
+            project=ProjectStub(obj_id=project_id) if project_id else None,
+            task=TaskStub(obj_id=task_id) if task_id else None,
+            end=datetime.datetime.fromtimestamp(end, tz=dateutil.tz.UTC)
+            if end is not None
+            else None,
+        )
+
+    def get_time_entries(
+        self, query: Optional[TimeEntryQuery] = None, limit: Optional[int] = None
+    ) -> List[TimeEntry]:
+        """Time entries from the local database, newest first, like the server
+        returns them. Call sync() first to get up to date results
+
+        Parameters
+        ----------
+        query: TimeEntryQuery, optional
+            Only entries matching this query, with the same meaning as on the
+            server. Description matches if it contains the query description,
+            ignoring case. Defaults to all entries
+        limit: int, optional
+            Return at most this many entries. Defaults to all
+
+        Raises
+        ------
+        ValueError
+            If query filters on tags or asks for hydrated entries. The mirror
+            does not store tags or project and task names
+
+        Returns
+        -------
+        List[TimeEntry]
+        """
+        sql = (
+            "SELECT id, start, end, description, project_id, task_id "
+            "FROM time_entries WHERE workspace_id=? AND user_id=?"
+        )
+        parameters = list(self.scope)
+        if query:
+            if query.tags or query.hydrated:
+                raise ValueError(
+                    f"{query} cannot be served by the mirror, which has no tags "
+                    "or project and task names. Query the server instead"
+                )
+            if query.description:
+                sql += " AND description LIKE ? ESCAPE '\\'"
+                escaped = (
+                    query.description.replace("\\", "\\\\")
+                    .replace("%", "\\%")
+                    .replace("_", "\\_")
+                )
+                parameters.append(f"%{escaped}%")
+            if query.start:
+                sql += " AND start>=?"
+                parameters.append(query_timestamp(query.start))
+            if query.end:
+                sql += " AND start<=?"
+                parameters.append(query_timestamp(query.end))
+            if query.project:
+                sql += " AND project_id=?"
+                parameters.append(query.project.obj_id)
+            if query.task:
+                sql += " AND task_id=?"
+                parameters.append(query.task.obj_id)
+            if query.in_progress is not None:
+                sql += " AND end IS NULL" if query.in_progress else " AND end NOT NULL"
+        sql += " ORDER BY start DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [self.from_row(x) for x in self.connection.execute(sql, parameters)]
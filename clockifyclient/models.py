@@ -1,8 +1,12 @@
 """Models the objects with which the clockify API works. One level above json dicts.
 Models as simply as possible, omitting any fields not used by this package
 """
+import datetime
+from typing import Iterable, List, Optional
+
 import dateutil
 import dateutil.parser as date_parser
+import dateutil.tz
 
 from clockifyclient.exceptions import ClockifyClientException
 
@@ -25,7 +29,7 @@ class ClockifyDatetime:
             Set this date time. If no timezone is set, will assume local timezone
         """
         if not datetime_in.tzinfo:
-            datetime_in = datetime_in.replace(tzinfo=dateutil.tz.tzlocal())
+            datetime_in = datetime_in.replace(tzinfo=get_local_timezone())
         self.datetime = datetime_in
 
     @property
@@ -36,27 +40,120 @@ class ClockifyDatetime:
     @property
     def datetime_local(self):
         """Datetime as local time"""
-        return self.datetime.astimezone(dateutil.tz.tzlocal())
+        return self.datetime.astimezone(get_local_timezone())
 
     @property
     def clockify_datetime(self):
         """Datetime a clockify-format string"""
-        return self.datetime_utc.strftime(self.clockify_datetime_format)
+        utc = self.datetime_utc
+        # equivalent to strftime(clockify_datetime_format), but faster
+        return (
+            f"{utc.year:04d}-{utc.month:02d}-{utc.day:02d}T"
+            f"{utc.hour:02d}:{utc.minute:02d}:{utc.second:02d}Z"
+        )
 
     @classmethod
     def init_from_string(cls, clockify_date_string):
-        return cls(date_parser.parse(clockify_date_string))
+        return cls(cls.parse(clockify_date_string))
+
+    @staticmethod
+    def parse(date_string: str) -> datetime.datetime:
+        """Parse a date string as sent by clockify to a timezone aware datetime
+
+        Strings in clockify_datetime_format are parsed directly. Anything else is
+        left to dateutil. Naive results are assumed to be local time
+
+        Raises
+        ------
+        ValueError
+            If date_string cannot be parsed
+        """
+        s = date_string
+        if (
+            len(s) == 20
+            and s[4] == "-"
+            and s[7] == "-"
+            and s[10] == "T"
+            and s[13] == ":"
+            and s[16] == ":"
+            and s[19] == "Z"
+        ):
+            return datetime.datetime(
+                int(s[0:4]),
+                int(s[5:7]),
+                int(s[8:10]),
+                int(s[11:13]),
+                int(s[14:16]),
+                int(s[17:19]),
+                tzinfo=dateutil.tz.UTC,
+            )
+        parsed = date_parser.parse(date_string)
+        if not parsed.tzinfo:
+            parsed = parsed.replace(tzinfo=get_local_timezone())
+        return parsed
+
+    @classmethod
+    def parse_many(
+        cls, date_strings: Iterable[Optional[str]]
+    ) -> List[Optional[datetime.datetime]]:
+        """Parse a sequence of date strings. Like parse(), but faster for many
+        strings. None or empty values yield None
+
+        Raises
+        ------
+        ValueError
+            If any of the strings cannot be parsed
+        """
+        parsed = {}  # time entries often share start and end times
+        result = []
+        for date_string in date_strings:
+            if not date_string:
+                result.append(None)
+                continue
+            try:
+                result.append(parsed[date_string])
+            except KeyError:
+                value = parsed[date_string] = cls.parse(date_string)
+                result.append(value)
+        return result
 
     def __str__(self):
         return self.clockify_datetime
 
 
+_local_timezone = None  # created on first use
+
+
+def get_local_timezone() -> datetime.tzinfo:
+    """The local timezone. Created once, see reset_local_timezone()"""
+    global _local_timezone
+    if _local_timezone is None:
+        _local_timezone = dateutil.tz.tzlocal()
+    return _local_timezone
+
+
+def reset_local_timezone():
+    """Forget the local timezone, so that it is created again on next use. Call
+    this after changing the TZ environment variable
+    """
+    global _local_timezone
+    _local_timezone = None
+
+
 # for indicating a value is not set while allowing None to be a valid value
 NOT_SET = object()
 
 
 class APIObject:
-    """An object that can be returned by the clockify API"""
+    """An object that can be returned by the clockify API
+
+    Model classes define __slots__ to keep instances small, as there can be
+    millions of time entries in memory. Subclasses should define __slots__ as well
+    """
+
+    __slots__ = ("obj_id",)
+
+    kind = "object"
 
     def __init__(self, obj_id):
         """
@@ -137,7 +234,7 @@ class APIObject:
             else:
                 return default
         try:
-            return ClockifyDatetime.init_from_string(date_str).datetime
+            return ClockifyDatetime.parse(date_str)
         except ValueError as e:
             msg = f"Error parsing {date_str} to datetime: '{e}'"
             raise ObjectParseException(msg) from e
@@ -166,6 +263,8 @@ class APIObject:
 
 
 class NamedAPIObject(APIObject):
+    __slots__ = ("name",)
+
     def __init__(self, obj_id, name):
         """
 
@@ -190,17 +289,48 @@ class NamedAPIObject(APIObject):
         )
 
 
+class InternedAPIObject(NamedAPIObject):
+    """A named object that is shared by reference, like the project of many time
+    entries. Objects of the same kind with the same obj_id are equal and hash the
+    same, so a ProjectStub equals the Project with its id. Objects without obj_id
+    are only equal to themselves
+    """
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, InternedAPIObject) or self.obj_id is None:
+            return NotImplemented
+        return self.kind == other.kind and self.obj_id == other.obj_id
+
+    def __hash__(self):
+        if self.obj_id is None:
+            return id(self)
+        return hash((self.kind, self.obj_id))
+
+
 class User(NamedAPIObject):
+    __slots__ = ()
+    kind = "user"
+
     def __str__(self):
         return f"User '{self.name}' ({self.obj_id})"
 
 
 class Workspace(NamedAPIObject):
+    __slots__ = ()
+    kind = "workspace"
+
     def __str__(self):
         return f"Workspace '{self.name}' ({self.obj_id})"
 
 
-class Project(NamedAPIObject):
+class Project(InternedAPIObject):
+    __slots__ = ()
+    kind = "project"
+
     def __str__(self):
         return f"Project '{self.name}' ({self.obj_id})"
 
@@ -210,6 +340,8 @@ class ProjectStub(Project):
     API as part of a different query
     """
 
+    __slots__ = ()
+
     def __init__(self, obj_id):
         super().__init__(obj_id=obj_id, name=None)
 
@@ -217,7 +349,10 @@ class ProjectStub(Project):
         return f"ProjectStub ({self.obj_id})"
 
 
-class Task(NamedAPIObject):
+class Task(InternedAPIObject):
+    __slots__ = ()
+    kind = "task"
+
     def __str__(self):
         return f"Task '{self.name}' ({self.obj_id})"
 
@@ -227,6 +362,8 @@ class TaskStub(Task):
     API as part of a different query
     """
 
+    __slots__ = ()
+
     def __init__(self, obj_id):
         super().__init__(obj_id=obj_id, name=None)
 
@@ -235,6 +372,9 @@ class TaskStub(Task):
 
 
 class TimeEntry(APIObject):
+    __slots__ = ("start", "description", "project", "task", "end")
+    kind = "time_entry"
+
     def __init__(
         self, obj_id, start, description="", project=None, task=None, end=None
     ):
@@ -273,7 +413,28 @@ class TimeEntry(APIObject):
         return f"TimeEntry ({self.obj_id}) - '{self.truncate(self.description)}'"
 
     @classmethod
-    def init_from_dict(cls, dict_in):
+    def init_from_dict(cls, dict_in, lazy=False, identity_map=None):
+        """Create from dict as returned by the API
+
+        Parameters
+        ----------
+        dict_in: Dict
+            time entry as returned by the API
+        lazy: bool, optional
+            Return a LazyTimeEntry that parses each field on first access
+            instead of parsing all fields now. Defaults to False
+        identity_map: identity.IdentityMap, optional
+            Get project and task from this map, so that entries share them.
+            Defaults to None, meaning each entry gets its own stubs
+
+        Raises
+        ------
+        ObjectParseException
+            If dict_in is not a valid time entry. If lazy, raised on first access
+            of a field that cannot be parsed instead
+        """
+        if lazy:
+            return LazyTimeEntry(dict_in, identity_map=identity_map)
         # required parameters
         interval = cls.get_item(dict_in, "timeInterval")
         obj_id = cls.get_item(dict_in=dict_in, key="id")
@@ -281,18 +442,8 @@ class TimeEntry(APIObject):
 
         # optional parameters
         description = cls.get_item(dict_in=dict_in, key="description")
-        project_id = cls.get_item(dict_in=dict_in, key="projectId", default=None)
-        if project_id:
-            project = ProjectStub(obj_id=project_id)
-        else:
-            project = None
-        end = cls.get_datetime(dict_in=interval, key="end", default=None)
-
-        task_id = cls.get_item(dict_in=dict_in, key="taskId", default=None)
-        if task_id:
-            task = TaskStub(obj_id=task_id)
-        else:
-            task = None
+        project = cls.get_project(dict_in, identity_map)
+        task = cls.get_task(dict_in, identity_map)
         end = cls.get_datetime(dict_in=interval, key="end", default=None)
 
         return cls(
@@ -304,6 +455,34 @@ class TimeEntry(APIObject):
             end=end,
         )
 
+    @classmethod
+    def get_project(cls, dict_in, identity_map=None) -> Optional[Project]:
+        """Project for the projectId in dict_in. None if there is no project. Named
+        if dict_in is hydrated, meaning it includes the project itself
+        """
+        project_id = cls.get_item(dict_in=dict_in, key="projectId", default=None)
+        hydrated = dict_in.get("project")
+        if project_id and hydrated:
+            project = Project(obj_id=project_id, name=hydrated.get("name"))
+            return identity_map.add(project) if identity_map is not None else project
+        if identity_map is not None:
+            return identity_map.get_project(project_id)
+        return ProjectStub(obj_id=project_id) if project_id else None
+
+    @classmethod
+    def get_task(cls, dict_in, identity_map=None) -> Optional[Task]:
+        """Task for the taskId in dict_in. None if there is no task. Named if
+        dict_in is hydrated
+        """
+        task_id = cls.get_item(dict_in=dict_in, key="taskId", default=None)
+        hydrated = dict_in.get("task")
+        if task_id and hydrated:
+            task = Task(obj_id=task_id, name=hydrated.get("name"))
+            return identity_map.add(task) if identity_map is not None else task
+        if identity_map is not None:
+            return identity_map.get_task(task_id)
+        return TaskStub(obj_id=task_id) if task_id else None
+
     def to_dict(self):
         """As dict that can be sent to API"""
         as_dict = {
@@ -321,26 +500,134 @@ class TimeEntry(APIObject):
         return {x: y for x, y in as_dict.items() if y}  # remove items with None value
 
 
+def lazy_field(name, parse):
+    """A property for a LazyTimeEntry field. On first access the value is parsed
+    by parse(entry) and stored in the TimeEntry slot of the same name, so
+    later access and assignment work as for a TimeEntry
+    """
+    slot = getattr(TimeEntry, name, None) or getattr(APIObject, name)
+
+    def get(self):
+        try:
+            return slot.__get__(self)
+        except AttributeError:
+            value = parse(self)
+            slot.__set__(self, value)
+            return value
+
+    def set(self, value):
+        slot.__set__(self, value)
+
+    return property(get, set)
+
+
+class LazyTimeEntry(TimeEntry):
+    """A TimeEntry that keeps the dict it was created from and parses each field
+    when it is first read. Scans that read only a few fields of many entries,
+    like description, skip most of the parsing.
+
+    Fields can be assigned as usual. Parse errors are raised as
+    ObjectParseException on first access of the field instead of on creation
+    """
+
+    __slots__ = ("_dict", "_identity_map")
+
+    def __init__(self, dict_in, identity_map=None):
+        """
+
+        Parameters
+        ----------
+        dict_in: Dict
+            time entry as returned by the API
+        identity_map: identity.IdentityMap, optional
+            Get project and task from this map. Defaults to None
+        """
+        self._dict = dict_in
+        self._identity_map = identity_map
+
+    obj_id = lazy_field("obj_id", lambda x: x.get_item(x._dict, "id"))
+    start = lazy_field(
+        "start",
+        lambda x: x.get_datetime(x.get_item(x._dict, "timeInterval"), "start"),
+    )
+    description = lazy_field(
+        "description", lambda x: x.get_item(x._dict, "description")
+    )
+    project = lazy_field("project", lambda x: x.get_project(x._dict, x._identity_map))
+    task = lazy_field("task", lambda x: x.get_task(x._dict, x._identity_map))
+    end = lazy_field(
+        "end",
+        lambda x: x.get_datetime(
+            x.get_item(x._dict, "timeInterval"), "end", default=None
+        ),
+    )
+
+
 class TimeEntryQuery:
-    """A query for the time-entries endpoint"""
+    """A query for the time-entries endpoint. Filters are applied by the server,
+    so only matching entries are transferred
+    """
 
-    def __init__(self, description: str):
+    def __init__(
+        self,
+        description: Optional[str] = None,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        project: Optional[Project] = None,
+        task: Optional[Task] = None,
+        tags: Optional[List[str]] = None,
+        in_progress: Optional[bool] = None,
+        hydrated: bool = False,
+    ):
         """
 
         Parameters
         ----------
-        description: str
-            time entries will be filtered by description.
+        description: str, optional
+            time entries will be filtered by description. Defaults to None
+        start: datetime, UTC, optional
+            only entries that start at or after this time. Defaults to None
+        end: datetime, UTC, optional
+            only entries that start at or before this time. Defaults to None
+        project: Project, optional
+            only entries for this project. Defaults to None
+        task: Task, optional
+            only entries for this task. Defaults to None
+        tags: List[str], optional
+            only entries with these tag ids. Defaults to None
+        in_progress: bool, optional
+            True for only the running entry, False for only finished entries.
+            Defaults to None, meaning both
+        hydrated: bool, optional
+            Have the server include project and task names, so that entries get
+            named projects and tasks instead of stubs. Defaults to False
 
         """
         self.description = description
+        self.start = start
+        self.end = end
+        self.project = project
+        self.task = task
+        self.tags = tags
+        self.in_progress = in_progress
+        self.hydrated = hydrated
 
     def __str__(self):
         return f"TimeEntryQuery ('{self.to_dict()}'"
 
     def to_dict(self):
         """As dict that can be sent to API"""
-        as_dict = {"description": self.description}
+        as_dict = {
+            "description": self.description,
+            "start": str(ClockifyDatetime(self.start)) if self.start else None,
+            "end": str(ClockifyDatetime(self.end)) if self.end else None,
+            "project": self.project.obj_id if self.project else None,
+            "task": self.task.obj_id if self.task else None,
+            "tags": ",".join(self.tags) if self.tags else None,
+            "hydrated": "true" if self.hydrated else None,
+        }
+        if self.in_progress is not None:
+            as_dict["in-progress"] = "true" if self.in_progress else "false"
         return {x: y for x, y in as_dict.items() if y}  # remove items with None value
 
 
@@ -0,0 +1,289 @@
+"""Sessions for many users of the same clockify server, for services that act on
+behalf of many api keys. Sessions share connections and workspace metadata instead
+of each keeping their own
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from clockifyclient.api import APIServer
+from clockifyclient.cache import TTLCache
+from clockifyclient.client import APISession
+from clockifyclient.models import Project
+from clockifyclient.transport import ConcurrencyLimitedTransport
+
+
+def shared_attribute(name: str) -> property:
+    """Attribute that is read from and written to the wrapped api_server"""
+    return property(
+        lambda self: getattr(self.api_server, name),
+        lambda self, value: setattr(self.api_server, name, value),
+    )
+
+
+class ConcurrencyLimitedAPIServer(APIServer):
+    # everything but the transport is api_server's, also when changed later
+    url = shared_attribute("url")
+    host = shared_attribute("host")
+    rate_limiter = shared_attribute("rate_limiter")
+    retry_policy = shared_attribute("retry_policy")
+    retry_count = shared_attribute("retry_count")
+    json_codec = shared_attribute("json_codec")
+    validator_cache = shared_attribute("validator_cache")
+    single_flight = shared_attribute("single_flight")
+    hooks = shared_attribute("hooks")
+    _headers = shared_attribute("_headers")
+
+    def __init__(self, api_server: APIServer, max_concurrent_calls: int):
+        """Makes calls like api_server, but with at most max_concurrent_calls calls
+        through this server in progress at any time. Does not modify api_server
+
+        Parameters
+        ----------
+        api_server: APIServer
+            Server to share settings, hooks, caches and connections with
+        max_concurrent_calls: int
+            Maximum number of calls in progress through this server
+        """
+        self.api_server = api_server
+        self.transport = ConcurrencyLimitedTransport(
+            api_server.transport, max_concurrent_calls
+        )
+
+    def close(self):
+        """Does nothing. The connections belong to api_server"""
+
+
+class PooledSession(APISession):
+    def __init__(
+        self,
+        pool: "SessionPool",
+        api_key: str,
+        cache_ttl: Optional[float] = 300,
+        cache_size: int = 128,
+    ):
+        """An APISession that takes projects and tasks from the metadata cache of
+        its pool. See SessionPool for when these are shared with other sessions.
+        Workspace and user are cached per session, as they depend on the api key
+
+        Parameters
+        ----------
+        pool: SessionPool
+            Pool this session belongs to
+        api_key: str
+            Clockify Api key
+        cache_ttl: float, optional
+            Seconds to keep workspace and user. Defaults to 300
+        cache_size: int, optional
+            Maximum number of results to cache in this session. Defaults to 128
+        """
+        super().__init__(
+            api_server=pool.api_server,
+            api_key=api_key,
+            cache_ttl=cache_ttl,
+            cache_size=cache_size,
+        )
+        self.pool = pool
+
+    @property
+    def metadata_scope(self) -> Optional[str]:
+        """Part of the metadata cache key that decides which sessions share
+        projects and tasks. None when shared by all sessions of a workspace
+        """
+        return None if self.pool.share_metadata else self.api_key
+
+    def get_projects(self):
+        workspace = self.get_default_workspace()
+        projects = self.pool.metadata.get_or_set(
+            ("projects", workspace.obj_id, self.metadata_scope),
+            lambda: self.api.get_projects(api_key=self.api_key, workspace=workspace),
+        )
+        return self.identity_map.add_all(projects)
+
+    def get_tasks(self, project: Project):
+        workspace = self.get_default_workspace()
+        tasks = self.pool.metadata.get_or_set(
+            ("tasks", workspace.obj_id, self.metadata_scope, project.obj_id),
+            lambda: self.api.get_tasks(
+                api_key=self.api_key, workspace=workspace, project=project
+            ),
+        )
+        return self.identity_map.add_all(tasks)
+
+    def check_cache_size(self, project_count: int):
+        """Make sure the metadata cache of the pool can hold projects and the tasks
+        of project_count projects at the same time
+
+        Raises
+        ------
+        ValueError
+            If metadata_size of the pool is too small
+        """
+        required = project_count + 1
+        if self.pool.metadata.max_size < required:
+            raise ValueError(
+                f"metadata_size {self.pool.metadata.max_size} cannot hold the tasks "
+                f"of {project_count} projects. Use a metadata_size of at least "
+                f"{required}"
+            )
+
+    def invalidate_cache(self, project: Optional[Project] = None):
+        """Forget cached results, for this session and, for projects and tasks,
+        for all sessions in the same workspace, whether shared or not
+
+        Parameters
+        ----------
+        project: Project, optional
+            Only forget projects and the tasks for this project. Defaults to None,
+            meaning forget everything
+        """
+        workspace = self.get_default_workspace()
+        super().invalidate_cache(project)
+        self.pool.invalidate_metadata(workspace.obj_id, project)
+
+
+class SessionPool:
+    def __init__(
+        self,
+        api_server: APIServer,
+        max_sessions: int = 256,
+        idle_timeout: Optional[float] = 900,
+        max_concurrent_calls: Optional[int] = None,
+        cache_ttl: Optional[float] = 300,
+        metadata_ttl: Optional[float] = 300,
+        metadata_size: int = 1024,
+        share_metadata: bool = False,
+        clock=time.monotonic,
+    ):
+        """Hands out one session per api key. All sessions use the transport of
+        api_server and so share its connection pool, rate limiter and hooks.
+        Projects and tasks are cached in the pool, so they outlive sessions that
+        are dropped. Thread-safe
+
+        Give api_server a RateLimiter to limit calls per api key
+
+        Parameters
+        ----------
+        api_server: APIServer
+            Server for all sessions. Not modified or closed by the pool. Use a
+            pool_maxsize of at least max_concurrent_calls to avoid opening extra
+            connections
+        max_sessions: int, optional
+            Keep at most this many sessions. When more are needed, the least
+            recently used session is dropped. Defaults to 256
+        idle_timeout: float, optional
+            Drop sessions that were not handed out for this many seconds. None
+            means keep sessions until max_sessions is reached. Defaults to 900
+        max_concurrent_calls: int, optional
+            Make at most this many http calls at the same time, for all sessions
+            of this pool together. Calls made through api_server itself or
+            through other pools are not counted. Defaults to None, meaning no
+            limit
+        cache_ttl: float, optional
+            Seconds each session keeps its workspace and user. Defaults to 300
+        metadata_ttl: float, optional
+            Seconds to keep projects and tasks of a workspace. Defaults to 300
+        metadata_size: int, optional
+            Maximum number of project and task lists to keep, over all
+            workspaces. Defaults to 1024
+        share_metadata: bool, optional
+            Cache projects and tasks once per workspace for all api keys, instead
+            of once per api key. Only set this if all users of a workspace can
+            see the same projects and tasks, as private projects of one user are
+            shown to all others otherwise. Defaults to False
+        clock: Callable, optional
+            Returns the current time in seconds. Defaults to time.monotonic
+        """
+        if max_concurrent_calls:
+            api_server = ConcurrencyLimitedAPIServer(api_server, max_concurrent_calls)
+        self.api_server = api_server
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.cache_ttl = cache_ttl
+        self.share_metadata = share_metadata
+        self.clock = clock
+        self.metadata = TTLCache(ttl=metadata_ttl, max_size=metadata_size, clock=clock)
+        self.evictions = 0  # number of sessions dropped
+        # api key: (last time handed out, session), least recently used first
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, api_key: str):
+        return api_key in self._sessions
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_session(self, api_key: str) -> PooledSession:
+        """The session for api_key. Created if there is none yet"""
+        now = self.clock()
+        with self._lock:
+            self.evict_idle(now)
+            try:
+                _, session = self._sessions.pop(api_key)
+            except KeyError:
+                session = PooledSession(self, api_key, cache_ttl=self.cache_ttl)
+            self._sessions[api_key] = (now, session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+            return session
+
+    def evict_idle(self, now: float):
+        """Drop sessions idle for longer than idle_timeout. Must be called while
+        holding the lock
+        """
+        if self.idle_timeout is None:
+            return
+        while self._sessions:
+            last_used, _ = next(iter(self._sessions.values()))
+            if now - last_used <= self.idle_timeout:
+                return
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def remove(self, api_key: str):
+        """Drop the session for api_key, if there is one"""
+        with self._lock:
+            self._sessions.pop(api_key, None)
+
+    def invalidate_metadata(
+        self, workspace_id: Optional[str] = None, project: Optional[Project] = None
+    ):
+        """Forget cached projects and tasks, so that they are requested again.
+        Applies to the metadata of all api keys
+
+        Parameters
+        ----------
+        workspace_id: str, optional
+            Only forget metadata of this workspace. Defaults to None, meaning
+            forget metadata of all workspaces
+        project: Project, optional
+            Only forget projects and the tasks of this project. Defaults to None
+        """
+        if workspace_id is None:
+            self.metadata.clear()
+            return
+
+        def is_invalid(key):
+            # ("projects", workspace_id, scope) or ("tasks", ..., project_id)
+            if key[1] != workspace_id:
+                return False
+            return key[0] == "projects" or project is None or key[3] == project.obj_id
+
+        self.metadata.invalidate_where(is_invalid)
+
+    def close(self):
+        """Drop all sessions and cached metadata. Connections are not closed, as
+        they belong to the api_server this pool was created with
+        """
+        with self._lock:
+            self._sessions.clear()
+        self.metadata.clear()
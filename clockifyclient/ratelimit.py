@@ -0,0 +1,116 @@
+"""Client-side rate limiting, to stay under the request rate that clockify allows
+instead of running into HTTP 429 responses
+"""
+import threading
+import time
+from typing import Dict, Hashable, Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        """Allows on average rate calls per second, with at most burst calls in
+        quick succession. Thread-safe
+
+        Parameters
+        ----------
+        rate: float
+            Number of calls per second
+        burst: int
+            Maximum number of calls that can be made without waiting
+        clock: Callable, optional
+            Returns the current time in seconds. Defaults to time.monotonic
+        """
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.last_update = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claim a call. Callers are served in order of reservation
+
+        Returns
+        -------
+        float
+            Seconds to wait before making the call. 0 if the call can be made
+            immediately
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.last_update) * self.rate
+            )
+            self.last_update = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """Client-side rate limit for clockify API calls"""
+
+    # clockify allows 50 requests per second per api key. Stay just under that
+    DEFAULT_RATE = 45
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = 10,
+        host_rate: Optional[float] = None,
+        host_burst: Optional[int] = None,
+    ):
+        """Limits calls per api key and optionally per host. Can be shared between
+        servers and threads
+
+        Parameters
+        ----------
+        rate: float, optional
+            Maximum average number of calls per second for each api key.
+            Defaults to DEFAULT_RATE
+        burst: int, optional
+            Number of calls per api key that can be made in quick succession.
+            Defaults to 10
+        host_rate: float, optional
+            Maximum average number of calls per second to each host, for all api
+            keys together. Defaults to None, meaning no limit per host
+        host_burst: int, optional
+            Number of calls to a host that can be made in quick succession.
+            Defaults to burst
+        """
+        self.rate = rate
+        self.burst = burst
+        self.host_rate = host_rate
+        self.host_burst = host_burst or burst
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, key: Hashable, rate: float, burst: int) -> TokenBucket:
+        try:
+            return self._buckets[key]
+        except KeyError:
+            with self._lock:
+                return self._buckets.setdefault(key, TokenBucket(rate, burst))
+
+    def reserve(self, api_key: str, host: str) -> float:
+        """Claim a call for the given api key to the given host
+
+        Returns
+        -------
+        float
+            Seconds to wait before making the call
+        """
+        wait = self.get_bucket(("api_key", api_key), self.rate, self.burst).reserve()
+        if self.host_rate:
+            host_bucket = self.get_bucket(
+                ("host", host), self.host_rate, self.host_burst
+            )
+            wait = max(wait, host_bucket.reserve())
+        return wait
+
+    def acquire(self, api_key: str, host: str):
+        """Block until a call for the given api key to the given host is allowed"""
+        wait = self.reserve(api_key=api_key, host=host)
+        if wait > 0:
+            time.sleep(wait)
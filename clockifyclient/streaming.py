@@ -0,0 +1,138 @@
+"""Decoding of JSON arrays while they are being received, so that items can be
+processed before the whole response has arrived and memory use does not grow
+with the size of the response
+"""
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+# bytes to read from a response at a time
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = " \t\n\r"
+
+
+def is_number(item: Any) -> bool:
+    return isinstance(item, (int, float)) and not isinstance(item, bool)
+
+
+def ends_item(text: str, position: int) -> bool:
+    """True if the next non-whitespace character in text after position ends an
+    array item
+    """
+    rest = text[position : position + 64].lstrip(WHITESPACE)
+    return bool(rest) and rest[0] in ",]"
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[Any]:
+    """Decode the items of a JSON array one by one
+
+    Parameters
+    ----------
+    chunks: Iterable[bytes]
+        Consecutive parts of a JSON encoded array, like the chunks returned by
+        requests.Response.iter_content()
+    encoding: str, optional
+        Encoding of chunks. Defaults to utf-8
+
+    Raises
+    ------
+    json.JSONDecodeError
+        When chunks do not form a valid JSON array. Items before the error have
+        already been returned
+
+    Returns
+    -------
+    Iterator[Any]
+        Decoded items, as soon as each item has been received completely
+    """
+    return JSONArrayReader(chunks, encoding).iter_items()
+
+
+class JSONArrayReader:
+    def __init__(self, chunks: Iterable[bytes], encoding: str = "utf-8"):
+        """Reads the items of a JSON array from chunks, reading only as many chunks
+        as needed for each item. See iter_json_array()
+        """
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder(encoding)()
+        self.chunks = iter(chunks)
+        self.buffer = ""
+        self.position = 0
+        self.finished = False  # no more chunks
+
+    def iter_items(self) -> Iterator[Any]:
+        """Decoded items, as soon as each item has been received completely"""
+        self.expect("[", "Expected JSON array")
+        if self.next_character() == "]":
+            self.position += 1
+        else:
+            while True:
+                yield self.read_item()
+                if not self.read_separator():
+                    break
+        if self.next_character():
+            self.fail("Extra data after JSON array")
+
+    def read_more(self) -> bool:
+        """Add the next chunk to buffer. False if there are no more chunks"""
+        if self.finished:
+            return False
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.finished = True
+            text = self.text_decoder.decode(b"", final=True)
+        else:
+            text = self.text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.position :] + text  # drop what was decoded
+        self.position = 0
+        return True
+
+    def next_character(self) -> str:
+        """Skip whitespace and return the next character, without consuming it.
+        Empty string at end of input
+        """
+        while True:
+            buffer, position = self.buffer, self.position
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            self.position = position
+            if position < len(buffer):
+                return buffer[position]
+            if not self.read_more():
+                return ""
+
+    def expect(self, character: str, message: str):
+        """Consume character, or fail with message if it is not next"""
+        if self.next_character() != character:
+            self.fail(message)
+        self.position += 1
+
+    def read_item(self) -> Any:
+        """Decode the item at position, reading more chunks until it is complete"""
+        while True:
+            if not self.next_character():
+                self.fail("Unterminated JSON array")
+            try:
+                item, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.read_more():
+                    continue  # item is probably not complete yet. Try again
+                raise
+            if is_number(item) and not ends_item(self.buffer, end) and self.read_more():
+                # number could continue in the next chunk, like '1.5' in '1.5e3'
+                continue
+            self.position = end
+            return item
+
+    def read_separator(self) -> bool:
+        """Consume the ',' or ']' after an item. False if it was the last item"""
+        separator = self.next_character()
+        if separator not in (",", "]"):
+            self.fail("Expected ',' or ']'")
+        self.position += 1
+        return separator == ","
+
+    def fail(self, message: str):
+        raise json.JSONDecodeError(message, self.buffer, self.position)
@@ -0,0 +1,402 @@
+"""Transports perform the actual http calls for APIServer. Swap the transport to
+run the client without network access:
+
+* HTTPTransport: pooled, keep-alive http calls with requests. The default
+* ConcurrencyLimitedTransport: limits the number of calls in progress through
+  another transport
+* InMemoryTransport: answers from responses registered in memory. For tests and for
+  profiling the parse and model code without any network cost
+* RecordingTransport: passes calls to another transport and saves each call and its
+  response to a file
+* ReplayTransport: answers calls from a file saved by RecordingTransport, at full
+  speed, for reproducible benchmarks
+"""
+import json
+import re
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.models import Response
+
+from clockifyclient.exceptions import ClockifyClientException
+
+# response headers that describe the body as sent, not as recorded after decoding
+DECODED_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+
+class Transport:
+    """Sends http calls and returns requests.Response objects. Implementations must
+    be thread-safe
+    """
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, str]] = None,
+        data: Union[bytes, str, None] = None,
+        stream: bool = False,
+    ) -> Response:
+        """Perform a single http call
+
+        Parameters
+        ----------
+        method: str
+            http method like 'GET' or 'POST'
+        url: str
+            full url, without query parameters
+        headers: Dict[str, str], optional
+            request headers. Defaults to None
+        params: Dict[str, str], optional
+            query parameters. Defaults to None
+        data: bytes or str, optional
+            encoded request body. Defaults to None
+        stream: bool, optional
+            Return as soon as the response headers have been received, if the
+            transport supports it. Defaults to False
+
+        Raises
+        ------
+        requests.exceptions.ConnectionError
+            When the server could not be reached. Can be retried by APIServer
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """Release any resources like open connections. The transport can still
+        be used after this
+        """
+
+
+class HTTPTransport(Transport):
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+    ):
+        """Http calls through a single pooled requests session which keeps
+        connections alive between calls
+
+        Parameters
+        ----------
+        pool_connections: int, optional
+            Number of hosts to keep a connection pool for. Defaults to 10
+        pool_maxsize: int, optional
+            Maximum number of connections to keep open per host. Defaults to 10
+        pool_block: bool, optional
+            If True, wait for a free connection when pool_maxsize connections to
+            a host are in use. If False, open an extra connection that is discarded
+            after use. Defaults to False
+        keep_alive: bool, optional
+            Re-use connections between calls. Defaults to True
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled http session used for all calls. Created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self.create_session()
+        return self._session
+
+    def create_session(self) -> requests.Session:
+        """A new http session with a connection pool configured for this transport"""
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def request(
+        self, method, url, headers=None, params=None, data=None, stream=False
+    ) -> Response:
+        return self.session.request(
+            method, url, headers=headers, params=params, data=data, stream=stream
+        )
+
+    def close(self):
+        """Close all pooled connections. A new session will be created on the next
+        call
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class InMemoryTransport(Transport):
+    def __init__(self):
+        """Answers calls with responses registered by add() and add_paged(), without
+        any network access. Response bodies are encoded once when registered, so
+        only decoding is measured when profiling. Thread-safe
+
+        Routes are matched in the order they were added. Calls that match no route
+        get a clockify-like 404 response
+        """
+        self.routes: List[Tuple[str, re.Pattern, Any]] = []
+        self.calls: Deque[Tuple[str, str]] = deque(maxlen=1000)  # (method, url)
+
+    def add(
+        self,
+        method: str,
+        path: str,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """Answer calls to path with content
+
+        Parameters
+        ----------
+        method: str
+            http method like 'GET' or 'POST'
+        path: str
+            regular expression matched against the end of the url path, like
+            '/workspaces/\\w+/projects'
+        content: Any
+            response body. Encoded as JSON unless it is bytes already
+        status_code: int, optional
+            http status code. Defaults to 200
+        headers: Dict[str, str], optional
+            response headers. Defaults to None
+        """
+        body = encode_body(content)
+
+        def respond(url, params):
+            return create_response(status_code, body, headers, url)
+
+        self.add_handler(method, path, respond)
+
+    def add_paged(self, path: str, items: List):
+        """Answer GET calls to path with the page of items given by the 'page' and
+        'page-size' parameters, like a paged clockify endpoint. Each item is
+        encoded once here
+        """
+        encoded = [encode_body(x) for x in items]
+
+        def respond(url, params):
+            page = int(params.get("page", 1))
+            page_size = int(params.get("page-size", 50))
+            page_items = encoded[(page - 1) * page_size : page * page_size]
+            return create_response(200, b"[" + b",".join(page_items) + b"]", url=url)
+
+        self.add_handler("GET", path, respond)
+
+    def add_handler(self, method: str, path: str, handler):
+        """Answer calls to path with handler(url, params), which returns a
+        requests.Response. See create_response()
+        """
+        self.routes.append((method.upper(), re.compile(f"{path}$"), handler))
+
+    def request(
+        self, method, url, headers=None, params=None, data=None, stream=False
+    ) -> Response:
+        self.calls.append((method, url))
+        path = urlparse(url).path
+        for route_method, pattern, handler in self.routes:
+            if route_method == method.upper() and pattern.search(path):
+                return handler(url, params or {})
+        message = f"No response for {method} {path} in InMemoryTransport"
+        return create_response(404, encode_body({"message": message, "code": 404}))
+
+
+class ConcurrencyLimitedTransport(Transport):
+    def __init__(self, transport: Transport, max_concurrent_calls: int):
+        """Passes calls to transport, with at most max_concurrent_calls calls in
+        progress at any time. Other calls wait for a free slot. For streamed
+        calls the slot is freed once the response headers have been received
+
+        Parameters
+        ----------
+        transport: Transport
+            Transport that makes the actual calls
+        max_concurrent_calls: int
+            Maximum number of calls in progress, over all threads
+        """
+        self.transport = transport
+        self.max_concurrent_calls = max_concurrent_calls
+        self._semaphore = threading.BoundedSemaphore(max_concurrent_calls)
+
+    def request(
+        self, method, url, headers=None, params=None, data=None, stream=False
+    ) -> Response:
+        with self._semaphore:
+            return self.transport.request(
+                method, url, headers=headers, params=params, data=data, stream=stream
+            )
+
+    def close(self):
+        self.transport.close()
+
+
+class RecordingTransport(Transport):
+    def __init__(self, path: str, transport: Optional[Transport] = None):
+        """Passes calls to transport and appends each call with its response to the
+        file at path, one JSON object per line. Replay with ReplayTransport
+
+        Request headers are not recorded, so api keys do not end up in the file.
+        Responses are fully received before they are returned, so streamed calls
+        are not streamed while recording
+
+        Parameters
+        ----------
+        path: str
+            File to write to. Overwritten on the first call
+        transport: Transport, optional
+            Transport that makes the actual calls. Defaults to HTTPTransport()
+        """
+        self.path = path
+        self.transport = transport or HTTPTransport()
+        self._file = None
+        self._lock = threading.Lock()
+
+    def request(
+        self, method, url, headers=None, params=None, data=None, stream=False
+    ) -> Response:
+        response = self.transport.request(
+            method, url, headers=headers, params=params, data=data, stream=False
+        )
+        exchange = {
+            "key": list(get_exchange_key(method, url, params, data)),
+            "status_code": response.status_code,
+            "headers": {
+                x: y
+                for x, y in response.headers.items()
+                if x.lower() not in DECODED_HEADERS
+            },
+            "body": response.content.decode(response.encoding or "utf-8"),
+        }
+        line = json.dumps(exchange) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+        return response
+
+    def close(self):
+        """Close the file and the wrapped transport. A new call overwrites the
+        file
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    def __init__(self, path: str):
+        """Answers calls with the responses in a file saved by RecordingTransport,
+        without any network access or delay. Thread-safe
+
+        Calls are matched on method, url path, query parameters and request data.
+        When the same call was recorded more than once, its responses are
+        returned in recorded order and the last one is repeated after that
+
+        Parameters
+        ----------
+        path: str
+            File saved by RecordingTransport
+
+        Raises
+        ------
+        ReplayMissException
+            When answering a call that was not recorded
+        """
+        self.path = path
+        self.exchanges: Dict[Tuple, Deque[Dict]] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    exchange = json.loads(line)
+                    key = tuple(exchange.pop("key"))
+                    self.exchanges.setdefault(key, deque()).append(exchange)
+        self._lock = threading.Lock()
+
+    def request(
+        self, method, url, headers=None, params=None, data=None, stream=False
+    ) -> Response:
+        key = get_exchange_key(method, url, params, data)
+        with self._lock:
+            try:
+                recorded = self.exchanges[key]
+            except KeyError:
+                raise ReplayMissException(
+                    f"No recorded response for {method} {key[1]}{key[2]} in "
+                    f"{self.path}"
+                )
+            exchange = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        return create_response(
+            exchange["status_code"],
+            exchange["body"].encode("utf-8"),
+            exchange["headers"],
+            url,
+        )
+
+
+def get_exchange_key(method: str, url: str, params, data) -> Tuple[str, str, str, str]:
+    """(method, path, query, data) that identifies a call independent of host, order
+    of parameters and JSON formatting of data
+    """
+    query = "&".join(f"{x}={y}" for x, y in sorted((params or {}).items()))
+    if data:
+        try:
+            data = json.dumps(json.loads(data), sort_keys=True)
+        except ValueError:
+            data = data.decode("utf-8") if isinstance(data, bytes) else data
+    return method.upper(), urlparse(url).path, query and f"?{query}", data or ""
+
+
+def encode_body(content: Any) -> bytes:
+    if isinstance(content, bytes):
+        return content
+    return json.dumps(content).encode("utf-8")
+
+
+def create_response(
+    status_code: int,
+    content: bytes,
+    headers: Optional[Dict[str, str]] = None,
+    url: str = "",
+) -> Response:
+    """A requests.Response with the given body that does not need a connection.
+    Can be streamed with iter_content() as well
+    """
+    response = Response()
+    response.status_code = status_code
+    response.encoding = "utf-8"
+    response.headers.update(headers or {})
+    response._content = content
+    response._content_consumed = True
+    response.url = url
+    return response
+
+
+class TransportException(ClockifyClientException):
+    pass
+
+
+class ReplayMissException(TransportException):
+    """A call was made that is not in the recording"""
+
+    pass
@@ -11,9 +11,9 @@ session = APISession(
 
 projects = {x.name: x for x in session.get_projects()}
 
-# get entries from clockify
+# get entries from clockify. Only project is read for most entries, so parse lazily
 entries = session.get_time_entries(
-    query=TimeEntryQuery(description="emails"), limit=None
+    query=TimeEntryQuery(description="emails"), limit=None, lazy=True
 )
 
 # Prune away unwanted results
@@ -25,5 +25,7 @@ for entry in in_entries:
     entry.project = projects["Research Bureau"]
 
 print(f"saving {len(in_entries)} entries..")
-session.add_time_entries(in_entries)
-print("Done")
+results = session.add_time_entries(in_entries)
+for failed in (x for x in results if not x.success):
+    print(failed)
+print(f"Done. Saved {len([x for x in results if x.success])} entries")
@@ -13,6 +13,12 @@ with open("HISTORY.rst") as history_file:
 
 requirements = ["requests"]
 
+extras_requirements = {
+    "async": ["aiohttp"],
+    "numpy": ["numpy"],
+    "fastjson": ["orjson"],
+}
+
 setup_requirements = [
     "pytest-runner",
 ]
@@ -33,6 +39,7 @@ setup(
     ],
     description="Python client for the Clockify web API",
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="GNU General Public License v3",
     long_description=readme + "\n\n" + history,
     include_package_data=True,
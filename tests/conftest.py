@@ -16,7 +16,7 @@ def mock_requests(monkeypatch):
     RequestsMock
     """
     requests_mock = RequestsMock()
-    monkeypatch.setattr("clockifyclient.api.requests", requests_mock.requests)
+    monkeypatch.setattr("clockifyclient.transport.requests", requests_mock.requests)
     return requests_mock
 
 
@@ -1,4 +1,5 @@
 """Shared classes used in other tests. For generating test data"""
+import json
 from itertools import cycle
 from typing import List
 from unittest.mock import Mock
@@ -8,7 +9,7 @@ from requests.models import Response
 class RequestMockResponse:
     """A description of a http server response"""
 
-    def __init__(self, text, response_code):
+    def __init__(self, text, response_code, headers=None):
         """
 
         Parameters
@@ -17,15 +18,19 @@ class RequestMockResponse:
             Text of this response
         response_code: int
             https response code, like 200 or 404
+        headers: Dict, optional
+            http response headers. Defaults to no headers
         """
 
         self.text = text
         self.response_code = response_code
+        self.headers = headers or {}
 
 
 class RequestsMock:
     """Can be put in place of the requests module. Can be set to return
-    requests.models.Response objects
+    requests.models.Response objects. Calls made through a requests.Session
+    created from this mock end up at the same http method mocks
     """
 
     def __init__(self):
@@ -33,9 +38,12 @@ class RequestsMock:
         self.http_methods = [
             self.requests.get,
             self.requests.post,
+            self.requests.put,
             self.requests.patch,
             self.requests.update,
         ]
+        self.session = self.requests.Session.return_value
+        self.session.request.side_effect = self.request
 
     def set_response(self, response: RequestMockResponse):
         """Just for convenience"""
@@ -52,27 +60,53 @@ class RequestsMock:
         """
 
         objects = [
-            self.create_response_object(response.response_code, response.text)
+            self.create_response_object(
+                response.response_code, response.text, response.headers
+            )
             for response in responses
         ]
 
         for method in self.http_methods:
             method.side_effect = cycle(objects)
 
+    def set_paged_items(self, items: List):
+        """Any get call will yield the page of items indicated by the 'page' and
+        'page-size' request parameters, like a paged clockify endpoint
+
+        Parameters
+        ----------
+        items: List
+            All items available on the server. Will be json encoded
+        """
+
+        def get_page(*args, params, **kwargs):
+            page = int(params["page"])
+            page_size = int(params["page-size"])
+            page_items = items[(page - 1) * page_size : page * page_size]
+            return self.create_response_object(200, json.dumps(page_items))
+
+        self.requests.get.side_effect = get_page
+
     def set_response_exception(self, exception):
         """Any call to a http method will yield the given exception instance"""
         for method in self.http_methods:
             method.side_effect = exception
 
     @staticmethod
-    def create_response_object(status_code, text):
+    def create_response_object(status_code, text, headers=None):
         response = Response()
         response.encoding = "utf-8"
         response.status_code = status_code
+        response.headers.update(headers or {})
         response._content = bytes(text, response.encoding)
+        response._content_consumed = True  # allows iter_content() without a socket
         response.url = "mock_url"
         return response
 
+    def request(self, method, url, **kwargs):
+        """Route a session.request() call to the mock for that http method"""
+        return getattr(self.requests, method.lower())(url, **kwargs)
+
     def get(self, *args, **kwargs):
         return self.requests.get(*args, **kwargs)
 
@@ -85,3 +119,13 @@ class RequestsMock:
     def called(self):
         """True if any http method was called"""
         return any([x.called for x in self.http_methods])
+
+
+class FakeClock:
+    """Can be used in place of time.monotonic. Set time by hand"""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
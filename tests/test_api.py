@@ -1,12 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from unittest.mock import Mock
 
 import pytest
 import requests
 
-from clockifyclient.api import APIServer, APIServerException
+from clockifyclient.api import (
+    AdaptivePageSize,
+    APIServer,
+    APIServerException,
+    FixedPageSize,
+    RetryPolicy,
+    SingleFlight,
+    ValidatorCache,
+)
 from clockifyclient.exceptions import ClockifyClientException
-from tests.factories import RequestMockResponse
+from clockifyclient.transport import InMemoryTransport, create_response
+from tests.factories import RequestMockResponse, RequestsMock
 from tests.mock_responses import (
     AUTH_ERROR,
     GET_PROJECTS,
@@ -83,3 +96,393 @@ def test_incongruous_responses(mock_requests, a_server, response_text, response_
 
     with pytest.raises(ClockifyClientException):
         a_server.get("/test", "test_api_key")
+
+
+def test_connection_pool_shared(mock_requests, a_server):
+    """All verbs and paged iteration should go through one pooled session"""
+    mock_requests.set_response(GET_PROJECTS)
+    a_server.get("/test", "test_api_key")
+    a_server.put("/test", "test_api_key", data={})
+    list(a_server.get_iterator("/test", "test_api_key"))
+
+    assert mock_requests.requests.Session.call_count == 1
+    assert mock_requests.session.request.call_count == 3
+    adapter_kwargs = mock_requests.requests.adapters.HTTPAdapter.call_args[1]
+    assert adapter_kwargs["pool_maxsize"] == 10
+
+
+def test_headers_built_once(mock_requests, a_server):
+    mock_requests.set_response(GET_USER)
+    a_server.get("/test", "key1")
+    a_server.get("/test", "key1")
+    a_server.get("/test", "key2")
+
+    calls = mock_requests.requests.get.call_args_list
+    assert calls[0][1]["headers"] is calls[1][1]["headers"]
+    assert calls[2][1]["headers"]["X-Api-key"] == "key2"
+
+
+def test_close(mock_requests):
+    with APIServer("localhost") as server:
+        mock_requests.set_response(GET_USER)
+        server.get("/test", "test_api_key")
+        session = server.transport.session
+    session.close.assert_called_once()
+    assert server.transport._session is None
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_paged_iterator(mock_requests, a_server, prefetch, stream):
+    """Prefetching or streaming should not change the items that are returned"""
+    items = [{"id": str(i)} for i in range(120)]
+    mock_requests.set_paged_items(items)
+
+    with a_server.get_iterator(
+        "/test", "test_api_key", prefetch=prefetch, stream=stream
+    ) as pages:
+        assert list(pages) == items
+    # prefetched pages after the last page might be cancelled before being sent
+    assert 3 <= mock_requests.requests.get.call_count <= 3 + prefetch
+
+
+def test_paged_iterator_prefetch_stops_early(mock_requests, a_server):
+    """Dropping a prefetching iterator halfway should stop background requests"""
+    mock_requests.set_paged_items([{"id": str(i)} for i in range(1000)])
+
+    iterator = a_server.get_iterator("/test", "test_api_key", prefetch=2)
+    assert len(list(islice(iterator, 60))) == 60
+    iterator.close()
+
+    # page 2 is being consumed, pages 3 and 4 were prefetched. No more than that
+    assert mock_requests.requests.get.call_count <= 4
+    assert iterator._executor is None
+
+
+def test_adaptive_page_size():
+    def pages(policy, n_pages):
+        offset, result = 0, []
+        for _ in range(n_pages):
+            page, page_size = policy.get_page(offset)
+            result.append((page, page_size))
+            offset += page_size
+        return result
+
+    assert pages(AdaptivePageSize(), 4) == [(1, 50), (2, 50), (2, 100), (2, 200)]
+    assert pages(AdaptivePageSize(limit=3), 3) == [(1, 3), (2, 3), (2, 6)]
+    assert pages(AdaptivePageSize(initial=100, maximum=200), 4) == [
+        (1, 100),
+        (2, 100),
+        (2, 200),
+        (3, 200),
+    ]
+    assert pages(FixedPageSize(10), 2) == [(1, 10), (2, 10)]
+
+    with pytest.raises(ValueError):
+        FixedPageSize(10).get_page(offset=15)
+
+
+def test_paged_iterator_page_size(mock_requests, a_server):
+    """First page should be sized to the limit, later pages should grow"""
+    items = [{"id": str(i)} for i in range(1000)]
+    mock_requests.set_paged_items(items)
+
+    iterator = a_server.get_iterator(
+        "/test", "test_api_key", page_size_policy=AdaptivePageSize(limit=3)
+    )
+    assert list(islice(iterator, 3)) == items[:3]
+    assert mock_requests.requests.get.call_args[1]["params"]["page-size"] == "3"
+
+    mock_requests.reset()
+    assert list(a_server.get_iterator("/test", "test_api_key")) == items
+    # pages of 50, 50, 100, 200, 400, 800
+    assert mock_requests.requests.get.call_count == 6
+
+
+@pytest.fixture()
+def no_sleep(monkeypatch):
+    """Make retries instantaneous. Returns list of requested sleep times"""
+    sleeps = []
+    monkeypatch.setattr("clockifyclient.api.time.sleep", sleeps.append)
+    return sleeps
+
+
+def test_retry_policy():
+    policy = RetryPolicy(max_retries=2)
+    assert policy.should_retry("GET", attempt=0, status_code=429)
+    assert policy.should_retry("PUT", attempt=1)  # connection error
+    assert not policy.should_retry("GET", attempt=2, status_code=429)
+    assert not policy.should_retry("GET", attempt=0, status_code=401)
+    assert not policy.should_retry("POST", attempt=0, status_code=503)
+    assert RetryPolicy(retry_non_idempotent=True).should_retry("POST", 0, 503)
+
+    assert 0 <= policy.get_wait(attempt=3) <= 4
+    assert policy.get_wait(attempt=0, retry_after="7") == 7
+    assert policy.get_wait(attempt=0, retry_after="Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert policy.get_wait(attempt=0, retry_after="garbage") <= 0.5
+
+
+RETRY_LATER = RequestMockResponse('{"message": "Too many requests", "code": 429}', 429)
+
+
+def test_server_retries(mock_requests, no_sleep):
+    server = APIServer("localhost", retry_policy=RetryPolicy(max_retries=2))
+
+    mock_requests.set_responses([RETRY_LATER, GET_USER])
+    assert server.get("/user", "test_api_key")["id"] == "1234"
+    assert server.retry_count == 1
+
+    mock_requests.set_responses([RETRY_LATER])
+    with pytest.raises(APIServerException):
+        server.get("/user", "test_api_key")
+    assert server.retry_count == 3
+    assert len(no_sleep) == 3
+
+    # POST is not retried by default
+    mock_requests.set_responses([RETRY_LATER, POST_TIME_ENTRY])
+    with pytest.raises(APIServerException):
+        server.post("/time-entries", "test_api_key", data={})
+
+    mock_requests.reset()
+    mock_requests.set_response_exception(
+        requests.exceptions.ConnectionError("Mocked connection error")
+    )
+    with pytest.raises(ClockifyClientException):
+        server.get("/user", "test_api_key")
+    assert mock_requests.requests.get.call_count == 3
+
+
+def test_retried_response_closed(no_sleep):
+    """Responses that are retried should give their connection back"""
+    responses = []
+
+    def respond(url, params):
+        response = create_response(503 if not responses else 200, b"[]", url=url)
+        response.close = Mock()
+        responses.append(response)
+        return response
+
+    transport = InMemoryTransport()
+    transport.add_handler("GET", "/test", respond)
+    server = APIServer(
+        "http://localhost", transport=transport, retry_policy=RetryPolicy()
+    )
+    server.request("GET", "/test", "test_api_key", stream=True)
+    assert [x.status_code for x in responses] == [503, 200]
+    responses[0].close.assert_called_once()
+    responses[1].close.assert_not_called()
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_paged_iterator_resumes(mock_requests, a_server, prefetch):
+    """After a failed page, iteration should continue at that page"""
+    items = [{"id": str(i)} for i in range(120)]
+    mock_requests.set_paged_items(items)
+    get_page = mock_requests.requests.get.side_effect
+    fail_at = {"2"}
+
+    def get_page_failing_once(*args, params, **kwargs):
+        if params["page"] in fail_at:
+            fail_at.remove(params["page"])
+            raise requests.exceptions.ConnectionError("Mocked connection error")
+        return get_page(*args, params=params, **kwargs)
+
+    mock_requests.requests.get.side_effect = get_page_failing_once
+
+    iterator = a_server.get_iterator("/test", "test_api_key", prefetch=prefetch)
+    received = list(islice(iterator, 50))
+    with pytest.raises(ClockifyClientException):
+        next(iterator)
+    received.extend(iterator)
+    assert received == items
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_paged_iterator_page_breaks(mock_requests, a_server, prefetch):
+    """A middle page that breaks off while received should be requested again,
+    so that every item is returned exactly once
+    """
+    items = [{"id": str(i)} for i in range(10)]
+    mock_requests.set_paged_items(items)
+    get_page = mock_requests.requests.get.side_effect
+    broken = []
+
+    def get_page_breaking_once(*args, params, **kwargs):
+        response = get_page(*args, params=params, **kwargs)
+        if params["page"] == "2" and not broken:
+            broken.append(params)
+            response.raw = BrokenStream(response.content[:5])
+            response._content = False
+            response._content_consumed = False
+        return response
+
+    mock_requests.requests.get.side_effect = get_page_breaking_once
+
+    iterator = a_server.get_iterator(
+        "/test",
+        "test_api_key",
+        prefetch=prefetch,
+        page_size_policy=FixedPageSize(3),
+    )
+    received = []
+    with pytest.raises(ClockifyClientException):
+        for item in iterator:
+            received.append(item)
+    received.extend(iterator)
+    assert received == items
+
+
+class BrokenStream:
+    """Raw response body that breaks off after the given data"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def read(self, *args, **kwargs):
+        if self.data is None:
+            raise requests.exceptions.ChunkedEncodingError("Mocked broken stream")
+        data, self.data = self.data, None
+        return data
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("prefetch", [0, 1])
+def test_paged_iterator_stream_breaks(mock_requests, a_server, prefetch):
+    """A page that breaks off while streaming should raise a client exception and
+    be requested again, without returning items twice
+    """
+    items = [{"id": str(i)} for i in range(100)]
+    mock_requests.set_paged_items(items)
+    get_page = mock_requests.requests.get.side_effect
+    broken = []
+
+    def get_page_breaking_once(*args, params, **kwargs):
+        response = get_page(*args, params=params, **kwargs)
+        if params["page"] == "1" and not broken:
+            broken.append(params)
+            response.raw = BrokenStream(response.content[: len(response.content) // 3])
+            response._content = False
+            response._content_consumed = False
+        return response
+
+    mock_requests.requests.get.side_effect = get_page_breaking_once
+
+    iterator = a_server.get_iterator(
+        "/test",
+        "test_api_key",
+        prefetch=prefetch,
+        page_size_policy=FixedPageSize(50),
+        stream=True,
+    )
+    received = []
+    with pytest.raises(ClockifyClientException):
+        for item in iterator:
+            received.append(item)
+    assert 0 < len(received) < 50
+    received.extend(iterator)
+    assert received == items
+
+
+def test_conditional_get(mock_requests, a_server):
+    """Second call should send validators and reuse the parsed response on 304"""
+    with_etag = RequestMockResponse(
+        GET_PROJECTS.text, 200, headers={"ETag": '"v1"', "Last-Modified": "then"}
+    )
+    not_modified = RequestMockResponse("", 304)
+    mock_requests.set_responses([with_etag, not_modified])
+
+    first = a_server.get("/projects", "test_api_key")
+    second = a_server.get("/projects", "test_api_key")
+    assert second is first
+
+    calls = mock_requests.requests.get.call_args_list
+    assert "If-None-Match" not in calls[0][1]["headers"]
+    assert calls[1][1]["headers"]["If-None-Match"] == '"v1"'
+    assert calls[1][1]["headers"]["If-Modified-Since"] == "then"
+    assert calls[1][1]["headers"]["X-Api-key"] == "test_api_key"
+
+    # validators are per api key
+    mock_requests.set_response(GET_PROJECTS)
+    a_server.get("/projects", "other_api_key")
+    assert "If-None-Match" not in mock_requests.requests.get.call_args[1]["headers"]
+
+
+def test_validator_cache_bounded():
+    cache = ValidatorCache(max_size=2)
+    response = RequestsMock.create_response_object(200, "[]", {"ETag": "1"})
+    for path in ["/a", "/b", "/c"]:
+        cache.store(cache.get_key(path, "key", {}), response, [])
+    assert len(cache) == 2
+    assert cache.get(cache.get_key("/a", "key", {})) is None
+
+    no_validators = RequestsMock.create_response_object(200, "[]")
+    cache.store(cache.get_key("/b", "key", {}), no_validators, [])
+    assert cache.get(cache.get_key("/b", "key", {})) is None
+
+
+@pytest.fixture()
+def waiting_followers(monkeypatch):
+    """Semaphore released each time a SingleFlight caller starts waiting for the
+    call of another thread
+    """
+    waiting = threading.Semaphore(0)
+
+    class WaitedFuture(Future):
+        def result(self, timeout=None):
+            waiting.release()
+            return super().result(timeout)
+
+    monkeypatch.setattr("clockifyclient.api.Future", WaitedFuture)
+    return waiting
+
+
+def test_concurrent_gets_coalesced(mock_requests, a_server, waiting_followers):
+    """Identical gets at the same time should share one http call"""
+    release = threading.Event()
+    response = RequestsMock.create_response_object(200, GET_WORKSPACES.text)
+
+    def slow_get(*args, **kwargs):
+        release.wait(timeout=5)
+        return response
+
+    mock_requests.requests.get.side_effect = slow_get
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        futures = [
+            executor.submit(a_server.get, "/workspaces", "test_api_key")
+            for _ in range(10)
+        ]
+        for _ in range(9):  # all calls but the one in slow_get
+            assert waiting_followers.acquire(timeout=5)
+        release.set()
+        results = [x.result() for x in futures]
+
+    assert mock_requests.requests.get.call_count == 1
+    assert all(x is results[0] for x in results)
+
+    # calls made after the shared call has finished go to the server again
+    a_server.get("/workspaces", "test_api_key")
+    assert mock_requests.requests.get.call_count == 2
+
+
+def test_single_flight_exception(waiting_followers):
+    """Callers waiting for a failing call should get its exception"""
+    single_flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(timeout=5)
+        raise ClockifyClientException("failed")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, "key", fail)
+        started.wait(timeout=5)
+        follower = executor.submit(single_flight.do, "key", lambda: "not called")
+        assert waiting_followers.acquire(timeout=5)
+        release.set()
+        for future in [leader, follower]:
+            with pytest.raises(ClockifyClientException):
+                future.result()
+    assert single_flight.do("key", lambda: "called") == "called"
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import asyncio
+import datetime
+import json
+
+import pytest
+
+from clockifyclient.api import APIServerException, RetryPolicy
+from clockifyclient.exceptions import ClockifyClientException
+from clockifyclient.models import Project, TimeEntry, TimeEntryQuery
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from clockifyclient.async_api import AsyncAPIServer  # noqa: E402
+from clockifyclient.async_client import AsyncAPISession  # noqa: E402
+from tests.mock_responses import (  # noqa: E402
+    AUTH_ERROR,
+    CURRENTLY_RUNNING_ENTRY_NOT_FOUND,
+    GET_PROJECTS,
+    GET_USER,
+    GET_WORKSPACES,
+    POST_TIME_ENTRY,
+)
+
+
+def create_stand_in_app(n_time_entries=120):
+    """A local aiohttp app that answers like a clockify server"""
+    entry = json.loads(POST_TIME_ENTRY.text)
+    entries = [dict(entry, id=str(i)) for i in range(n_time_entries)]
+
+    def respond(mock_response):
+        async def handler(request):
+            return web.Response(
+                text=mock_response.text,
+                status=mock_response.response_code,
+                content_type="application/json",
+            )
+
+        return handler
+
+    async def time_entries(request):
+        page = int(request.query["page"])
+        page_size = int(request.query["page-size"])
+        return web.json_response(entries[(page - 1) * page_size : page * page_size])
+
+    async def post_time_entry(request):
+        posted = await request.json()
+        return web.json_response(dict(entry, description=posted["description"]))
+
+    app = web.Application()
+    app.router.add_get("/workspaces", respond(GET_WORKSPACES))
+    app.router.add_get("/user", respond(GET_USER))
+    app.router.add_get("/workspaces/{ws}/projects", respond(GET_PROJECTS))
+    app.router.add_get("/workspaces/{ws}/user/{user}/time-entries", time_entries)
+    app.router.add_post("/workspaces/{ws}/time-entries", post_time_entry)
+    app.router.add_patch(
+        "/workspaces/{ws}/user/{user}/time-entries/",
+        respond(CURRENTLY_RUNNING_ENTRY_NOT_FOUND),
+    )
+    app.router.add_get("/forbidden", respond(AUTH_ERROR))
+    return app
+
+
+def run_with_server(test_coroutine_function, app=None):
+    """Start a stand-in server, run test_coroutine_function(server) against it"""
+
+    async def run():
+        test_server = TestServer(app or create_stand_in_app())
+        await test_server.start_server()
+        try:
+            async with AsyncAPIServer(str(test_server.make_url(""))) as server:
+                await test_coroutine_function(server)
+        finally:
+            await test_server.close()
+
+    asyncio.run(run())
+
+
+def test_async_session():
+    async def test(server):
+        session = AsyncAPISession(api_server=server, api_key="mock_key")
+        projects = await session.get_projects()
+        assert [x.name for x in projects] == ["Project1", "Project2"]
+        assert (await session.get_user()).obj_id == "1234"
+        assert await session.get_projects() is projects  # cached
+
+        entries = await session.get_time_entries(
+            query=TimeEntryQuery(description="test"), limit=None
+        )
+        assert len(entries) == 120
+        assert isinstance(entries[0], TimeEntry)
+        assert [x.obj_id for x in entries[:2]] == ["0", "1"]
+
+        limited = await session.get_time_entries(
+            query=TimeEntryQuery(description="test"), limit=3
+        )
+        assert len(limited) == 3
+
+        assert await session.stop_timer() is None
+
+    run_with_server(test)
+
+
+def test_async_add_time_entries():
+    async def test(server):
+        session = AsyncAPISession(api_server=server, api_key="mock_key")
+        to_add = [
+            TimeEntry(
+                obj_id=None,
+                start=datetime.datetime(2020, 1, 1),
+                description=f"entry {i}",
+                project=Project(obj_id="1", name="p"),
+            )
+            for i in range(200)
+        ]
+        added = await session.add_time_entries(to_add)
+        assert [x.description for x in added] == [x.description for x in to_add]
+
+    run_with_server(test)
+
+
+def test_async_errors():
+    async def test(server):
+        with pytest.raises(APIServerException):
+            await server.get("/forbidden", api_key="mock_key")
+
+    run_with_server(test)
+
+    async def unreachable():
+        async with AsyncAPIServer("http://127.0.0.1:1") as server:
+            with pytest.raises(ClockifyClientException):
+                await server.get("/user", api_key="mock_key")
+
+    asyncio.run(unreachable())
+
+
+def test_async_timeout_retried():
+    """Timeouts should be retried and then raised as ClockifyClientException"""
+
+    async def test(server):
+        send = server.send
+        timeouts = [asyncio.TimeoutError()]
+
+        async def send_or_time_out(*args, **kwargs):
+            if timeouts:
+                raise timeouts.pop()
+            return await send(*args, **kwargs)
+
+        server.send = send_or_time_out
+        server.retry_policy = RetryPolicy(max_retries=1, backoff_factor=0)
+        assert (await server.get("/user", api_key="mock_key"))["id"] == "1234"
+        assert server.retry_count == 1
+
+        timeouts.extend([asyncio.TimeoutError(), asyncio.TimeoutError()])
+        with pytest.raises(ClockifyClientException):
+            await server.get("/user", api_key="mock_key")
+        assert server.retry_count == 2
+
+    run_with_server(test)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import datetime
+import json
+
+import pytest
+from dateutil.tz import UTC
+
+from clockifyclient.api import APIServer
+from clockifyclient.batch import TimeEntryBatch
+from clockifyclient.client import ClockifyAPI
+from clockifyclient.models import (
+    ObjectParseException,
+    TimeEntry,
+    TimeEntryQuery,
+    User,
+    Workspace,
+)
+from tests.mock_responses import POST_TIME_ENTRY
+
+
+def an_entry_dict(obj_id, start, end, project_id=None, task_id=None):
+    entry = json.loads(POST_TIME_ENTRY.text)
+    entry.update(id=obj_id, projectId=project_id, taskId=task_id)
+    entry["description"] = f"entry {obj_id}"
+    entry["timeInterval"] = {"start": start, "end": end}
+    return entry
+
+
+@pytest.fixture()
+def some_entry_dicts():
+    return [
+        an_entry_dict("1", "2020-01-01T10:00:00Z", "2020-01-01T11:00:00Z", "p1", "t1"),
+        an_entry_dict("2", "2020-01-02T10:00:00Z", "2020-01-02T10:30:00Z", "p2"),
+        an_entry_dict("3", "2020-01-03T10:00:00Z", "2020-01-03T12:00:00Z", "p1"),
+        an_entry_dict("4", "2020-01-04T10:00:00Z", "2020-01-04T10:10:00Z"),
+        an_entry_dict("5", "2020-01-05T10:00:00Z", None, "p2"),  # running
+    ]
+
+
+@pytest.fixture(params=[False, True], ids=["array", "numpy"])
+def use_numpy(request):
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+def test_batch(some_entry_dicts, use_numpy):
+    batch = TimeEntryBatch.from_dicts(some_entry_dicts, use_numpy=use_numpy)
+    assert len(batch) == 5
+    assert batch.uses_numpy == use_numpy
+    assert batch.project_ids == ["p1", "p2"]
+
+    assert list(batch.durations()) == [3600, 1800, 7200, 600, 0]
+    assert batch.total_duration() == 13200
+    until = int(datetime.datetime(2020, 1, 5, 10, 1, tzinfo=UTC).timestamp())
+    assert batch.total_duration(until=until) == 13260
+
+    assert batch.group_by_project() == {"p1": 10800, "p2": 1800, None: 600}
+    assert batch.group_by_task() == {"t1": 3600, None: 9600}
+
+    p1 = batch.filter(project_id="p1")
+    assert p1.ids == ["1", "3"]
+    assert batch.filter(project_id="unknown").ids == []
+    assert batch.filter(
+        start_from=datetime.datetime(2020, 1, 2, tzinfo=UTC),
+        start_before=datetime.datetime(2020, 1, 4, tzinfo=UTC),
+    ).ids == ["2", "3"]
+    assert batch.filter(description_contains="entry 4").ids == ["4"]
+    assert batch.filter().ids == batch.ids
+
+
+def test_batch_rows(some_entry_dicts, use_numpy):
+    """Rows should convert to the same TimeEntry as parsing the dict directly"""
+    batch = TimeEntryBatch.from_dicts(some_entry_dicts, use_numpy=use_numpy)
+    for row, dict_in in zip(batch, some_entry_dicts):
+        assert isinstance(row, TimeEntry)
+        assert row.to_dict() == TimeEntry.init_from_dict(dict_in).to_dict()
+    assert batch[-1].end is None
+    assert batch[0].task.obj_id == "t1"
+
+
+def test_batch_parse_error(some_entry_dicts):
+    del some_entry_dicts[2]["timeInterval"]
+    with pytest.raises(ObjectParseException):
+        TimeEntryBatch.from_dicts(some_entry_dicts)
+
+
+def test_get_time_entries_batch(mock_requests, some_entry_dicts):
+    mock_requests.set_paged_items(some_entry_dicts * 30)
+    api = ClockifyAPI(api_server=APIServer("localhost"))
+    batch = api.get_time_entries_batch(
+        api_key="mock_key",
+        workspace=Workspace(obj_id="1", name="ws"),
+        user=User(obj_id="1", name="user"),
+        query=TimeEntryQuery(description="entry"),
+        limit=120,
+    )
+    assert len(batch) == 120
+    assert mock_requests.requests.get.call_count == 1
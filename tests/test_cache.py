@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import gc
+import weakref
+from unittest.mock import Mock
+
+import pytest
+
+from clockifyclient.cache import TTLCache
+from clockifyclient.client import APISession, ClockifyAPI
+from clockifyclient.models import Project, Task, Workspace
+from tests.factories import FakeClock
+
+
+def test_ttl_cache():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, max_size=2, clock=clock)
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get_or_set("b", lambda: 2) == 2
+    assert cache.get_or_set("b", lambda: 3) == 2
+
+    cache.get("a")  # a is now more recently used than b
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert "a" in cache
+
+    clock.time = 11
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    stats = cache.statistics
+    assert (stats.hits, stats.misses) == (3, 4)
+    assert stats.evictions == 1
+    assert stats.expirations == 1
+    assert stats.hit_ratio == 3 / 7
+
+
+def test_ttl_cache_exception_not_stored():
+    cache = TTLCache()
+
+    def fail():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        cache.get_or_set("a", fail)
+    assert cache.get_or_set("a", lambda: 1) == 1
+
+
+def create_session():
+    session = APISession(api_server=Mock(), api_key="test")
+    session.api = Mock(spec=ClockifyAPI)
+    session.api.get_workspaces.return_value = [Workspace(obj_id="1", name="ws")]
+    session.api.get_projects.return_value = [Project(obj_id="1", name="p")]
+    session.api.get_tasks.return_value = [Task(obj_id="1", name="t")]
+    return session
+
+
+@pytest.fixture()
+def a_session():
+    return create_session()
+
+
+def test_session_cache(a_session):
+    a_session.get_projects()
+    a_session.get_projects()
+    assert a_session.api.get_projects.call_count == 1
+    assert a_session.api.get_workspaces.call_count == 1
+
+    a_session.get_tasks(Project(obj_id="1", name="p"))
+    a_session.get_tasks(Project(obj_id="1", name="p"))  # same id, other instance
+    assert a_session.api.get_tasks.call_count == 1
+
+    a_session.invalidate_cache(project=Project(obj_id="1", name="p"))
+    a_session.get_projects()
+    a_session.get_tasks(Project(obj_id="1", name="p"))
+    assert a_session.api.get_projects.call_count == 2
+    assert a_session.api.get_tasks.call_count == 2
+    assert a_session.api.get_workspaces.call_count == 1
+
+    a_session.invalidate_cache()
+    a_session.get_projects()
+    assert a_session.api.get_workspaces.call_count == 2
+
+
+def test_session_can_be_garbage_collected():
+    """Caching should not keep sessions alive"""
+    session = create_session()
+    session.get_projects()
+    reference = weakref.ref(session)
+    del session
+    gc.collect()
+    assert reference() is None
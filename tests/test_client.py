@@ -1,13 +1,23 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import datetime
+import json
+import threading
 from unittest.mock import Mock
 
 import pytest
 
 from clockifyclient.api import APIServer, APIServerException, APIErrorResponse
 from clockifyclient.client import ClockifyAPI, APISession
-from clockifyclient.models import Task, TimeEntry, Project, Workspace, User
+from clockifyclient.models import (
+    Task,
+    TimeEntry,
+    TimeEntryQuery,
+    Project,
+    Workspace,
+    User,
+)
+from clockifyclient.transport import InMemoryTransport, create_response
 from tests.mock_responses import (
     CURRENTLY_RUNNING_ENTRY_NOT_FOUND,
     GET_PROJECTS,
@@ -148,3 +158,91 @@ def test_session_exception(mock_requests, a_mock_api):
     )
     with pytest.raises(APIServerException):
         session.add_time_entry(start_time=None, description="test", project=None)
+
+
+def test_get_time_entries(mock_requests, an_api, a_workspace, a_user):
+    entry = json.loads(POST_TIME_ENTRY.text)
+    mock_requests.set_paged_items([dict(entry, id=str(i)) for i in range(120)])
+    query = TimeEntryQuery(description="test")
+
+    entries = an_api.get_time_entries(
+        api_key="mock_key", workspace=a_workspace, user=a_user, query=query
+    )
+    assert [x.obj_id for x in entries] == [str(i) for i in range(120)]
+
+    entries = an_api.get_time_entries(
+        api_key="mock_key",
+        workspace=a_workspace,
+        user=a_user,
+        query=query,
+        limit=3,
+        prefetch=2,
+    )
+    assert [x.obj_id for x in entries] == ["0", "1", "2"]
+
+
+def test_session_add_time_entries(a_mock_api, a_date):
+    """Bulk add should report on each entry and keep going after failures"""
+    session = APISession(api_server=an_api, api_key="test")
+    session.api = a_mock_api
+    entries = [
+        TimeEntry(obj_id=obj_id, start=a_date, description=str(i))
+        for i, obj_id in enumerate([None, "1", None, "3"])
+    ]
+
+    def add_time_entry_object(api_key, workspace, time_entry):
+        if time_entry.description == "2":
+            raise APIServerException(
+                "mock error", error_response=APIErrorResponse(code=400, message="")
+            )
+        return time_entry
+
+    a_mock_api.add_time_entry_object.side_effect = add_time_entry_object
+
+    results = session.add_time_entries(entries, max_workers=3)
+    assert [x.item for x in results] == entries
+    assert [x.success for x in results] == [True, True, False, True]
+    assert results[0].result is entries[0]
+    assert isinstance(results[2].exception, APIServerException)
+    assert a_mock_api.get_workspaces.call_count == 1
+
+
+def test_session_bootstrap():
+    """Bootstrap should cache everything, making task calls concurrently"""
+    transport = InMemoryTransport()
+    transport.add("GET", "/workspaces", [{"id": "w1", "name": "workspace"}])
+    transport.add("GET", "/user", {"id": "u1", "name": "user", "email": "a@b.c"})
+    projects = [{"id": f"p{i}", "name": f"project {i}"} for i in range(300)]
+    transport.add("GET", "/workspaces/w1/projects", projects)
+    lock = threading.Lock()
+    first_calls = threading.Barrier(2, timeout=5)
+    counts = {"calls": 0, "in_progress": 0, "maximum": 0}
+
+    def get_tasks(url, params):
+        with lock:
+            counts["calls"] += 1
+            counts["in_progress"] += 1
+            counts["maximum"] = max(counts["maximum"], counts["in_progress"])
+            is_first = counts["calls"] <= 2
+        if is_first:
+            first_calls.wait()  # breaks if the first two calls are not concurrent
+        with lock:
+            counts["in_progress"] -= 1
+        return create_response(200, b'[{"id": "t1", "name": "task"}]')
+
+    transport.add_handler("GET", r"/projects/\w+/tasks", get_tasks)
+    api_server = APIServer("http://localhost", transport=transport)
+    with pytest.raises(ValueError):
+        APISession(api_server=api_server, api_key="key", cache_size=302).bootstrap()
+    assert counts["calls"] == 0  # checked before any tasks were requested
+
+    session = APISession(api_server=api_server, api_key="key")
+    session.bootstrap(max_workers=4)
+    assert counts["calls"] == 300
+    assert 2 <= counts["maximum"] <= 4
+
+    calls = len(transport.calls)
+    project = session.get_projects()[-1]
+    assert session.get_tasks(project)[0].name == "task"
+    session.get_user()
+    assert len(transport.calls) == calls
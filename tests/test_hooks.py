@@ -0,0 +1,103 @@
+import pytest
+import requests
+
+from clockifyclient.api import APIServer, RetryPolicy
+from clockifyclient.exceptions import ClockifyClientException
+from clockifyclient.hooks import RequestHooks, get_endpoint
+from tests.factories import RequestMockResponse
+from tests.mock_responses import GET_USER
+
+
+class RecordingHooks(RequestHooks):
+    """Records (hook name, event) for each call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, event):
+        self.calls.append(("before_request", event))
+
+    def after_response(self, event):
+        self.calls.append(("after_response", event))
+
+    def on_error(self, event):
+        self.calls.append(("on_error", event))
+
+    def on_retry(self, event):
+        self.calls.append(("on_retry", event))
+
+    def page_fetched(self, event):
+        self.calls.append(("page_fetched", event))
+
+    @property
+    def names(self):
+        return [name for name, _ in self.calls]
+
+
+@pytest.fixture()
+def hooks():
+    return RecordingHooks()
+
+
+def test_get_endpoint():
+    assert get_endpoint("/user") == "/user"
+    assert (
+        get_endpoint("/workspaces/123/user/abc/time-entries")
+        == "/workspaces/{id}/user/{id}/time-entries"
+    )
+    assert get_endpoint("/x/5e1f0c8d9a7b6c5d4e3f2a1b") == "/x/{id}"
+
+
+def test_hooks_called(mock_requests, hooks, monkeypatch):
+    monkeypatch.setattr("clockifyclient.api.time.sleep", lambda x: None)
+    server = APIServer(
+        "localhost", hooks=[hooks], retry_policy=RetryPolicy(max_retries=1)
+    )
+    retry_later = RequestMockResponse('{"message": "wait", "code": 429}', 429)
+    mock_requests.set_responses([retry_later, GET_USER])
+
+    server.get("/workspaces/123/user", "test_api_key")
+    assert hooks.names == [
+        "before_request",
+        "after_response",
+        "on_retry",
+        "before_request",
+        "after_response",
+    ]
+    retried = hooks.calls[2][1]
+    assert retried.status_code == 429
+    assert retried.wait is not None
+    last = hooks.calls[-1][1]
+    assert last.method == "GET"
+    assert last.endpoint == "/workspaces/{id}/user"
+    assert last.attempt == 1
+    assert last.status_code == 200
+    assert last.bytes_received == len(GET_USER.text.encode())
+    assert last.latency >= 0
+
+    hooks.calls.clear()
+    mock_requests.set_response_exception(requests.exceptions.ConnectionError("down"))
+    with pytest.raises(ClockifyClientException):
+        server.get("/user", "test_api_key")
+    assert hooks.names == ["before_request", "on_error", "on_retry"] + [
+        "before_request",
+        "on_error",
+    ]
+    assert isinstance(hooks.calls[1][1].exception, requests.exceptions.ConnectionError)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_page_fetched(mock_requests, hooks, stream):
+    server = APIServer("localhost")
+    server.add_hooks(hooks)
+    mock_requests.set_paged_items([{"id": str(i)} for i in range(120)])
+
+    assert (
+        len(list(server.get_iterator("/items", "test_api_key", stream=stream))) == 120
+    )
+    pages = [
+        (x.page, x.page_size, x.items)
+        for name, x in hooks.calls
+        if name == "page_fetched"
+    ]
+    assert pages == [(1, 50, 50), (2, 50, 50), (2, 100, 20)]
@@ -0,0 +1,86 @@
+import json
+from collections import Counter
+from unittest.mock import Mock
+
+import pytest
+
+from clockifyclient.client import APISession, ClockifyAPI
+from clockifyclient.identity import IdentityMap
+from clockifyclient.models import (
+    Project,
+    ProjectStub,
+    Task,
+    TaskStub,
+    TimeEntry,
+    User,
+    Workspace,
+)
+from tests.mock_responses import POST_TIME_ENTRY
+
+
+def test_models_hashable():
+    assert Project(obj_id="1", name="p") == ProjectStub(obj_id="1")
+    assert Project(obj_id="1", name="p") != Project(obj_id="2", name="p")
+    assert Project(obj_id="1", name="p") != Task(obj_id="1", name="p")
+    assert TaskStub(obj_id="1") == Task(obj_id="1", name="t")
+    assert len({ProjectStub(obj_id="1"), Project(obj_id="1", name="p")}) == 1
+
+    # objects without id are only equal to themselves
+    new_project = Project(obj_id=None, name="p")
+    assert new_project == new_project
+    assert new_project != Project(obj_id=None, name="p")
+    assert len({new_project, Project(obj_id=None, name="p")}) == 2
+
+    # time entries are not interned, so they keep default equality
+    assert TimeEntry(obj_id="1", start=None) != TimeEntry(obj_id="1", start=None)
+
+
+def test_identity_map():
+    identity_map = IdentityMap()
+    stub = identity_map.get_project("1")
+    assert isinstance(stub, ProjectStub)
+    assert identity_map.get_project("1") is stub
+    assert identity_map.get_project(None) is None
+    assert identity_map.get_task("1") is not stub
+
+    # stub is upgraded in place when the full project becomes known
+    known = identity_map.add(Project(obj_id="1", name="project 1"))
+    assert known is stub
+    assert type(stub) is Project
+    assert stub.name == "project 1"
+    assert str(stub) == "Project 'project 1' (1)"
+
+    # adding a stub does not downgrade
+    assert identity_map.add(ProjectStub(obj_id="1")).name == "project 1"
+    assert identity_map.get_project("1") is stub
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_session_interns_projects(lazy):
+    session = APISession(api_server=Mock(), api_key="test")
+    session.api = Mock(spec=ClockifyAPI)
+    session.api.get_workspaces.return_value = [Workspace(obj_id="w", name="ws")]
+    session.api.get_user.return_value = User(obj_id="u", name="user")
+    session.api.get_projects.return_value = [Project(obj_id="123456", name="p")]
+
+    entry_dicts = [dict(json.loads(POST_TIME_ENTRY.text), id=str(i)) for i in range(3)]
+
+    def get_time_entries(identity_map, lazy, **kwargs):
+        return [
+            TimeEntry.init_from_dict(x, lazy=lazy, identity_map=identity_map)
+            for x in entry_dicts
+        ]
+
+    session.api.get_time_entries.side_effect = get_time_entries
+    entries = session.get_time_entries(query=None, limit=None, lazy=lazy)
+    assert entries[0].project is entries[1].project
+    assert entries[0].task is entries[2].task
+    assert isinstance(entries[0].project, ProjectStub)
+
+    # projects requested later upgrade the stubs entries already hold
+    project = session.get_projects()[0]
+    assert project is entries[0].project
+    assert entries[0].project.name == "p"
+
+    totals = Counter(x.project for x in entries)
+    assert totals[Project(obj_id="123456", name="p")] == 3
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from clockifyclient.api import APIResponseParseException, APIServer
+from clockifyclient.jsoncodec import CODECS, StdlibJSONCodec, get_codec
+from tests.factories import RequestMockResponse
+from tests.mock_responses import POST_TIME_ENTRY
+
+AVAILABLE_CODECS = [x for x in CODECS.values() if x.is_available()]
+
+
+@pytest.mark.parametrize("codec_class", AVAILABLE_CODECS)
+def test_codec_round_trip(codec_class):
+    codec = codec_class()
+    obj = json.loads(POST_TIME_ENTRY.text)
+    obj["description"] = "café ☕"
+
+    encoded = codec.dumps(obj)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded.decode("utf-8")) == obj
+    assert codec.loads(encoded) == obj
+    assert codec.loads(POST_TIME_ENTRY.text)["id"] == "123456"
+
+    with pytest.raises(ValueError):
+        codec.loads(b'{"id": ')
+
+
+def test_get_codec():
+    assert get_codec().name == AVAILABLE_CODECS[0].name
+    assert isinstance(get_codec("json"), StdlibJSONCodec)
+    with pytest.raises(ValueError):
+        get_codec("unknown")
+
+
+@pytest.mark.parametrize("codec_class", AVAILABLE_CODECS)
+def test_server_uses_codec(mock_requests, codec_class):
+    server = APIServer("localhost", json_codec=codec_class())
+    mock_requests.set_response(POST_TIME_ENTRY)
+
+    response = server.post("/test", "test_api_key", data={"description": "test"})
+    assert response["id"] == "123456"
+    sent = mock_requests.requests.post.call_args[1]["data"]
+    assert json.loads(sent) == {"description": "test"}
+
+    mock_requests.set_response(RequestMockResponse("{not json", 200))
+    with pytest.raises(APIResponseParseException):
+        server.get("/test", "test_api_key")
@@ -0,0 +1,78 @@
+import pytest
+import requests
+
+from clockifyclient.api import APIServer, RetryPolicy
+from clockifyclient.client import APISession
+from clockifyclient.exceptions import ClockifyClientException
+from clockifyclient.metrics import Histogram, MetricsCollector
+from tests.factories import RequestMockResponse
+from tests.mock_responses import GET_USER, GET_WORKSPACES
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(1, 2, 4))
+    assert histogram.quantile(0.5) is None
+    for value in [0.5] * 50 + [1.5] * 40 + [3] * 9 + [100]:
+        histogram.observe(value)
+    assert histogram.counts == [50, 40, 9, 1]
+    assert histogram.quantile(0.5) == pytest.approx(1.0)
+    assert histogram.quantile(0.95) == pytest.approx(2 + 2 * 5 / 9)
+    assert histogram.quantile(0.999) == 4  # in unbounded bucket
+    assert histogram.as_dict()["count"] == 100
+
+
+def test_metrics_collector(mock_requests, monkeypatch):
+    monkeypatch.setattr("clockifyclient.api.time.sleep", lambda x: None)
+    metrics = MetricsCollector()
+    session = APISession(
+        api_server=APIServer("localhost", retry_policy=RetryPolicy(max_retries=1)),
+        api_key="test_api_key",
+    )
+    metrics.watch_session(session)
+
+    retry_later = RequestMockResponse('{"message": "wait", "code": 429}', 429)
+    mock_requests.set_responses([retry_later, GET_WORKSPACES])
+    session.get_default_workspace()
+    session.get_default_workspace()  # from cache
+    mock_requests.set_paged_items([{"id": str(i)} for i in range(60)])
+    list(session.api.api_server.get_iterator("/workspaces/123/items", "test_api_key"))
+    mock_requests.set_response_exception(requests.exceptions.ConnectionError("down"))
+    with pytest.raises(ClockifyClientException):
+        session.api.api_server.get("/user", "test_api_key")
+
+    snapshot = metrics.snapshot()
+    workspaces = snapshot["requests"]["GET /workspaces"]
+    assert workspaces["requests"] == 2
+    assert workspaces["retries"] == 1
+    assert workspaces["errors"] == {"429": 1}
+    assert workspaces["latency"]["count"] == 2
+    assert workspaces["latency"]["p99"] is not None
+    assert snapshot["requests"]["GET /user"]["errors"] == {"ConnectionError": 2}
+    assert snapshot["pages"] == {"/workspaces/{id}/items": {"pages": 2, "items": 60}}
+    assert snapshot["caches"]["session"]["hits"] == 1
+    assert snapshot["caches"]["session"]["misses"] == 1
+
+    text = metrics.to_prometheus()
+    assert "# TYPE clockify_requests_total counter" in text
+    assert 'clockify_requests_total{method="GET",endpoint="/workspaces"} 2' in text
+    assert (
+        'clockify_request_errors_total{method="GET",endpoint="/workspaces",'
+        'status="429"} 1' in text
+    )
+    assert (
+        'clockify_request_duration_seconds_bucket{method="GET",endpoint="/workspaces",'
+        'le="+Inf"} 2' in text
+    )
+    assert 'clockify_pages_fetched_total{endpoint="/workspaces/{id}/items"} 2' in text
+    assert 'clockify_cache_hit_ratio{cache="session"} 0.5' in text
+
+    metrics.reset()
+    assert metrics.snapshot()["requests"] == {}
+
+
+def test_metrics_disabled(mock_requests):
+    """Without collector, no events should be created"""
+    server = APIServer("localhost")
+    mock_requests.set_response(GET_USER)
+    server.get("/user", "test_api_key")
+    assert server.hooks == []
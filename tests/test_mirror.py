@@ -0,0 +1,178 @@
+import datetime
+import json
+import time
+
+import pytest
+
+from clockifyclient.api import APIServer
+from clockifyclient.client import APISession
+from clockifyclient.mirror import TimeEntryMirror, to_timestamp
+from clockifyclient.models import (
+    ClockifyDatetime,
+    ProjectStub,
+    TaskStub,
+    TimeEntryQuery,
+    User,
+    Workspace,
+    reset_local_timezone,
+)
+from tests.mock_responses import POST_TIME_ENTRY
+
+
+def an_entry(obj_id, day, description="work", project_id="p1"):
+    entry = json.loads(POST_TIME_ENTRY.text)
+    entry["id"] = obj_id
+    entry["description"] = description
+    entry["projectId"] = project_id
+    entry["timeInterval"]["start"] = f"2020-01-{day:02d}T10:00:00Z"
+    entry["timeInterval"]["end"] = f"2020-01-{day:02d}T11:00:00Z"
+    return entry
+
+
+class EntryList(list):
+    """Entries, plus the parameters of each request made for them"""
+
+    requested_params = None
+
+
+@pytest.fixture()
+def server_entries(mock_requests):
+    """Entries on the mock server, newest first. Honours the 'start' parameter"""
+    entries = EntryList()
+    requested_params = []
+
+    def get_page(*args, params, **kwargs):
+        requested_params.append(dict(params))
+        selected = sorted(entries, key=lambda x: x["timeInterval"]["start"])[::-1]
+        if "start" in params:
+            start = ClockifyDatetime.parse(params["start"])
+            selected = [
+                x
+                for x in selected
+                if ClockifyDatetime.parse(x["timeInterval"]["start"]) >= start
+            ]
+        page = int(params["page"])
+        page_size = int(params["page-size"])
+        page_items = selected[(page - 1) * page_size : page * page_size]
+        return mock_requests.create_response_object(200, json.dumps(page_items))
+
+    mock_requests.requests.get.side_effect = get_page
+    entries.requested_params = requested_params
+    return entries
+
+
+@pytest.fixture()
+def a_mirror(mock_requests, tmp_path):
+    session = APISession(api_server=APIServer("localhost"), api_key="test")
+    session.cache.set("workspace", Workspace(obj_id="w1", name="ws"))
+    session.cache.set("user", User(obj_id="u1", name="user"))
+    with TimeEntryMirror(str(tmp_path / "mirror.sqlite"), session) as mirror:
+        yield mirror
+
+
+def test_mirror_sync_incremental(server_entries, a_mirror):
+    server_entries.extend(an_entry(str(day), day) for day in range(1, 21))
+
+    result = a_mirror.sync()
+    assert result.received == 20
+    assert result.since is None
+    assert "start" not in server_entries.requested_params[-1]
+    assert len(a_mirror.get_time_entries()) == 20
+
+    # entry within recheck window is edited, another deleted, one new added
+    server_entries[18]["description"] = "edited"
+    del server_entries[17]  # day 18
+    server_entries.append(an_entry("21", 21))
+    result = a_mirror.sync()
+
+    # only the last week before the newest known entry (day 20) is requested
+    assert server_entries.requested_params[-1]["start"] == "2020-01-13T10:00:00Z"
+    assert result.received == 8  # days 13 to 21, without 18
+    assert result.removed == 1
+    entries = a_mirror.get_time_entries()
+    assert len(entries) == 20
+    assert entries[0].obj_id == "21"
+    assert "18" not in [x.obj_id for x in entries]
+    edited = a_mirror.get_time_entries(TimeEntryQuery(description="edit"))
+    assert [x.obj_id for x in edited] == ["19"]
+
+
+def test_mirror_query(server_entries, a_mirror):
+    server_entries.extend(
+        [
+            an_entry("1", 1, description="Meeting 100%"),
+            an_entry("2", 2, description="coding", project_id="p2"),
+            an_entry("3", 3, description="meeting", project_id=None),
+            an_entry("4", 4, description="running", project_id=None),
+        ]
+    )
+    server_entries[-1]["taskId"] = None
+    server_entries[-1]["timeInterval"]["end"] = None
+    a_mirror.sync()
+
+    def ids(**kwargs):
+        return [x.obj_id for x in a_mirror.get_time_entries(**kwargs)]
+
+    def query_ids(**kwargs):
+        return ids(query=TimeEntryQuery(**kwargs))
+
+    assert ids() == ["4", "3", "2", "1"]
+    assert ids(limit=1) == ["4"]
+    assert query_ids(description="meeting") == ["3", "1"]
+    assert query_ids(description="0%") == ["1"]
+    assert query_ids(description="_") == []
+    assert query_ids(project=ProjectStub(obj_id="p2")) == ["2"]
+    assert query_ids(task=TaskStub(obj_id="123456")) == ["3", "2", "1"]
+    assert query_ids(in_progress=True) == ["4"]
+    assert query_ids(in_progress=False) == ["3", "2", "1"]
+    assert query_ids(
+        start=ClockifyDatetime.parse("2020-01-02T10:00:00Z"),
+        end=ClockifyDatetime.parse("2020-01-03T10:00:00Z"),
+    ) == ["3", "2"]
+    for query in [TimeEntryQuery(tags=["t1"]), TimeEntryQuery(hydrated=True)]:
+        with pytest.raises(ValueError):
+            a_mirror.get_time_entries(query)
+
+    entry = a_mirror.get_time_entries(limit=2)[1]
+    assert entry.project is None
+    assert entry.end - entry.start == ClockifyDatetime.parse(
+        "2020-01-01T11:00:00Z"
+    ) - ClockifyDatetime.parse("2020-01-01T10:00:00Z")
+
+
+@pytest.fixture()
+def non_utc_timezone(monkeypatch):
+    """Run in a local timezone that differs from UTC"""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    reset_local_timezone()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+    reset_local_timezone()
+
+
+def test_naive_datetimes_are_utc(non_utc_timezone, server_entries, a_mirror):
+    assert to_timestamp(datetime.datetime(2021, 1, 1)) == 1609459200
+    assert to_timestamp(ClockifyDatetime.parse("2021-01-01T00:00:00Z")) == 1609459200
+
+    server_entries.append(an_entry("1", 1))
+    a_mirror.session.now = lambda: datetime.datetime(2021, 1, 1)
+    assert a_mirror.get_last_sync() is None
+    a_mirror.sync()
+    assert a_mirror.get_last_sync() == ClockifyDatetime.parse("2021-01-01T00:00:00Z")
+
+
+def test_query_naive_datetimes_are_local(non_utc_timezone, server_entries, a_mirror):
+    """Query bounds should select the same entries locally as on the server"""
+    server_entries.extend(an_entry(str(day), day) for day in range(1, 4))
+    a_mirror.sync()
+
+    # entries start at 10:00 UTC, which is 05:00 in New York
+    query = TimeEntryQuery(
+        start=datetime.datetime(2020, 1, 1, 6, 0),
+        end=datetime.datetime(2020, 1, 3, 5, 0),
+    )
+    assert query.to_dict()["start"] == "2020-01-01T11:00:00Z"
+    assert query.to_dict()["end"] == "2020-01-03T10:00:00Z"
+    assert [x.obj_id for x in a_mirror.get_time_entries(query)] == ["3", "2"]
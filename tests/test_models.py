@@ -5,6 +5,7 @@ import json
 import dateutil
 import pytest
 
+from clockifyclient.identity import IdentityMap
 from clockifyclient.models import (
     Task,
     TaskStub,
@@ -18,6 +19,7 @@ from clockifyclient.models import (
     NamedAPIObject,
     ClockifyDatetime,
     ObjectParseException,
+    LazyTimeEntry,
 )
 from tests.mock_responses import POST_TIME_ENTRY, POST_TIME_ENTRY_NO_PROJECT_NO_TASK
 
@@ -26,7 +28,7 @@ from tests.mock_responses import POST_TIME_ENTRY, POST_TIME_ENTRY_NO_PROJECT_NO_
 def mock_models_timezone(monkeypatch):
     """Set timezone to +8/+8"""
     monkeypatch.setattr(
-        "clockifyclient.models.dateutil.tz.tzlocal",
+        "clockifyclient.models.get_local_timezone",
         lambda: dateutil.tz.gettz("Asia/Irkutsk"),
     )
 
@@ -131,3 +133,121 @@ def test_truncate(a_date):
     assert str(entry).endswith("thats 30c'")
     entry.description = "A longer description thats a lot longer then 30 characters"
     assert str(entry).endswith("thats ...'")
+
+
+@pytest.mark.parametrize(
+    "date_string",
+    [
+        "2019-10-23T17:18:58Z",
+        "2000-02-29T00:00:00Z",
+        "2018-06-12T14:01:41+00:00",
+        "2018-06-12T14:01:41.123Z",
+    ],
+)
+def test_date_parse_fast_path(date_string):
+    """Fast path should give the same result as dateutil"""
+    assert ClockifyDatetime.parse(date_string) == dateutil.parser.parse(date_string)
+    assert ClockifyDatetime.parse(date_string).tzinfo is not None
+
+
+def test_date_parse_errors():
+    for bad_string in ["2019-13-23T17:18:58Z", "2019-1A-23T17:18:58Z", "garbage"]:
+        with pytest.raises(ValueError):
+            ClockifyDatetime.parse(bad_string)
+
+
+def test_date_parse_many(mock_models_timezone):
+    parsed = ClockifyDatetime.parse_many(
+        ["2019-10-23T17:18:58Z", None, "2019-10-23T17:18:58Z", "2018-06-12T14:01:41"]
+    )
+    assert parsed[0] == parsed[2]
+    assert parsed[1] is None
+    assert str(ClockifyDatetime(parsed[3])) == "2018-06-12T06:01:41Z"
+
+
+def test_models_are_slotted(a_date):
+    """Models should not have a per-instance __dict__, to save memory"""
+    time_entry = TimeEntry.init_from_dict(json.loads(POST_TIME_ENTRY.text))
+    for instance in [
+        time_entry,
+        time_entry.project,
+        time_entry.task,
+        User(obj_id="123", name="test"),
+        Workspace(obj_id="123", name="test"),
+    ]:
+        assert not hasattr(instance, "__dict__")
+
+
+def test_lazy_time_entry(monkeypatch):
+    """Lazy entries should parse each field only when it is first read"""
+    parsed = []
+    parse = ClockifyDatetime.parse
+    monkeypatch.setattr(
+        ClockifyDatetime, "parse", lambda x: parsed.append(x) or parse(x)
+    )
+    for text in [POST_TIME_ENTRY.text, POST_TIME_ENTRY_NO_PROJECT_NO_TASK.text]:
+        eager = TimeEntry.init_from_dict(json.loads(text))
+        parsed.clear()
+        lazy = TimeEntry.init_from_dict(json.loads(text), lazy=True)
+        assert isinstance(lazy, LazyTimeEntry)
+        assert not hasattr(lazy, "__dict__")
+
+        assert lazy.description == eager.description
+        assert parsed == []
+        assert lazy.start == eager.start
+        assert lazy.start == eager.start
+        assert len(parsed) == 1  # parsed once, then kept
+        assert lazy.to_dict() == eager.to_dict()
+
+    lazy.project = ProjectStub(obj_id="789")
+    lazy.description = "changed"
+    assert lazy.to_dict()["projectId"] == "789"
+    assert str(lazy) == "TimeEntry (123456) - 'changed'"
+
+
+def test_lazy_time_entry_errors():
+    """Invalid fields should only raise when read"""
+    lazy = TimeEntry.init_from_dict({"id": "1", "description": "test"}, lazy=True)
+    assert lazy.description == "test"
+    with pytest.raises(ObjectParseException):
+        lazy.start
+
+
+def test_time_entry_query_to_dict(a_date):
+    assert TimeEntryQuery().to_dict() == {}
+    query = TimeEntryQuery(
+        description="test",
+        start=a_date,
+        end=a_date,
+        project=ProjectStub(obj_id="p1"),
+        task=Task(obj_id="t1", name="task"),
+        tags=["tag1", "tag2"],
+        in_progress=False,
+        hydrated=True,
+    )
+    assert query.to_dict() == {
+        "description": "test",
+        "start": "2000-01-01T00:00:00Z",
+        "end": "2000-01-01T00:00:00Z",
+        "project": "p1",
+        "task": "t1",
+        "tags": "tag1,tag2",
+        "in-progress": "false",
+        "hydrated": "true",
+    }
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_time_entry_hydrated(lazy):
+    """Hydrated entries should get named projects and tasks"""
+    entry_dict = json.loads(POST_TIME_ENTRY.text)
+    entry_dict["project"] = {"id": entry_dict["projectId"], "name": "project"}
+    entry_dict["task"] = {"id": entry_dict["taskId"], "name": "task"}
+    identity_map = IdentityMap()
+    stub = identity_map.get_project(entry_dict["projectId"])
+
+    entry = TimeEntry.init_from_dict(entry_dict, lazy=lazy, identity_map=identity_map)
+    assert entry.project is stub
+    assert stub.name == "project"
+    assert entry.task.name == "task"
+    assert TimeEntry.init_from_dict(entry_dict).project.name == "project"
@@ -0,0 +1,186 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from clockifyclient.api import APIServer
+from clockifyclient.hooks import RequestHooks
+from clockifyclient.pool import SessionPool
+from clockifyclient.transport import (
+    ConcurrencyLimitedTransport,
+    InMemoryTransport,
+    create_response,
+    encode_body,
+)
+from tests.factories import FakeClock
+
+WORKSPACE = {"id": "w1", "name": "workspace"}
+
+
+@pytest.fixture()
+def a_transport():
+    transport = InMemoryTransport()
+    transport.add("GET", "/workspaces", [WORKSPACE])
+    transport.add("GET", "/user", {"id": "u1", "name": "user", "email": "a@b.c"})
+    transport.add("GET", "/workspaces/w1/projects", [{"id": "p1", "name": "project"}])
+    transport.add("GET", "/projects/p1/tasks", [{"id": "t1", "name": "task"}])
+    return transport
+
+
+def count_calls(transport, path):
+    return sum(url.endswith(path) for _, url in transport.calls)
+
+
+def test_session_pool_shares_metadata(a_transport):
+    pool = SessionPool(
+        APIServer("http://localhost", transport=a_transport), share_metadata=True
+    )
+    session1 = pool.get_session("key1")
+    session2 = pool.get_session("key2")
+
+    assert pool.get_session("key1") is session1
+    assert session1 is not session2
+    assert session1.api.api_server is session2.api.api_server
+
+    project = session1.get_projects()[0]
+    assert session2.get_projects() == [project]
+    session1.get_tasks(project)
+    session2.get_tasks(project)
+    assert count_calls(a_transport, "/projects") == 1
+    assert count_calls(a_transport, "/tasks") == 1
+    assert count_calls(a_transport, "/workspaces") == 2  # once per api key
+
+    session2.invalidate_cache()
+    session1.get_projects()
+    session1.get_tasks(project)
+    assert count_calls(a_transport, "/projects") == 2
+    assert count_calls(a_transport, "/tasks") == 2
+
+
+def test_session_pool_metadata_per_api_key(a_transport):
+    """By default, projects of one user should not be shown to others"""
+    pool = SessionPool(APIServer("http://localhost", transport=a_transport))
+    session1 = pool.get_session("key1")
+    session2 = pool.get_session("key2")
+
+    project = session1.get_projects()[0]
+    session2.get_projects()
+    session1.get_projects()
+    assert count_calls(a_transport, "/projects") == 2
+
+    # sessions dropped from the pool keep their metadata
+    pool.remove("key1")
+    pool.get_session("key1").get_projects()
+    assert count_calls(a_transport, "/projects") == 2
+
+    # invalidation applies to all api keys
+    session1.get_tasks(project)
+    session2.get_tasks(project)
+    pool.invalidate_metadata("w1", project)
+    session1.get_tasks(project)
+    session2.get_tasks(project)
+    assert count_calls(a_transport, "/tasks") == 4
+
+
+def test_session_pool_eviction(a_transport):
+    clock = FakeClock()
+    pool = SessionPool(
+        APIServer("http://localhost", transport=a_transport),
+        max_sessions=2,
+        idle_timeout=10,
+        clock=clock,
+    )
+    session1 = pool.get_session("key1")
+    pool.get_session("key2")
+    assert pool.get_session("key1") is session1  # key2 is now least recently used
+    pool.get_session("key3")
+    assert "key2" not in pool
+    assert len(pool) == 2
+
+    clock.time = 5
+    pool.get_session("key3")
+    clock.time = 12  # key1 has been idle for 12 seconds, key3 for 7
+    pool.get_session("key4")
+    assert "key1" not in pool
+    assert "key3" in pool
+    assert pool.evictions == 2
+
+
+def test_concurrency_limit():
+    """No more than max_concurrent_calls calls should be in progress at once"""
+    in_progress = []
+    maximum = []
+    lock = threading.Lock()
+
+    def respond(url, params):
+        with lock:
+            in_progress.append(1)
+            maximum.append(len(in_progress))
+        time.sleep(0.01)
+        with lock:
+            in_progress.pop()
+        return create_response(200, encode_body({"id": "u1", "name": "user"}))
+
+    transport = InMemoryTransport()
+    transport.add_handler("GET", "/user", respond)
+    api_server = APIServer("http://localhost", transport=transport)
+    pool = SessionPool(api_server, max_concurrent_calls=2)
+    assert isinstance(pool.api_server.transport, ConcurrencyLimitedTransport)
+    assert api_server.transport is transport  # the limit is owned by the pool
+    other_pool = SessionPool(api_server, max_concurrent_calls=2)
+    assert other_pool.api_server.transport.transport is transport
+
+    sessions = [pool.get_session(f"key{i}") for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda x: x.get_user(), sessions))
+    assert len(maximum) == 8
+    assert max(maximum) == 2
+
+
+def test_pooled_session_bootstrap(a_transport):
+    """Bootstrap should check the metadata cache of the pool can hold all tasks"""
+    api_server = APIServer("http://localhost", transport=a_transport)
+    with pytest.raises(ValueError):
+        SessionPool(api_server, metadata_size=1).get_session("key").bootstrap()
+
+    session = SessionPool(api_server, metadata_size=2).get_session("key")
+    session.bootstrap()
+    calls = len(a_transport.calls)
+    session.get_tasks(session.get_projects()[0])
+    assert len(a_transport.calls) == calls
+
+
+class CountingHooks(RequestHooks):
+    def __init__(self):
+        self.responses = 0
+
+    def after_response(self, event):
+        self.responses += 1
+
+
+class ClosingTransport(InMemoryTransport):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_concurrency_limited_pool_shares_server(a_transport):
+    """A pool with a concurrency limit should share hooks and retry count with
+    the server it was given, also when changed later, and never close it
+    """
+    transport = ClosingTransport()
+    transport.routes = a_transport.routes
+    api_server = APIServer("http://localhost", transport=transport)
+    pool = SessionPool(api_server, max_concurrent_calls=2)
+    hooks = CountingHooks()
+    api_server.add_hooks(hooks)  # after the pool was created
+    api_server.retry_count = 5
+
+    pool.get_session("key").get_user()
+    assert hooks.responses == 1
+    assert pool.api_server.retry_count == 5
+
+    pool.close()
+    assert not transport.closed
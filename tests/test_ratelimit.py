@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from unittest.mock import Mock
+
+from clockifyclient.api import APIServer
+from clockifyclient.ratelimit import RateLimiter, TokenBucket
+from tests.factories import FakeClock
+from tests.mock_responses import GET_USER
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+    # burst can be used immediately, then calls are spaced 1/rate apart
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.1, 0.2]
+
+    clock.time = 10  # after a long pause, tokens are capped at burst
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0.1]
+
+
+def test_rate_limiter_per_key_and_host():
+    limiter = RateLimiter(rate=10, burst=1, host_rate=10, host_burst=2)
+    assert limiter.reserve("key1", "host") == 0
+    assert limiter.reserve("key2", "host") == 0
+    # key3 has its own bucket but the host bucket is empty
+    assert limiter.reserve("key3", "host") > 0
+    assert limiter.reserve("key3", "other_host") > 0  # key3 bucket is empty now
+
+    unlimited_hosts = RateLimiter(rate=10, burst=1)
+    assert unlimited_hosts.reserve("key1", "host") == 0
+    assert unlimited_hosts.reserve("key2", "host") == 0
+
+
+def test_server_uses_rate_limiter(mock_requests):
+    limiter = Mock(spec=RateLimiter)
+    server = APIServer("https://api.clockify.me/api/v1", rate_limiter=limiter)
+    mock_requests.set_paged_items([{"id": "1"}])
+    list(server.get_iterator("/test", "test_api_key"))
+    mock_requests.set_response(GET_USER)
+    server.get("/test", "test_api_key")
+
+    assert limiter.acquire.call_count == 2
+    limiter.acquire.assert_called_with(api_key="test_api_key", host="api.clockify.me")
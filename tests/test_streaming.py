@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from clockifyclient.api import (
+    APIResponseParseException,
+    APIServer,
+    APIServerException,
+)
+from clockifyclient.streaming import iter_json_array
+from tests.factories import RequestsMock
+
+
+def in_chunks(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1000])
+def test_iter_json_array(chunk_size):
+    """Items should be decoded correctly however the data is split up"""
+    items = [
+        {"id": "1", "description": "café ☕", "end": None},
+        12345,
+        -1.5e3,
+        "a, string]",
+        [1, [2]],
+        True,
+    ]
+    data = " [ " + ",\n ".join(json.dumps(x, ensure_ascii=False) for x in items)
+    data = (data + " ]\n").encode("utf-8")
+    assert list(iter_json_array(in_chunks(data, chunk_size))) == items
+
+
+def test_iter_json_array_lazy():
+    """Items should be returned before later chunks have been read"""
+    read = []
+
+    def chunks():
+        for chunk in [b'[{"id": 1},', b' {"id": 2}', b"]"]:
+            read.append(chunk)
+            yield chunk
+
+    iterator = iter_json_array(chunks())
+    assert next(iterator) == {"id": 1}
+    assert len(read) == 1
+    assert list(iterator) == [{"id": 2}]
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"[]", b" [ ] ", b"{}", b"[1 2]", b"[1,", b'[{"a": 1]', b"[1] 2"]
+)
+def test_iter_json_array_validation(data):
+    """Invalid arrays should raise the same error json.loads raises"""
+    try:
+        expected = json.loads(data)
+    except json.JSONDecodeError:
+        expected = None
+    if expected is None or not isinstance(expected, list):
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_array(in_chunks(data, 2)))
+    else:
+        assert list(iter_json_array(in_chunks(data, 2))) == expected
+
+
+def test_paged_iterator_stream_errors(mock_requests):
+    a_server = APIServer("https://api.clockify.me/api/v1")
+    mock_requests.requests.get.side_effect = [
+        RequestsMock.create_response_object(200, '[{"id": "1"}, {"id": ')
+    ]
+    iterator = a_server.get_iterator("/test", "test_api_key", stream=True)
+    assert next(iterator) == {"id": "1"}
+    with pytest.raises(APIResponseParseException):
+        next(iterator)
+
+    mock_requests.requests.get.side_effect = [
+        RequestsMock.create_response_object(400, '{"code": 501, "message": "error"}')
+    ]
+    with pytest.raises(APIServerException):
+        next(a_server.get_iterator("/test", "test_api_key", stream=True))
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from clockifyclient.api import APIServer, APIServer404
+from clockifyclient.client import ClockifyAPI
+from clockifyclient.models import TimeEntryQuery, User, Workspace
+from clockifyclient.transport import (
+    InMemoryTransport,
+    RecordingTransport,
+    ReplayMissException,
+    ReplayTransport,
+    get_exchange_key,
+)
+from tests.mock_responses import POST_TIME_ENTRY
+
+ENTRIES_PATH = r"/workspaces/\w+/user/\w+/time-entries"
+
+
+@pytest.fixture()
+def an_entry_dict():
+    return json.loads(POST_TIME_ENTRY.text)
+
+
+@pytest.fixture()
+def a_transport(an_entry_dict):
+    transport = InMemoryTransport()
+    transport.add("GET", "/user", {"id": "1", "name": "user", "email": "a@b.c"})
+    transport.add("POST", r"/workspaces/\w+/time-entries", an_entry_dict, 201)
+    entries = [dict(an_entry_dict, id=str(i)) for i in range(120)]
+    transport.add_paged(ENTRIES_PATH, entries)
+    return transport
+
+
+def get_entries(api_server, api_key="key", **kwargs):
+    """(obj_id, start, description) of each entry"""
+    entries = ClockifyAPI(api_server).get_time_entries(
+        api_key,
+        Workspace("w1", "ws"),
+        User("u1", "user"),
+        TimeEntryQuery(description=None),
+        **kwargs
+    )
+    return [(x.obj_id, x.start, x.description) for x in entries]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_in_memory_transport(a_transport, stream):
+    server = APIServer("http://localhost/api/v1", transport=a_transport)
+    iterator = ClockifyAPI(server).get_time_entries_iterator(
+        "key",
+        Workspace("w1", "ws"),
+        User("u1", "user"),
+        TimeEntryQuery(description=None),
+        stream=stream,
+    )
+
+    assert len(list(iterator)) == 120
+    assert server.get("/user", "key")["name"] == "user"
+    with pytest.raises(APIServer404):
+        server.get("/unknown", "key")
+    assert a_transport.calls[-1] == ("GET", "http://localhost/api/v1/unknown")
+
+
+def test_record_replay(tmp_path, a_transport):
+    path = tmp_path / "session.jsonl"
+    with APIServer(
+        "http://localhost/api/v1", transport=RecordingTransport(path, a_transport)
+    ) as server:
+        recorded = get_entries(server, api_key="secret", limit=70)
+        server.post("/workspaces/w1/time-entries", "secret", data={"b": 1, "a": 2})
+
+    replay = ReplayTransport(path)
+    # any host and any api key, so recordings can be shared
+    server = APIServer("http://otherhost/api/v1", transport=replay)
+    assert len(set(recorded)) == 70
+    assert get_entries(server, limit=70) == recorded
+    assert "secret" not in path.read_text()
+
+    # request data is matched independent of formatting
+    server.post("/workspaces/w1/time-entries", "key2", data={"a": 2, "b": 1})
+    with pytest.raises(ReplayMissException):
+        server.post("/workspaces/w1/time-entries", "key", data={"a": 3})
+
+
+def test_replay_order(tmp_path):
+    """Repeated calls get their responses in recorded order, then the last one"""
+    path = tmp_path / "session.jsonl"
+    key = list(get_exchange_key("GET", "/x", None, None))
+    lines = [dict(key=key, status_code=200, headers={}, body=str(i)) for i in range(2)]
+    path.write_text("\n".join(json.dumps(x) for x in lines))
+    server = APIServer("", transport=ReplayTransport(path), coalesce_gets=False)
+
+    assert [server.get("/x", "key") for _ in range(3)] == [0, 1, 1]